@@ -11,7 +11,15 @@ setup(
         "jinja2>=3.0.0",
         "websockets>=10.0",
         "python-multipart>=0.0.5",
+        "numpy>=1.24.0",
+        "httpx>=0.24.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=14.0.0"],
+        "zstd": ["zstandard>=0.22.0"],
+        "metrics": ["prometheus_client>=0.17.0"],
+        "uvloop": ["uvloop>=0.17.0; sys_platform != 'win32'"],
+    },
     entry_points={
         "console_scripts": [
             "dataflux=src.main:main",
@@ -0,0 +1,396 @@
+"""
+Benchmarks for DataFlux's hot paths.
+Each case runs one stage (a generator, the stream sampler, the edge buffer,
+the registry flush, a sink against a local stand-in, or the whole pipeline)
+for a fixed time and reports events/sec and bytes/sec. Results are written as
+JSON and compared against a stored baseline to catch regressions.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from src import edge_buffer
+from src.counters import counters
+from src.emitter import (
+    batch_event_generators_map,
+    event_generators_map,
+    launch_emitters,
+)
+from src.emitter_registry import EmitterRegistry
+from src.encoder_pool import POOL_KINDS, EncoderPool
+from src.event_batch import EventBatch
+from src.instrumentation import Histogram, sample_loop_lag
+from src.rate_controller import generated_events
+from src.serializer import encode_batch
+from src.sinks.factory import SinkFactory
+from src.sinks.parquet_sink import pa
+from src.stream_weights import weighted_random_choice
+from src.user_pool import load_user_pool
+from src.utils import configure_generation
+from src.web import receiver
+
+CASE_SEC = 1.0
+BATCH_SIZE = 1000
+# A case slower than baseline by more than this fraction is a regression.
+DEFAULT_TOLERANCE = 0.2
+PIPELINE_WARMUP_SEC = 1.0
+# The pipeline window may run this many times over duration to see progress.
+PIPELINE_MAX_OVERRUN = 5
+
+
+def result(events: int, size: int, elapsed: float) -> Dict[str, Any]:
+    """Build one case result from events and bytes handled in elapsed seconds."""
+    elapsed = max(elapsed, 1e-9)
+    return {
+        "events": events,
+        "elapsed_sec": round(elapsed, 4),
+        "events_per_sec": round(events / elapsed, 1),
+        "bytes_per_sec": round(size / elapsed, 1),
+    }
+
+
+def run_for(budget_sec: float, step: Callable[[], Any], repeat: int = 1) -> tuple:
+    """Call step repeatedly for about budget_sec; return (calls, elapsed)."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + budget_sec
+    while True:
+        for _ in range(repeat):
+            step()
+        calls += repeat
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls, now - start
+
+
+async def run_for_async(budget_sec: float, step: Callable[[], Awaitable[Any]]) -> tuple:
+    """Await step repeatedly for about budget_sec; return (calls, elapsed)."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + budget_sec
+    while True:
+        await step()
+        calls += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls, now - start
+
+
+def sample_batch(stream: str, n: int = BATCH_SIZE) -> EventBatch:
+    """Generate an n-event batch of one stream."""
+    user_ids = [f"u{i:08d}" for i in range(n)]
+    device_ids = [f"d{i:012x}" for i in range(n)]
+    columns = batch_event_generators_map[stream](user_ids, device_ids, n)
+    return EventBatch.from_columns(stream, columns)
+
+
+def mixed_batch(n: int = BATCH_SIZE) -> EventBatch:
+    """An n-event batch with an even mix of every stream."""
+    per_stream = max(1, n // len(batch_event_generators_map))
+    return EventBatch.from_parts(
+        [sample_batch(stream, per_stream) for stream in batch_event_generators_map]
+    )
+
+
+def bench_generators(budget_sec: float) -> Dict[str, Dict[str, Any]]:
+    """Per-event and batch generator throughput for every stream."""
+    results = {}
+    for stream, generate in event_generators_map.items():
+        size = len(json.dumps(generate("u00000001", "d000000000001")))
+        calls, elapsed = run_for(
+            budget_sec, lambda: generate("u00000001", "d000000000001"), repeat=100
+        )
+        results[f"generators.{stream}"] = result(calls, calls * size, elapsed)
+
+    for stream in batch_event_generators_map:
+        size = encode_batch(sample_batch(stream)).size
+        calls, elapsed = run_for(budget_sec, lambda: sample_batch(stream))
+        results[f"batch_generators.{stream}"] = result(
+            calls * BATCH_SIZE, calls * size, elapsed
+        )
+    return results
+
+
+def bench_stream_sampler(
+    budget_sec: float, streams: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """Calls per second of the per-event weighted stream choice."""
+    calls, elapsed = run_for(
+        budget_sec, lambda: weighted_random_choice(streams), repeat=100
+    )
+    return {"weighted_random_choice": result(calls, 0, elapsed)}
+
+
+async def bench_buffer(budget_sec: float) -> Dict[str, Dict[str, Any]]:
+    """Edge buffer appends (no flushes) and registry flushes (encode and count)."""
+    results = {}
+    event = event_generators_map["video_logs"]("u00000001", "d000000000001")
+    event["stream"] = "video_logs"
+    size = len(json.dumps(event))
+    # Buffer-only: batch size and interval are too large for a flush to trigger.
+    edge_buffer.initialize_buffers([{"name": "bench"}], {"sinks": {}})
+    try:
+        calls, elapsed = await run_for_async(
+            budget_sec,
+            lambda: edge_buffer.add_to_buffer(event, "bench", 1 << 62, 3600, counters),
+        )
+        results["buffer.add_to_buffer"] = result(calls, calls * size, elapsed)
+    finally:
+        edge_buffer.buffers.pop("bench", None)
+        edge_buffer.buffer_sizes.pop("bench", None)
+        await edge_buffer.cleanup()
+
+    registry = EmitterRegistry({"sinks": {}})
+    batch = mixed_batch()
+    size = encode_batch(batch).size
+    calls, elapsed = await run_for_async(
+        budget_sec, lambda: registry.flush("bench", batch, counters)
+    )
+    results["registry.flush"] = result(calls * len(batch), calls * size, elapsed)
+    return results
+
+
+async def bench_encoders(budget_sec: float) -> Dict[str, Dict[str, Any]]:
+    """Encoder pool throughput per pool kind, kept full to max_inflight."""
+    results = {}
+    batch = mixed_batch()
+    size = encode_batch(batch).size
+    for kind in POOL_KINDS:
+        pool = EncoderPool(kind)
+        concurrency = 1 if kind == "inline" else pool.max_inflight
+        try:
+            # The first call pays for starting the workers.
+            await pool.encode(batch)
+            calls, elapsed = await run_for_async(
+                budget_sec,
+                lambda: asyncio.gather(
+                    *[pool.encode(batch) for _ in range(concurrency)]
+                ),
+            )
+        finally:
+            await pool.close()
+        results[f"encoder.{kind}"] = result(
+            calls * concurrency * len(batch), calls * concurrency * size, elapsed
+        )
+    return results
+
+
+class NullProducer:
+    """Kafka producer stand-in that accepts every batch without a broker."""
+
+    class Batch:
+        def __init__(self):
+            self.size = 0
+
+        def append(self, *, key, value, timestamp):
+            self.size += len(value)
+            return True
+
+    def create_batch(self):
+        return self.Batch()
+
+    async def partitions_for(self, topic):
+        return {0}
+
+    async def send_batch(self, batch, topic, *, partition):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    async def stop(self):
+        pass
+
+
+def sink_stand_ins(directory: str) -> Dict[str, Callable[[], Any]]:
+    """Build each sink type wired to a local stand-in under directory."""
+
+    def mock():
+        sink = SinkFactory.create_sink("mock", {})
+        sink.current_file = os.path.join(directory, "mock.jsonl")
+        return sink
+
+    def fastapi():
+        sink = SinkFactory.create_sink("fastapi", {"fastapi": {}})
+        sink.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=receiver.app),
+            base_url="http://bench",
+        )
+        return sink
+
+    def kafka():
+        sink = SinkFactory.create_sink("kafka", {"kafka": {"pipelined": True}})
+        sink.producer = NullProducer()
+        return sink
+
+    stand_ins = {
+        "mock": mock,
+        "file": lambda: SinkFactory.create_sink(
+            "file", {"file": {"output_dir": os.path.join(directory, "file")}}
+        ),
+        "event_log": lambda: SinkFactory.create_sink(
+            "event_log",
+            {"event_log": {"path": os.path.join(directory, "bench.dflog")}},
+        ),
+        "fastapi": fastapi,
+        "kafka": kafka,
+    }
+    if pa is not None:
+        stand_ins["parquet"] = lambda: SinkFactory.create_sink(
+            "parquet",
+            {"parquet": {"output_dir": os.path.join(directory, "parquet")}},
+        )
+    return stand_ins
+
+
+async def bench_sinks(budget_sec: float) -> Dict[str, Dict[str, Any]]:
+    """Throughput of every sink type against local stand-ins, including close."""
+    results = {}
+    encoded = encode_batch(mixed_batch())
+    with tempfile.TemporaryDirectory() as directory:
+        for name, create in sink_stand_ins(directory).items():
+            sink = create()
+            start = time.perf_counter()
+            calls, _ = await run_for_async(
+                budget_sec, lambda: sink.send_encoded(encoded)
+            )
+            # Closing waits for buffered and in-flight writes, so it counts.
+            await sink.close()
+            elapsed = time.perf_counter() - start
+            results[f"sinks.{name}"] = result(
+                calls * len(encoded), calls * encoded.size, elapsed
+            )
+    return results
+
+
+async def bench_pipeline(
+    config: Dict[str, Any], duration_sec: float
+) -> Dict[str, Dict[str, Any]]:
+    """End-to-end rate of the configured emitters and sinks over duration_sec."""
+    configure_generation(config)
+    user_pool = load_user_pool(config)
+    buffers = edge_buffer.initialize_buffers(config["regions"], config)
+    emitters = asyncio.create_task(launch_emitters(user_pool, config, buffers))
+    try:
+        # Skip task start-up, then measure a steady window.
+        await asyncio.sleep(PIPELINE_WARMUP_SEC)
+        start_events, start_bytes = generated_events(), counters["bytes"]
+        start_encoded, start = counters["total"], time.perf_counter()
+        loop_lag = Histogram()
+        sampler = asyncio.create_task(sample_loop_lag(loop_lag))
+        await asyncio.sleep(duration_sec)
+        # A saturated loop makes progress in bursts; end the window on one.
+        while (
+            generated_events() == start_events
+            and time.perf_counter() - start < duration_sec * PIPELINE_MAX_OVERRUN
+        ):
+            await asyncio.sleep(0.1)
+        # Sample before teardown: cancelling many per-user tasks takes a while.
+        elapsed = time.perf_counter() - start
+        events = generated_events() - start_events
+        encoded = counters["total"] - start_encoded
+        size = counters["bytes"] - start_bytes
+        sampler.cancel()
+    finally:
+        emitters.cancel()
+        await asyncio.gather(emitters, return_exceptions=True)
+        await edge_buffer.cleanup()
+    # Bytes are only known once flushed; scale them to the events generated.
+    size = size * events / encoded if encoded else 0
+    pipeline = result(events, size, elapsed)
+    pipeline["tb_per_day"] = round(pipeline["bytes_per_sec"] * 86400 / 1e12, 3)
+    # How late the loop ran timers while saturated: is it still responsive?
+    pipeline["loop_lag_p50_ms"] = round(loop_lag.quantile(0.5) * 1000, 3)
+    pipeline["loop_lag_p99_ms"] = round(loop_lag.quantile(0.99) * 1000, 3)
+    return {"pipeline": pipeline}
+
+
+async def run_benchmarks(
+    config: Dict[str, Any],
+    case_sec: float = CASE_SEC,
+    pipeline_sec: float = 10.0,
+    only: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the benchmark groups (those whose name starts with only, if given)."""
+    # Each group runs when any of its case-name prefixes matches only.
+    groups = [
+        (
+            ("generators.", "batch_generators."),
+            lambda: bench_generators(case_sec),
+        ),
+        (
+            ("weighted_random_choice",),
+            lambda: bench_stream_sampler(case_sec, config["streams"]),
+        ),
+        (("buffer.", "registry."), lambda: bench_buffer(case_sec)),
+        (("encoder.",), lambda: bench_encoders(case_sec)),
+        (("sinks.",), lambda: bench_sinks(case_sec)),
+        (("pipeline",), lambda: bench_pipeline(config, pipeline_sec)),
+    ]
+    results: Dict[str, Dict[str, Any]] = {}
+    for prefixes, run in groups:
+        if only and not any(
+            prefix.startswith(only) or only.startswith(prefix) for prefix in prefixes
+        ):
+            continue
+        outcome = run()
+        if asyncio.iscoroutine(outcome):
+            outcome = await outcome
+        results.update(
+            {key: value for key, value in outcome.items() if key.startswith(only or "")}
+        )
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "case_sec": case_sec,
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """Compare events/sec per case with the baseline; flag drops beyond tolerance."""
+    rows = []
+    for key, now in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if not before or not before["events_per_sec"]:
+            continue
+        change = now["events_per_sec"] / before["events_per_sec"] - 1
+        rows.append(
+            {
+                "case": key,
+                "baseline_eps": before["events_per_sec"],
+                "current_eps": now["events_per_sec"],
+                "change": round(change, 4),
+                "regression": change < -tolerance,
+            }
+        )
+    return rows
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """Read a results file, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """Write results as indented JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
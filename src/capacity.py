@@ -0,0 +1,215 @@
+"""
+Capacity probe for DataFlux.
+Runs the pipeline open-loop (no interval sleeps, no jitter, no rate control)
+to find how fast a node can go. Each stage (generate, buffer, serialize, sink)
+is first measured alone, then the whole pipeline together; the stage with the
+highest cost per event is the bottleneck. Every stage shares one event loop,
+so whatever the stages don't account for is scheduling overhead.
+"""
+
+import asyncio
+import copy
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from src import bench, edge_buffer
+from src.counters import counters
+from src.emitter import generate_event, generate_stream_batch, sample_streams
+from src.encoder_pool import EncoderPool
+from src.event_batch import EventBatch
+from src.serializer import encode_batch
+from src.sinks.factory import SinkFactory
+from src.user_pool import load_user_pool
+from src.utils import configure_generation, get_rng
+
+GENERATE = "generate"
+BUFFER = "buffer"
+SERIALIZE = "serialize"
+SINK = "sink"
+SCHEDULING = "scheduling"
+
+
+def open_loop(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of config with every sleep and rate limit removed."""
+    config = copy.deepcopy(config)
+    for props in config["streams"].values():
+        props["interval_sec"] = 0
+    config["time_jitter_sec"] = 0
+    config["events_per_second"] = None
+    # Any mode but "safe": no 10ms sleep floor in the emitters.
+    config["mode"] = "capacity"
+    return config
+
+
+def generate_parts(config: Dict[str, Any], user_pool) -> List[Any]:
+    """One emitter step's output: an event (per_user) or a group's batches."""
+    if config.get("emitter_mode", "per_user") == "per_user":
+        return [generate_event(user_pool.user(0), config["streams"])]
+    users = user_pool[: config.get("emitter_batch_size", 1000)]
+    rng = get_rng()
+    stream_names, chosen = sample_streams(config["streams"], len(users))
+    return [
+        generate_stream_batch(users, members, stream, rng)
+        for stream_index, stream in enumerate(stream_names)
+        for members in [(chosen == stream_index).nonzero()[0]]
+        if len(members)
+    ]
+
+
+def part_size(part: Any) -> int:
+    """Events in one buffered part (an event dict or an EventBatch)."""
+    return len(part) if isinstance(part, EventBatch) else 1
+
+
+def flush_parts(config: Dict[str, Any], user_pool) -> List[Any]:
+    """Enough emitter output to fill one flush_batch_size buffer."""
+    parts, size = [], 0
+    while size < config["flush_batch_size"]:
+        step = generate_parts(config, user_pool)
+        parts.extend(step)
+        size += sum(part_size(part) for part in step)
+    return parts
+
+
+def measure_generate(config: Dict[str, Any], user_pool, budget_sec: float) -> Dict:
+    """Emitter generation alone."""
+    events = 0
+
+    def step():
+        nonlocal events
+        events += sum(part_size(part) for part in generate_parts(config, user_pool))
+
+    _, elapsed = bench.run_for(budget_sec, step)
+    return bench.result(events, 0, elapsed)
+
+
+async def measure_buffer(parts: List[Any], budget_sec: float) -> Dict:
+    """Appends to a region buffer alone; the buffer is emptied, never flushed."""
+    events = sum(part_size(part) for part in parts)
+    batched = isinstance(parts[0], EventBatch)
+    add = edge_buffer.add_batch_to_buffer if batched else edge_buffer.add_to_buffer
+
+    async def step():
+        for part in parts:
+            await add(part, "capacity", 1 << 62, 3600, counters)
+        edge_buffer.buffers["capacity"] = []
+        edge_buffer.buffer_sizes["capacity"] = 0
+
+    edge_buffer.initialize_buffers([{"name": "capacity"}], {"sinks": {}})
+    try:
+        calls, elapsed = await bench.run_for_async(budget_sec, step)
+    finally:
+        edge_buffer.buffers.pop("capacity", None)
+        edge_buffer.buffer_sizes.pop("capacity", None)
+        await edge_buffer.cleanup()
+    return bench.result(calls * events, 0, elapsed)
+
+
+async def measure_serialize(
+    config: Dict[str, Any], parts: List[Any], budget_sec: float
+) -> Dict:
+    """Joining a swapped-out buffer into one batch and encoding it in the pool."""
+    pool = EncoderPool.from_config(config.get("encoder"))
+    # Keep the pool full, as concurrent region flushes would.
+    concurrency = 1 if pool.kind == "inline" else pool.max_inflight
+    encoded = encode_batch(EventBatch.from_parts(parts))
+    try:
+        calls, elapsed = await bench.run_for_async(
+            budget_sec,
+            lambda: asyncio.gather(
+                *[pool.encode(EventBatch.from_parts(parts)) for _ in range(concurrency)]
+            ),
+        )
+    finally:
+        await pool.close()
+    events = calls * concurrency * len(encoded)
+    return bench.result(events, calls * concurrency * encoded.size, elapsed)
+
+
+async def measure_sinks(
+    config: Dict[str, Any], parts: List[Any], budget_sec: float
+) -> Dict[str, Dict]:
+    """Each configured sink alone, fed the same flush-sized encoded batch."""
+    encoded = encode_batch(EventBatch.from_parts(parts))
+    results = {}
+    for name, sink_conf in config.get("sinks", {}).items():
+        sink = SinkFactory.create_sink(sink_conf["type"], sink_conf)
+        start = time.perf_counter()
+        calls, _ = await bench.run_for_async(
+            budget_sec, lambda: sink.send_encoded(encoded)
+        )
+        await sink.close()
+        results[name] = bench.result(
+            calls * len(encoded), calls * encoded.size, time.perf_counter() - start
+        )
+    return results
+
+
+def find_bottleneck(stages: Dict[str, Dict], end_to_end_eps: float) -> Dict[str, Any]:
+    """Split the end-to-end cost per event across stages and name the largest."""
+    cost_us = {
+        name: 1e6 / stage["events_per_sec"]
+        for name, stage in stages.items()
+        if stage["events_per_sec"]
+    }
+    serial_ceiling = 1e6 / sum(cost_us.values()) if cost_us else 0.0
+    if end_to_end_eps:
+        # Stages share one loop; the rest is task switching and flush plumbing.
+        cost_us[SCHEDULING] = max(0.0, 1e6 / end_to_end_eps - sum(cost_us.values()))
+    total = sum(cost_us.values()) or 1.0
+    return {
+        "bottleneck": max(cost_us, key=cost_us.get) if cost_us else None,
+        "serial_ceiling_eps": round(serial_ceiling, 1),
+        "cost_us_per_event": {name: round(us, 3) for name, us in cost_us.items()},
+        "share": {name: round(us / total, 3) for name, us in cost_us.items()},
+    }
+
+
+def replicas_for(target_eps: float, end_to_end_eps: float, workers: int) -> int:
+    """Pods needed for target_eps if each worker process reaches end_to_end_eps."""
+    if not end_to_end_eps:
+        return 0
+    return math.ceil(target_eps / (end_to_end_eps * max(1, workers)))
+
+
+async def probe(
+    config: Dict[str, Any],
+    stage_sec: float = bench.CASE_SEC,
+    duration_sec: float = 10.0,
+    target_eps: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Measure each stage's ceiling, then the combined open-loop rate."""
+    # Size for the configured target rate unless one is given.
+    target_eps = target_eps or config.get("events_per_second")
+    config = open_loop(config)
+    configure_generation(config)
+    user_pool = load_user_pool(config)
+    parts = flush_parts(config, user_pool)
+
+    sinks = await measure_sinks(config, parts, stage_sec)
+    stages = {
+        GENERATE: measure_generate(config, user_pool, stage_sec),
+        BUFFER: await measure_buffer(parts, stage_sec),
+        SERIALIZE: await measure_serialize(config, parts, stage_sec),
+    }
+    if sinks:
+        # Every sink receives every event, so the slowest one sets the pace.
+        stages[SINK] = min(sinks.values(), key=lambda row: row["events_per_sec"])
+    end_to_end = (await bench.bench_pipeline(config, duration_sec))["pipeline"]
+
+    report = {
+        "emitter_mode": config.get("emitter_mode", "per_user"),
+        "stages": stages,
+        "sinks": sinks,
+        "end_to_end": end_to_end,
+        **find_bottleneck(stages, end_to_end["events_per_sec"]),
+    }
+    if target_eps:
+        workers = config.get("workers", 1)
+        report["target_eps"] = target_eps
+        report["workers"] = workers
+        report["replicas"] = replicas_for(
+            target_eps, end_to_end["events_per_sec"], workers
+        )
+    return report
@@ -0,0 +1,81 @@
+"""
+Coarse wall clock for event timestamps.
+The ISO string is formatted at most once per resolution step; every other call
+in the same step returns the cached string after a cheap integer comparison.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Callable, List
+
+import numpy as np
+
+
+class CoarseClock:
+    """UTC clock that caches its ISO-8601 string per resolution step."""
+
+    def __init__(
+        self,
+        resolution_sec: float = 0.001,
+        time_source: Callable[[], float] = time.time,
+    ):
+        """Initialize the clock with a resolution and a seconds-since-epoch source."""
+        self.time_source = time_source
+        self.set_resolution(resolution_sec)
+
+    def set_resolution(self, resolution_sec: float) -> None:
+        """Change the resolution and drop the cached timestamp."""
+        self.resolution_us = max(1, round(resolution_sec * 1_000_000))
+        self._step = None
+        self._iso = ""
+        self._second = None
+        self._second_prefix = ""
+
+    def _prefix(self, second: int) -> str:
+        """Return the cached "YYYY-MM-DDTHH:MM:SS" string for a whole second."""
+        if second != self._second:
+            self._second = second
+            self._second_prefix = datetime.fromtimestamp(second, timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            )
+        return self._second_prefix
+
+    def format(self, micros: int) -> str:
+        """Format microseconds since the epoch like datetime.isoformat()."""
+        second, micro = divmod(micros, 1_000_000)
+        prefix = self._prefix(second)
+        return f"{prefix}.{micro:06d}" if micro else prefix
+
+    def now(self) -> str:
+        """Return the current timestamp, reformatted only when the step changes."""
+        step = int(self.time_source() * 1_000_000) // self.resolution_us
+        if step != self._step:
+            self._step = step
+            self._iso = self.format(step * self.resolution_us)
+        return self._iso
+
+    def timestamps(self, n: int, jitter_sec: float = 0, rng=None) -> List[str]:
+        """Return timestamps for n events, optionally jittered by +/- jitter_sec."""
+        if not jitter_sec:
+            return [self.now()] * n
+        rng = rng or np.random.default_rng()
+        base = int(self.time_source() * 1_000_000)
+        offsets = rng.uniform(-jitter_sec, jitter_sec, n) * 1_000_000
+        steps = (base + offsets.astype(np.int64)) // self.resolution_us
+        # Only distinct steps are formatted; events share the cached strings.
+        unique_steps, inverse = np.unique(steps, return_inverse=True)
+        formatted = [
+            self.format(step * self.resolution_us) for step in unique_steps.tolist()
+        ]
+        return [formatted[i] for i in inverse.tolist()]
+
+
+class SimulatedClock:
+    """Settable seconds-since-epoch source for generating past event times."""
+
+    def __init__(self, now: float):
+        """Start the clock at now."""
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import signal
 import time
 from collections import defaultdict, deque
@@ -44,11 +45,21 @@ def count_event(event):
     stream = event.get("stream", "unknown")
     counters["total"] += 1
     counters[stream] += 1
-    size = len(str(event).encode("utf-8"))
+    size = len(json.dumps(event).encode("utf-8"))
     stream_bytes[stream] += size
     counters["bytes"] += size
 
 
+def count_encoded(encoded):
+    """Count a serialized batch using the real encoded record sizes."""
+    for stream, count, size in encoded.stream_stats:
+        stream = stream or "unknown"
+        counters["total"] += count
+        counters[stream] += count
+        stream_bytes[stream] += size
+        counters["bytes"] += size
+
+
 def create_metrics_panel(
     elapsed, rolling_eps, global_eps, rolling_bps, global_bps, total_events, total_data
 ):
@@ -1,26 +1,140 @@
+import asyncio
+import time
 from collections import defaultdict
 
+from src import instrumentation
 from src.emitter_registry import EmitterRegistry
+from src.event_batch import EventBatch
 
+# Each region buffers a mix of loose event dicts and columnar EventBatch parts.
 buffers = defaultdict(list)
+buffer_sizes = defaultdict(int)
 flush_counts = defaultdict(int)
+# Failed flushes per region and the events they lost.
+flush_errors = defaultdict(int)
+flush_dropped_events = defaultdict(int)
 emitter_registry = None
 
+# Emitters block once a region holds this many batches that are not yet flushed.
+max_buffered_batches = 4
+max_inflight_flushes = 2
+
+_flushers = {}
+_flush_wanted = defaultdict(asyncio.Event)
+_swapped = defaultdict(asyncio.Event)
+_inflight = defaultdict(set)
+# When the oldest event still in each region's buffer was added.
+_first_added = {}
+
+buffer_wait_stage = instrumentation.stage(instrumentation.BUFFER_WAIT)
+backpressure_stage = instrumentation.stage(instrumentation.BACKPRESSURE)
+
 
 def initialize_buffers(regions, config):
-    global emitter_registry
+    global emitter_registry, max_buffered_batches, max_inflight_flushes
     emitter_registry = EmitterRegistry(config)
+    max_buffered_batches = config.get("max_buffered_batches", 4)
+    max_inflight_flushes = config.get("max_inflight_flushes", 2)
     return {r["name"]: [] for r in regions}
 
 
 async def add_to_buffer(event, region, batch_size, flush_interval, counters):
+    if not buffer_sizes[region]:
+        _first_added[region] = time.perf_counter()
     buffers[region].append(event)
-    if len(buffers[region]) >= batch_size:
-        await emitter_registry.flush(region, buffers[region][:], counters)
+    buffer_sizes[region] += 1
+    await _after_add(region, batch_size, flush_interval, counters)
+
+
+async def add_batch_to_buffer(batch, region, batch_size, flush_interval, counters):
+    if not buffer_sizes[region]:
+        _first_added[region] = time.perf_counter()
+    buffers[region].append(batch)
+    buffer_sizes[region] += len(batch)
+    await _after_add(region, batch_size, flush_interval, counters)
+
+
+async def _after_add(region, batch_size, flush_interval, counters):
+    if region not in _flushers:
+        _flushers[region] = asyncio.create_task(
+            run_flusher(region, batch_size, flush_interval, counters)
+        )
+    if buffer_sizes[region] >= batch_size:
+        _flush_wanted[region].set()
+        # Backpressure: wait for the flusher to swap buffers when sinks fall behind.
+        if buffer_sizes[region] >= batch_size * max_buffered_batches:
+            start = time.perf_counter()
+            while buffer_sizes[region] >= batch_size * max_buffered_batches:
+                await _swapped[region].wait()
+            backpressure_stage.observe(time.perf_counter() - start, 0)
+
+
+def swap_buffer(region):
+    """Swap in an empty buffer and return the pending events as one batch."""
+    parts, buffers[region] = buffers[region], []
+    if buffer_sizes[region]:
+        buffer_wait_stage.observe(
+            time.perf_counter() - _first_added[region], buffer_sizes[region]
+        )
+    buffer_sizes[region] = 0
+    swapped, _swapped[region] = _swapped[region], asyncio.Event()
+    swapped.set()
+    return EventBatch.from_parts(parts)
+
+
+async def run_flusher(region, batch_size, flush_interval, counters):
+    """Flush a region when it reaches batch_size or every flush_interval seconds."""
+    slots = asyncio.Semaphore(max_inflight_flushes)
+    while True:
+        # asyncio.wait (unlike wait_for) never swallows a pending cancellation.
+        waiter = asyncio.ensure_future(_flush_wanted[region].wait())
+        try:
+            await asyncio.wait({waiter}, timeout=flush_interval)
+        finally:
+            waiter.cancel()
+        _flush_wanted[region].clear()
+        if not buffer_sizes[region]:
+            continue
+
+        # Sink I/O runs in its own task so emitters never wait on a round trip.
+        await slots.acquire()
+        task = asyncio.create_task(
+            _flush_batch(region, swap_buffer(region), counters, slots)
+        )
+        _inflight[region].add(task)
+        task.add_done_callback(_inflight[region].discard)
+
+
+async def _flush_batch(region, batch, counters, slots=None):
+    try:
+        await emitter_registry.flush(region, batch, counters)
         flush_counts[region] += 1
-        buffers[region].clear()
+    except Exception as e:
+        # Flushes run as detached tasks, so nothing else would see this error.
+        flush_errors[region] += 1
+        flush_dropped_events[region] += len(batch)
+        print(f"Error flushing {len(batch)} events for region {region}: {e}")
+    finally:
+        if slots is not None:
+            slots.release()
+
+
+async def flush_region(region, counters):
+    await _flush_batch(region, swap_buffer(region), counters)
 
 
-async def cleanup():
+async def cleanup(counters=None):
+    flushers = list(_flushers.values())
+    _flushers.clear()
+    for task in flushers:
+        task.cancel()
+    await asyncio.gather(*flushers, return_exceptions=True)
+    for tasks in list(_inflight.values()):
+        await asyncio.gather(*tasks, return_exceptions=True)
+    _flush_wanted.clear()
+    _swapped.clear()
     if emitter_registry:
+        for region in list(buffers):
+            if buffer_sizes[region]:
+                await flush_region(region, counters)
         await emitter_registry.close()
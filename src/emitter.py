@@ -1,9 +1,14 @@
 import asyncio
 import random
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
+from src import instrumentation
 from src.counters import counters
-from src.edge_buffer import add_to_buffer
+from src.edge_buffer import add_batch_to_buffer, add_to_buffer
+from src.event_batch import EventBatch
 from src.event_generators import (
     device_telemetry,
     model_telemetry,
@@ -12,7 +17,11 @@ from src.event_generators import (
     user_interactions,
     video_logs,
 )
-from src.stream_weights import weighted_random_choice
+from src.rate_controller import interval_scale, scaled_sleep
+from src.scheduler import TimingWheel
+from src.stream_weights import get_sampler, weighted_random_choice
+from src.user_pool import UserPool
+from src.utils import get_rng
 
 event_generators_map = {
     "video_logs": video_logs.generate_video_log,
@@ -23,9 +32,29 @@ event_generators_map = {
     "model_telemetry": model_telemetry.generate_model_telemetry,
 }
 
+batch_event_generators_map = {
+    "video_logs": video_logs.generate_video_log_batch,
+    "user_interactions": user_interactions.generate_user_interaction_batch,
+    "device_telemetry": device_telemetry.generate_device_telemetry_batch,
+    "recommendation_feedback": recommendation_feedback.generate_recommendation_feedback_batch,
+    "training_data": training_data.generate_training_data_batch,
+    "model_telemetry": model_telemetry.generate_model_telemetry_batch,
+}
+
 # Rate limiting semaphore to control concurrent emissions
 rate_limit_semaphore = None
 
+generate_stage = instrumentation.stage(instrumentation.GENERATE)
+
+
+def generate_event(user: Dict[str, Any], streams: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate one event of a weighted-random stream for a user."""
+    stream = weighted_random_choice(streams)
+    device_id = random.choice(user["devices"])
+    event = event_generators_map[stream](user["user_id"], device_id)
+    event["stream"] = stream
+    return event
+
 
 async def emit(
     user: Dict[str, Any], config: Dict[str, Any], buffers: Dict[str, List]
@@ -36,10 +65,9 @@ async def emit(
     while True:
         # Acquire rate limit semaphore
         async with rate_limit_semaphore:
-            stream = weighted_random_choice(config["streams"])
-            device_id = random.choice(user["devices"])
-            event = event_generators_map[stream](user["user_id"], device_id)
-            event["stream"] = stream
+            start = time.perf_counter()
+            event = generate_event(user, config["streams"])
+            generate_stage.observe(time.perf_counter() - start)
             await add_to_buffer(
                 event,
                 user["region"],
@@ -48,25 +76,207 @@ async def emit(
                 counters,
             )
 
-            # Calculate sleep time with jitter
-            interval = config["streams"][stream]["interval_sec"]
+            # Calculate sleep time with jitter; rate control scales both.
+            interval = config["streams"][event["stream"]]["interval_sec"]
             jitter = random.uniform(
                 -config["time_jitter_sec"], config["time_jitter_sec"]
             )
-            sleep_time = (
-                max(interval + jitter, 0.01)
-                if config.get("mode") == "safe"
-                else interval + jitter
+            floor = 0.01 if config.get("mode") == "safe" else 0
+
+            await scaled_sleep(interval + jitter, floor)
+
+
+def sample_streams(streams: Dict[str, Any], n: int) -> Tuple[List[str], np.ndarray]:
+    """Draw a stream index for each of n events according to the stream weights."""
+    sampler = get_sampler(streams)
+    indices = sampler.sample_indices(n)
+    return sampler.names, indices
+
+
+def generate_stream_batch(
+    users: UserPool, members: np.ndarray, stream: str, rng
+) -> EventBatch:
+    """Generate one event of stream for each of the given pool positions."""
+    columns = batch_event_generators_map[stream](
+        users.user_ids(members), users.device_ids(members, rng), len(members)
+    )
+    return EventBatch.from_columns(stream, columns)
+
+
+def expected_interval(streams: Dict[str, Any]) -> float:
+    """Return the weighted mean of the per-stream emit intervals."""
+    total_weight = sum(props["weight"] for props in streams.values())
+    return (
+        sum(props["weight"] * props["interval_sec"] for props in streams.values())
+        / total_weight
+    )
+
+
+async def emit_batch(
+    users: UserPool,
+    region: str,
+    config: Dict[str, Any],
+    buffers: Dict[str, List],
+) -> None:
+    """Emit one event per user per cycle for a group of users in one region."""
+    n = len(users)
+    rng = get_rng()
+
+    while True:
+        stream_names, chosen = sample_streams(config["streams"], n)
+
+        for stream_index, stream in enumerate(stream_names):
+            members = (chosen == stream_index).nonzero()[0]
+            if not len(members):
+                continue
+            start = time.perf_counter()
+            batch = generate_stream_batch(users, members, stream, rng)
+            generate_stage.observe(time.perf_counter() - start, len(members))
+            await add_batch_to_buffer(
+                batch,
+                region,
+                config["flush_batch_size"],
+                config["flush_interval_sec"],
+                counters,
             )
 
-            await asyncio.sleep(sleep_time)
+        # Each user fires once per cycle, so sleeping the mean stream interval
+        # keeps the long-run per-user rate of the per-user emitters.
+        jitter = random.uniform(-config["time_jitter_sec"], config["time_jitter_sec"])
+        interval = expected_interval(config["streams"]) + jitter
+        await scaled_sleep(interval, 0.01 if config.get("mode") == "safe" else 0)
+
+
+def group_users_by_region(
+    user_pool: UserPool, group_size: int
+) -> List[Tuple[str, UserPool]]:
+    """Split users into per-region groups of at most group_size users."""
+    return [
+        (region, user_pool[positions[i : i + group_size]])
+        for region, positions in user_pool.by_region().items()
+        for i in range(0, len(positions), group_size)
+    ]
+
+
+async def launch_batch_emitters(
+    user_pool: UserPool, config: Dict[str, Any], buffers: Dict[str, List]
+) -> None:
+    """Launch one batch emitter per group of same-region users."""
+    groups = group_users_by_region(user_pool, config.get("emitter_batch_size", 1000))
+    tasks = [
+        asyncio.create_task(emit_batch(users, region, config, buffers))
+        for region, users in groups
+    ]
+    await asyncio.gather(*tasks)
+
+
+async def emit_due_users(
+    due: np.ndarray,
+    chosen: np.ndarray,
+    stream_names: List[str],
+    users: UserPool,
+    config: Dict[str, Any],
+) -> None:
+    """Generate one event per due user, in bulk per (stream, region) group."""
+    rng = get_rng()
+    region_names = users.region_names
+    num_regions = len(region_names)
+    keys = chosen * num_regions + users.region_codes[due].astype(np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys, due = keys[order], due[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], bounds)).tolist()
+    ends = np.concatenate((bounds, [len(keys)])).tolist()
+
+    for start, end in zip(starts, ends):
+        key = int(keys[start])
+        stream = stream_names[key // num_regions]
+        region = region_names[key % num_regions]
+        members = due[start:end]
+        began = time.perf_counter()
+        batch = generate_stream_batch(users, members, stream, rng)
+        generate_stage.observe(time.perf_counter() - began, len(members))
+        await add_batch_to_buffer(
+            batch,
+            region,
+            config["flush_batch_size"],
+            config["flush_interval_sec"],
+            counters,
+        )
+
+
+async def drive_wheel(
+    indices: np.ndarray,
+    users: UserPool,
+    config: Dict[str, Any],
+    buffers: Dict[str, List],
+) -> None:
+    """Fire the users due on each tick of a timing wheel and reschedule them."""
+    rng = get_rng()
+    tick = config.get("scheduler_tick_sec", 0.01)
+    start = time.monotonic()
+    wheel = TimingWheel(tick, config.get("scheduler_slots", 1024), start)
+    # Spread first events over one mean interval rather than firing all at once.
+    wheel.schedule(
+        indices,
+        start + rng.uniform(0, expected_interval(config["streams"]), len(indices)),
+    )
+    floor = 0.01 if config.get("mode") == "safe" else 0
+    # Wheel time runs at 1 / interval_scale() of real time, so rate control
+    # also reaches users that are already scheduled.
+    clock = last = start
+
+    while True:
+        await asyncio.sleep(tick)
+        now = time.monotonic()
+        clock += (now - last) / interval_scale()
+        last = now
+        due = wheel.advance(clock)
+        if not len(due):
+            continue
+
+        stream_names, chosen = sample_streams(config["streams"], len(due))
+        await emit_due_users(due, chosen, stream_names, users, config)
+
+        # Same per-stream interval and jitter as the per-user emitters.
+        intervals = np.array(
+            [config["streams"][name]["interval_sec"] for name in stream_names]
+        )[chosen]
+        jitter = config["time_jitter_sec"]
+        delays = np.maximum(
+            intervals + rng.uniform(-jitter, jitter, len(due)),
+            floor / interval_scale(),
+        )
+        wheel.schedule(due, clock + delays)
+
+
+async def launch_wheel_emitters(
+    user_pool: UserPool, config: Dict[str, Any], buffers: Dict[str, List]
+) -> None:
+    """Launch a few timing-wheel drivers that each own a shard of the users."""
+    num_drivers = max(1, min(config.get("scheduler_drivers", 4), len(user_pool)))
+    indices = np.arange(len(user_pool), dtype=np.int64)
+    tasks = [
+        asyncio.create_task(
+            drive_wheel(indices[driver::num_drivers], user_pool, config, buffers)
+        )
+        for driver in range(num_drivers)
+    ]
+    await asyncio.gather(*tasks)
 
 
 async def launch_emitters(
-    user_pool: List[Dict[str, Any]], config: Dict[str, Any], buffers: Dict[str, List]
+    user_pool: UserPool, config: Dict[str, Any], buffers: Dict[str, List]
 ) -> None:
     """Launch emitters with rate limiting and batch processing."""
     global rate_limit_semaphore
+    if config.get("emitter_mode") == "batch":
+        await launch_batch_emitters(user_pool, config, buffers)
+        return
+    if config.get("emitter_mode") == "wheel":
+        await launch_wheel_emitters(user_pool, config, buffers)
+        return
+
     max_concurrent_emissions = min(100000, len(user_pool))  # Limit concurrent emissions
     rate_limit_semaphore = asyncio.Semaphore(max_concurrent_emissions)
 
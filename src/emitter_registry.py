@@ -1,8 +1,16 @@
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Union
 
-from src.counters import count_event
+from src import instrumentation
+from src.counters import count_encoded
+from src.encoder_pool import EncoderPool
+from src.event_batch import EventBatch
+from src.serializer import EncodedBatch
+from src.sink_queue import SinkQueue
 from src.sinks.factory import SinkFactory
 
+serialize_stage = instrumentation.stage(instrumentation.SERIALIZE)
+
 
 class EmitterRegistry:
     """Registry to initialize and manage sinks, and flush events to all sinks for a region."""
@@ -10,8 +18,10 @@ class EmitterRegistry:
     def __init__(self, config: Dict[str, Any]):
         """Initialize the registry and all sinks from config."""
         self.sinks: Dict[str, Any] = {}
+        self.queues: Dict[str, SinkQueue] = {}
         self.region_sinks: Dict[str, List[str]] = {}
         self.default_sinks: List[str] = []
+        self.encoder = EncoderPool.from_config(config.get("encoder"))
         self._init_sinks(config)
 
     def _init_sinks(self, config: Dict[str, Any]):
@@ -19,31 +29,56 @@ class EmitterRegistry:
         for sink_name, sink_conf in config.get("sinks", {}).items():
             sink_type = sink_conf["type"]
             self.sinks[sink_name] = SinkFactory.create_sink(sink_type, sink_conf)
+            self.queues[sink_name] = SinkQueue.from_config(
+                sink_name, self.sinks[sink_name], sink_conf
+            )
         self.region_sinks = config.get("region_sinks", {})
         self.default_sinks = self.region_sinks.get("default", list(self.sinks.keys()))
 
+    def get_sink_names_for_region(self, region: str) -> List[str]:
+        """Return the names of the configured sinks for the given region."""
+        sink_names = self.region_sinks.get(region, self.default_sinks)
+        return [name for name in sink_names if name in self.sinks]
+
     def get_sinks_for_region(self, region: str):
         """Return a list of sink instances for the given region."""
-        sink_names = self.region_sinks.get(region, self.default_sinks)
-        return [self.sinks[name] for name in sink_names if name in self.sinks]
+        return [self.sinks[name] for name in self.get_sink_names_for_region(region)]
 
     async def flush(
-        self, region: str, batch: List[Dict[str, Any]], counters: Dict[str, int]
+        self,
+        region: str,
+        batch: Union[EventBatch, List[Dict[str, Any]]],
+        counters: Dict[str, int],
     ):
         """Flush a batch to all sinks for the given region."""
-        # Count events before flushing
-        for event in batch:
-            count_event(event)
+        if not isinstance(batch, EventBatch):
+            batch = EventBatch.from_rows(batch)
+
+        # Encode once; counters and every sink share the encoded buffer
+        start = time.perf_counter()
+        encoded = await self.encoder.encode(batch)
+        serialize_stage.observe(time.perf_counter() - start, len(encoded))
+        count_encoded(encoded)
+
+        await self.publish(region, encoded)
 
-        # Send to all sinks for this region
-        for sink in self.get_sinks_for_region(region):
-            await sink.send(batch)
+    async def publish(self, region: str, encoded: EncodedBatch):
+        """Queue an already-encoded batch for every sink of the given region."""
+        # Hand off to each sink's queue; its worker task does the actual send
+        for name in self.get_sink_names_for_region(region):
+            await self.queues[name].put(encoded)
 
     async def close(self):
-        """Close all sinks managed by the registry."""
+        """Drain the sink queues, then close all sinks managed by the registry."""
+        for queue in self.queues.values():
+            await queue.close()
         for sink in self.sinks.values():
             await sink.close()
+        await self.encoder.close()
 
     def get_all_metrics(self) -> dict:
-        """Aggregate and return metrics from all sinks."""
-        return {name: sink.get_metrics() for name, sink in self.sinks.items()}
+        """Aggregate and return metrics from all sinks and their queues."""
+        return {
+            name: {**sink.get_metrics(), "queue": self.queues[name].get_metrics()}
+            for name, sink in self.sinks.items()
+        }
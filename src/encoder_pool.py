@@ -0,0 +1,130 @@
+"""
+Encoder pool for flushed batches.
+EmitterRegistry.flush hands each batch to the pool, which encodes it (and
+optionally gzips the payload) on a thread or process executor so the event
+loop keeps scheduling emitters meanwhile. A semaphore bounds the batches in
+flight; flushes beyond it wait, which pushes back through the edge buffers.
+"""
+
+import asyncio
+import gzip
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.event_batch import EventBatch
+from src.serializer import EncodedBatch, encode_batch
+
+POOL_KINDS = ("inline", "thread", "process")
+COMPRESSIONS = (None, "gzip")
+
+
+def encode_payload(
+    batch: EventBatch,
+    compression: Optional[str] = None,
+    compression_level: int = 1,
+    keep_batch: bool = True,
+) -> EncodedBatch:
+    """Encode a batch and, if asked, attach its compressed payload."""
+    encoded = encode_batch(batch)
+    if compression == "gzip":
+        encoded.compressed["gzip"] = gzip.compress(encoded.buffer, compression_level)
+    if not keep_batch:
+        # The caller still holds the batch; don't pickle it back from a worker.
+        encoded.batch = None
+    return encoded
+
+
+class EncoderPool:
+    """Encodes batches inline or on a bounded thread or process pool."""
+
+    def __init__(
+        self,
+        kind: str = "inline",
+        workers: int = 2,
+        max_inflight: int = 4,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+    ):
+        """Configure the pool; executors start on first use."""
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown encoder pool: {kind}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown encoder compression: {compression}")
+        self.kind = kind
+        self.workers = workers
+        self.max_inflight = max_inflight
+        self.compression = compression
+        self.compression_level = 1 if compression_level is None else compression_level
+        self.encoded_batches = 0
+        self.inflight = 0
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "EncoderPool":
+        """Build a pool from the top-level encoder config block."""
+        config = config or {}
+        return cls(
+            kind=config.get("pool", "inline"),
+            workers=config.get("workers", 2),
+            max_inflight=config.get("max_inflight", 4),
+            compression=config.get("compression"),
+            compression_level=config.get("compression_level"),
+        )
+
+    def _ensure_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Spawned workers don't inherit the loop's threads or sockets.
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="dataflux-encoder"
+                )
+        return self._executor
+
+    async def encode(self, batch: EventBatch) -> EncodedBatch:
+        """Encode a batch, waiting for a free slot if max_inflight are running."""
+        if self.kind == "inline":
+            self.encoded_batches += 1
+            return encode_payload(batch, self.compression, self.compression_level)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_inflight)
+        async with self._slots:
+            self.inflight += 1
+            try:
+                keep_batch = self.kind == "thread"
+                encoded = await asyncio.get_running_loop().run_in_executor(
+                    self._ensure_executor(),
+                    encode_payload,
+                    batch,
+                    self.compression,
+                    self.compression_level,
+                    keep_batch,
+                )
+            finally:
+                self.inflight -= 1
+        encoded.batch = batch
+        self.encoded_batches += 1
+        return encoded
+
+    async def close(self) -> None:
+        """Shut the executor down once running encodes finish."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True)
+
+    def get_metrics(self) -> dict:
+        """Return pool settings and counters."""
+        return {
+            "pool": self.kind,
+            "workers": self.workers if self.kind != "inline" else 0,
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "encoded_batches": self.encoded_batches,
+            "compression": self.compression,
+        }
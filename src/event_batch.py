@@ -0,0 +1,174 @@
+"""
+Columnar event container passed from the generators through the edge buffers to
+the sinks. Each stream's fields are stored as column arrays (NumPy arrays for
+numeric fields, lists for strings and nested values) instead of one dict per
+event.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+Column = Union[np.ndarray, List[Any]]
+
+
+def _column_values(column: Column) -> List[Any]:
+    """Return a column as a list of plain Python values."""
+    return column.tolist() if isinstance(column, np.ndarray) else column
+
+
+def _concat_columns(columns: List[Column]) -> Column:
+    """Concatenate same-field columns from several batches."""
+    if len(columns) == 1:
+        return columns[0]
+    if all(isinstance(column, np.ndarray) for column in columns):
+        return np.concatenate(columns)
+    values = []
+    for column in columns:
+        values.extend(_column_values(column))
+    return values
+
+
+class EventRow(Mapping):
+    """Lazy, read-only dict view of a single event in an EventBatch."""
+
+    __slots__ = ("_stream", "_columns", "_index")
+
+    def __init__(self, stream: Optional[str], columns: Dict[str, Column], index: int):
+        """Initialize the view over one row of a stream's columns."""
+        self._stream = stream
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._columns:
+            value = self._columns[key][self._index]
+            return (
+                value.tolist() if isinstance(value, (np.generic, np.ndarray)) else value
+            )
+        if key == "stream" and self._stream is not None:
+            return self._stream
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._columns
+        if self._stream is not None and "stream" not in self._columns:
+            yield "stream"
+
+    def __len__(self) -> int:
+        return len(self._columns) + (
+            self._stream is not None and "stream" not in self._columns
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize this row as a plain dict."""
+        return {key: self[key] for key in self}
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+
+class EventBatch:
+    """A batch of events stored as typed columns, grouped by stream."""
+
+    def __init__(
+        self, streams: Optional[Dict[Optional[str], Dict[str, Column]]] = None
+    ):
+        """Initialize the batch from a {stream: {field: column}} mapping."""
+        self.streams: Dict[Optional[str], Dict[str, Column]] = streams or {}
+        self.sizes: Dict[Optional[str], int] = {
+            stream: len(next(iter(columns.values()))) if columns else 0
+            for stream, columns in self.streams.items()
+        }
+        self._rows: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_columns(cls, stream: str, columns: Dict[str, Column]) -> "EventBatch":
+        """Create a single-stream batch from generator columns."""
+        return cls({stream: columns})
+
+    @classmethod
+    def from_rows(cls, events: List[Dict[str, Any]]) -> "EventBatch":
+        """Pivot event dicts into columns, grouping them by their "stream" field."""
+        grouped: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for event in events:
+            grouped.setdefault(event.get("stream"), []).append(event)
+
+        streams = {}
+        for stream, stream_events in grouped.items():
+            fields = {}
+            for event in stream_events:
+                fields.update(dict.fromkeys(event))
+            fields.pop("stream", None)
+            streams[stream] = {
+                field: [event.get(field) for event in stream_events] for field in fields
+            }
+        return cls(streams)
+
+    @classmethod
+    def concat(cls, batches: List["EventBatch"]) -> "EventBatch":
+        """Merge several batches into one, concatenating columns per stream."""
+        if len(batches) == 1:
+            return batches[0]
+        parts: Dict[Optional[str], List[Dict[str, Column]]] = {}
+        for batch in batches:
+            for stream, columns in batch.streams.items():
+                parts.setdefault(stream, []).append(columns)
+
+        streams = {}
+        for stream, stream_parts in parts.items():
+            fields = list(stream_parts[0])
+            if any(list(columns) != fields for columns in stream_parts[1:]):
+                # Differing schemas are re-pivoted row by row.
+                rows = [
+                    row.to_dict()
+                    for columns in stream_parts
+                    for row in cls({stream: columns}).rows()
+                ]
+                streams[stream] = cls.from_rows(rows).streams[stream]
+                continue
+            streams[stream] = {
+                field: _concat_columns([columns[field] for columns in stream_parts])
+                for field in fields
+            }
+        return cls(streams)
+
+    @classmethod
+    def from_parts(cls, parts: List[Any]) -> "EventBatch":
+        """Build one batch from a mix of EventBatch objects and loose event dicts."""
+        batches = [part for part in parts if isinstance(part, EventBatch)]
+        events = [part for part in parts if not isinstance(part, EventBatch)]
+        if events:
+            batches.append(cls.from_rows(events))
+        return cls.concat(batches) if batches else cls()
+
+    def __len__(self) -> int:
+        return sum(self.sizes.values())
+
+    def __iter__(self) -> Iterator[EventRow]:
+        return self.rows()
+
+    def rows(self) -> Iterator[EventRow]:
+        """Iterate over lazy row views, one stream at a time."""
+        for stream, columns in self.streams.items():
+            for index in range(self.sizes[stream]):
+                yield EventRow(stream, columns, index)
+
+    def as_columns(self) -> Dict[Optional[str], Dict[str, Column]]:
+        """Return the {stream: {field: column}} mapping without copying."""
+        return self.streams
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the batch as event dicts; cached for reuse across sinks."""
+        if self._rows is None:
+            rows = []
+            for stream, columns in self.streams.items():
+                fields = list(columns)
+                values = [_column_values(columns[field]) for field in fields]
+                if stream is not None and "stream" not in columns:
+                    fields.append("stream")
+                    values.append([stream] * self.sizes[stream])
+                rows.extend(dict(zip(fields, row)) for row in zip(*values))
+            self._rows = rows
+        return self._rows
@@ -0,0 +1,18 @@
+from . import (
+    device_telemetry,
+    model_telemetry,
+    recommendation_feedback,
+    training_data,
+    user_interactions,
+    video_logs,
+)
+
+# Per-stream column types, keyed by stream name.
+SCHEMAS = {
+    "video_logs": video_logs.SCHEMA,
+    "user_interactions": user_interactions.SCHEMA,
+    "device_telemetry": device_telemetry.SCHEMA,
+    "recommendation_feedback": recommendation_feedback.SCHEMA,
+    "training_data": training_data.SCHEMA,
+    "model_telemetry": model_telemetry.SCHEMA,
+}
@@ -1,6 +1,33 @@
 import random
 
-from ..utils import generate_ulid, now
+from ..utils import (
+    generate_ulid,
+    generate_ulids,
+    get_rng,
+    now,
+    rounded_uniform,
+    timestamps,
+    version_strings,
+)
+
+OPERATING_SYSTEMS = ["Android", "iOS", "Windows", "macOS", "Linux"]
+ERRORS = ["", "crash", "timeout", "memory_leak"]
+ERROR_WEIGHTS = [0.85, 0.05, 0.05, 0.05]
+NETWORK_TYPES = ["wifi", "4g", "5g", "ethernet"]
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "os": "string",
+    "app_version": "string",
+    "battery": "int64",
+    "temperature_c": "float64",
+    "errors": "string",
+    "network_type": "string",
+}
 
 
 def generate_device_telemetry(user_id, device_id):
@@ -9,12 +36,26 @@ def generate_device_telemetry(user_id, device_id):
         "user_id": user_id,
         "device_id": device_id,
         "timestamp": now(),
-        "os": random.choice(["Android", "iOS", "Windows", "macOS", "Linux"]),
+        "os": random.choice(OPERATING_SYSTEMS),
         "app_version": f"{random.randint(1, 5)}.{random.randint(0, 9)}.{random.randint(0, 9)}",
         "battery": random.randint(10, 100),
         "temperature_c": round(random.uniform(30.0, 45.0), 2),
-        "errors": random.choices(
-            ["", "crash", "timeout", "memory_leak"], weights=[0.85, 0.05, 0.05, 0.05]
-        )[0],
-        "network_type": random.choice(["wifi", "4g", "5g", "ethernet"]),
+        "errors": random.choices(ERRORS, weights=ERROR_WEIGHTS)[0],
+        "network_type": random.choice(NETWORK_TYPES),
+    }
+
+
+def generate_device_telemetry_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    return {
+        "event_id": generate_ulids(n),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "os": rng.choice(OPERATING_SYSTEMS, n).tolist(),
+        "app_version": version_strings(rng, n),
+        "battery": rng.integers(10, 101, n),
+        "temperature_c": rounded_uniform(rng, 30.0, 45.0, 2, n),
+        "errors": rng.choice(ERRORS, n, p=ERROR_WEIGHTS).tolist(),
+        "network_type": rng.choice(NETWORK_TYPES, n).tolist(),
     }
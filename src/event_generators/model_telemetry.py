@@ -1,6 +1,33 @@
 import random
 
-from ..utils import generate_ulid, now
+from ..utils import (
+    generate_ulid,
+    generate_ulids,
+    get_rng,
+    now,
+    prefixed,
+    rounded_uniform,
+    timestamps,
+    version_strings,
+)
+
+ERRORS = ["", "timeout", "memory_error", "inference_error"]
+ERROR_WEIGHTS = [0.85, 0.05, 0.05, 0.05]
+BATCH_SIZES = [1, 4, 8, 16, 32]
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "model_id": "string",
+    "version": "string",
+    "accuracy": "float64",
+    "latency_ms": "int64",
+    "errors": "string",
+    "batch_size": "int64",
+}
 
 
 def generate_model_telemetry(user_id, device_id):
@@ -13,9 +40,22 @@ def generate_model_telemetry(user_id, device_id):
         "version": f"{random.randint(1, 5)}.{random.randint(0, 9)}.{random.randint(0, 9)}",
         "accuracy": round(random.uniform(0.85, 0.99), 4),
         "latency_ms": random.randint(10, 1000),
-        "errors": random.choices(
-            ["", "timeout", "memory_error", "inference_error"],
-            weights=[0.85, 0.05, 0.05, 0.05],
-        )[0],
-        "batch_size": random.choice([1, 4, 8, 16, 32]),
+        "errors": random.choices(ERRORS, weights=ERROR_WEIGHTS)[0],
+        "batch_size": random.choice(BATCH_SIZES),
+    }
+
+
+def generate_model_telemetry_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    return {
+        "event_id": generate_ulids(n),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "model_id": prefixed("model_", rng.integers(1, 101, n)),
+        "version": version_strings(rng, n),
+        "accuracy": rounded_uniform(rng, 0.85, 0.99, 4, n),
+        "latency_ms": rng.integers(10, 1001, n),
+        "errors": rng.choice(ERRORS, n, p=ERROR_WEIGHTS).tolist(),
+        "batch_size": rng.choice(BATCH_SIZES, n),
     }
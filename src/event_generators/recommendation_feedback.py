@@ -1,10 +1,34 @@
 import random
 
-from ..utils import generate_ulid, now
+import numpy as np
+
+from ..utils import (
+    generate_ulid,
+    generate_ulids,
+    get_rng,
+    now,
+    prefixed,
+    timestamps,
+)
+
+ITEMS_SHOWN = 6
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "recommendation_id": "string",
+    "items_shown": ("list", "string"),
+    "item_clicked": "string",
+    "click_rank": "int64",
+    "engagement_time_sec": "int64",
+}
 
 
 def generate_recommendation_feedback(user_id, device_id):
-    items = [f"v{random.randint(1000, 9999)}" for _ in range(6)]
+    items = [f"v{random.randint(1000, 9999)}" for _ in range(ITEMS_SHOWN)]
     clicked = random.choice(items)
     return {
         "event_id": generate_ulid(),
@@ -17,3 +41,22 @@ def generate_recommendation_feedback(user_id, device_id):
         "click_rank": items.index(clicked) + 1,
         "engagement_time_sec": random.randint(5, 300),
     }
+
+
+def generate_recommendation_feedback_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    items = rng.integers(1000, 10000, (n, ITEMS_SHOWN))
+    clicked = items[np.arange(n), rng.integers(0, ITEMS_SHOWN, n)]
+    # Like items.index(clicked), the rank is the first position holding the item.
+    click_rank = (items == clicked[:, None]).argmax(axis=1) + 1
+    return {
+        "event_id": generate_ulids(n),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "recommendation_id": prefixed("rec_", rng.integers(100, 1000, n)),
+        "items_shown": [[f"v{item}" for item in row] for row in items.tolist()],
+        "item_clicked": prefixed("v", clicked),
+        "click_rank": click_rank,
+        "engagement_time_sec": rng.integers(5, 301, n),
+    }
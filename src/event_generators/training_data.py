@@ -1,6 +1,36 @@
 import random
 
-from ..utils import generate_ulid, now
+import numpy as np
+
+from ..utils import (
+    generate_ulid,
+    generate_ulids,
+    get_rng,
+    now,
+    prefixed,
+    random_hex,
+    timestamps,
+)
+
+SOURCES = ["web", "upload", "s3_dump", "api"]
+LANGUAGES = ["en", "es", "fr", "de", "zh"]
+LICENSES = ["open", "restricted", "unknown"]
+EMBEDDING_DIM = 128
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "doc_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "source": "string",
+    "language": "string",
+    "length_tokens": "int64",
+    "embedding_hash": "string",
+    "embedding": ("fixed_size_list", "float32", EMBEDDING_DIM),
+    "license": "string",
+}
 
 
 def generate_training_data(user_id, device_id):
@@ -10,10 +40,28 @@ def generate_training_data(user_id, device_id):
         "user_id": user_id,
         "device_id": device_id,
         "timestamp": now(),
-        "source": random.choice(["web", "upload", "s3_dump", "api"]),
-        "language": random.choice(["en", "es", "fr", "de", "zh"]),
+        "source": random.choice(SOURCES),
+        "language": random.choice(LANGUAGES),
         "length_tokens": random.randint(50, 2000),
-        "embedding_hash": generate_ulid()[:12],
-        "embedding": [round(random.random(), 4) for _ in range(128)],
-        "license": random.choice(["open", "restricted", "unknown"]),
+        "embedding_hash": random_hex(12),
+        "embedding": [round(random.random(), 4) for _ in range(EMBEDDING_DIM)],
+        "license": random.choice(LICENSES),
+    }
+
+
+def generate_training_data_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    embedding = np.rint(rng.random((n, EMBEDDING_DIM)) * 10000) / 10000
+    return {
+        "event_id": generate_ulids(n),
+        "doc_id": prefixed("doc_", rng.integers(100000, 1000000, n)),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "source": rng.choice(SOURCES, n).tolist(),
+        "language": rng.choice(LANGUAGES, n).tolist(),
+        "length_tokens": rng.integers(50, 2001, n),
+        "embedding_hash": random_hex(12, n),
+        "embedding": embedding,
+        "license": rng.choice(LICENSES, n).tolist(),
     }
@@ -1,6 +1,21 @@
 import random
 
-from ..utils import generate_ulid, now
+from ..utils import generate_ulid, generate_ulids, get_rng, now, timestamps
+
+EVENT_TYPES = ["click", "hover", "scroll", "like"]
+ELEMENTS = ["video_thumbnail", "play_button", "volume_control", "search_bar"]
+PAGES = ["/home", "/watch", "/search", "/profile"]
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "event_type": "string",
+    "element": "string",
+    "page": "string",
+}
 
 
 def generate_user_interaction(user_id, device_id):
@@ -9,9 +24,20 @@ def generate_user_interaction(user_id, device_id):
         "user_id": user_id,
         "device_id": device_id,
         "timestamp": now(),
-        "event_type": random.choice(["click", "hover", "scroll", "like"]),
-        "element": random.choice(
-            ["video_thumbnail", "play_button", "volume_control", "search_bar"]
-        ),
-        "page": random.choice(["/home", "/watch", "/search", "/profile"]),
+        "event_type": random.choice(EVENT_TYPES),
+        "element": random.choice(ELEMENTS),
+        "page": random.choice(PAGES),
+    }
+
+
+def generate_user_interaction_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    return {
+        "event_id": generate_ulids(n),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "event_type": rng.choice(EVENT_TYPES, n).tolist(),
+        "element": rng.choice(ELEMENTS, n).tolist(),
+        "page": rng.choice(PAGES, n).tolist(),
     }
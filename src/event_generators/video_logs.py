@@ -1,6 +1,30 @@
 import random
 
-from ..utils import generate_ulid, now
+from ..utils import (
+    generate_ulid,
+    generate_ulids,
+    get_rng,
+    now,
+    prefixed,
+    rounded_uniform,
+    timestamps,
+)
+
+ACTIONS = ["play", "pause", "seek", "buffer"]
+QUALITIES = ["480p", "720p", "1080p"]
+
+# Column types for columnar sinks, in field order.
+SCHEMA = {
+    "event_id": "string",
+    "user_id": "string",
+    "device_id": "string",
+    "timestamp": "timestamp",
+    "video_id": "string",
+    "action": "string",
+    "position": "float64",
+    "quality": "string",
+    "bandwidth_mbps": "float64",
+}
 
 
 def generate_video_log(user_id, device_id):
@@ -10,8 +34,23 @@ def generate_video_log(user_id, device_id):
         "device_id": device_id,
         "timestamp": now(),
         "video_id": f"vid_{random.randint(1000,9999)}",
-        "action": random.choice(["play", "pause", "seek", "buffer"]),
+        "action": random.choice(ACTIONS),
         "position": round(random.uniform(0, 3600), 2),
-        "quality": random.choice(["480p", "720p", "1080p"]),
+        "quality": random.choice(QUALITIES),
         "bandwidth_mbps": round(random.uniform(0.5, 5.0), 2),
     }
+
+
+def generate_video_log_batch(user_ids, device_ids, n):
+    rng = get_rng()
+    return {
+        "event_id": generate_ulids(n),
+        "user_id": user_ids,
+        "device_id": device_ids,
+        "timestamp": timestamps(n),
+        "video_id": prefixed("vid_", rng.integers(1000, 10000, n)),
+        "action": rng.choice(ACTIONS, n).tolist(),
+        "position": rounded_uniform(rng, 0, 3600, 2, n),
+        "quality": rng.choice(QUALITIES, n).tolist(),
+        "bandwidth_mbps": rounded_uniform(rng, 0.5, 5.0, 2, n),
+    }
@@ -0,0 +1,135 @@
+"""
+Record-and-replay event log.
+Recorded batches are stored as length-prefixed serializer frames in one log
+file, with a fixed-width index (offset, size, event count, recording time)
+beside it. Replay memory-maps the log and hands the stored NDJSON buffers
+straight to the sinks, with no decode or re-encode.
+"""
+
+import asyncio
+import mmap
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.serializer import EncodedBatch, pack_frame, unpack_frame
+
+MAGIC = b"DFLXLOG1"
+INDEX_DTYPE = np.dtype(
+    [("offset", "<u8"), ("size", "<u8"), ("count", "<u4"), ("time", "<f8")]
+)
+
+
+def index_path(path: str) -> str:
+    """Return the index file path for a log file."""
+    return path + ".idx"
+
+
+class EventLogWriter:
+    """Appends encoded batches to a log file and its index."""
+
+    def __init__(self, path: str):
+        """Create (or truncate) the log at path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.batch_count = 0
+        self.event_count = 0
+        self._log = open(path, "wb")
+        self._index = open(index_path(path), "wb")
+        self._log.write(MAGIC)
+        self._offset = len(MAGIC)
+        self._start = time.monotonic()
+
+    def append(self, encoded: EncodedBatch) -> None:
+        """Append one batch, stamped with the time since recording started."""
+        frame = pack_frame(encoded)
+        self._log.write(frame)
+        entry = np.array(
+            [(self._offset, len(frame), len(encoded), time.monotonic() - self._start)],
+            dtype=INDEX_DTYPE,
+        )
+        self._index.write(entry.tobytes())
+        self._offset += len(frame)
+        self.batch_count += 1
+        self.event_count += len(encoded)
+
+    def close(self) -> None:
+        """Flush and close the log and index files."""
+        self._log.close()
+        self._index.close()
+
+
+class EventLogReader:
+    """Memory-mapped, random-access view of a recorded event log."""
+
+    def __init__(self, path: str):
+        """Map the log at path and load its index."""
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a DataFlux event log: {path}")
+        self.index = np.fromfile(index_path(path), dtype=INDEX_DTYPE)
+        # A crash can leave index entries for frames that never hit the disk.
+        self.index = self.index[
+            self.index["offset"] + self.index["size"] <= len(self._map)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def event_count(self) -> int:
+        """Total events in the log."""
+        return int(self.index["count"].sum())
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and last recorded batch."""
+        if not len(self):
+            return 0.0
+        return float(self.index["time"][-1] - self.index["time"][0])
+
+    def offsets(self) -> np.ndarray:
+        """Recording time of each batch relative to the first one."""
+        return self.index["time"] - (self.index["time"][0] if len(self) else 0.0)
+
+    def frame(self, i: int) -> EncodedBatch:
+        """Return the i-th recorded batch."""
+        batch, _ = unpack_frame(self._map, int(self.index["offset"][i]))
+        return batch
+
+    def close(self) -> None:
+        """Unmap and close the log file."""
+        self._map.close()
+        self._file.close()
+
+
+async def replay(
+    reader: EventLogReader,
+    publish: Callable[[EncodedBatch], Awaitable[None]],
+    speed: Optional[float] = 1.0,
+    loops: int = 1,
+) -> int:
+    """Publish every recorded batch at speed x the recorded rate (None: max)."""
+    start = time.monotonic()
+    offsets = reader.offsets().tolist()
+    sent = 0
+    for loop_index in range(loops):
+        loop_offset = loop_index * reader.duration
+        for i in range(len(reader)):
+            if speed:
+                due = start + (loop_offset + offsets[i]) / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            encoded = reader.frame(i)
+            await publish(encoded)
+            sent += len(encoded)
+            if not speed:
+                # Let sink workers run even when no queue is full.
+                await asyncio.sleep(0)
+    return sent
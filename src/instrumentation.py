@@ -0,0 +1,219 @@
+"""
+Low-overhead pipeline instrumentation.
+Each pipeline stage keeps plain integer counters and a fixed-bucket latency
+histogram, so recording a timing is a bisect and a few additions. Readers take
+a snapshot of plain dicts instead of touching the live objects.
+"""
+
+import asyncio
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Upper bounds in seconds; a final overflow bucket catches everything slower.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Stage names; per-sink stages are named "<stage>:<sink>".
+GENERATE = "generate"
+BUFFER_WAIT = "buffer_wait"
+BACKPRESSURE = "backpressure"
+SERIALIZE = "serialize"
+QUEUE_WAIT = "queue_wait"
+SEND = "send"
+# Scheduling delay of the event loop itself; sampled, not a pipeline stage.
+LOOP_LAG = "loop_lag"
+
+# How often the loop-lag sampler asks to be woken.
+LOOP_LAG_INTERVAL_SEC = 0.01
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Initialize empty buckets for the given upper bounds."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Add one duration."""
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by interpolating within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[i - 1] if i else 0.0
+                # The overflow bucket has no upper bound; report its lower one.
+                if i == len(self.bounds):
+                    return lower
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def reset(self) -> None:
+        """Zero all buckets."""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Stage:
+    """Event and call counters plus a latency histogram for one pipeline stage."""
+
+    __slots__ = ("name", "events", "histogram")
+
+    def __init__(self, name: str):
+        """Initialize an empty stage."""
+        self.name = name
+        self.events = 0
+        self.histogram = Histogram()
+
+    def observe(self, seconds: float, events: int = 1) -> None:
+        """Record one call that handled events in seconds."""
+        self.events += events
+        self.histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the stage as plain data."""
+        histogram = self.histogram
+        return {
+            "events": self.events,
+            "calls": histogram.count,
+            "seconds": histogram.sum,
+            "buckets": list(histogram.counts),
+        }
+
+
+stages: Dict[str, Stage] = {}
+# Module of the sampled event loop ("asyncio" or "uvloop"), set by the monitor.
+loop_implementation: Optional[str] = None
+
+
+def stage(name: str, sink: Optional[str] = None) -> Stage:
+    """Return the stage for name (and sink), creating it on first use."""
+    key = f"{name}:{sink}" if sink else name
+    if key not in stages:
+        stages[key] = Stage(key)
+    return stages[key]
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Return every stage as plain data, safe to pickle or hand to another thread."""
+    return {key: value.snapshot() for key, value in list(stages.items())}
+
+
+def merge(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Sum stage snapshots from several processes."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for shot in snapshots:
+        for key, data in shot.items():
+            total = merged.setdefault(
+                key,
+                {
+                    "events": 0,
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "buckets": [0] * len(data["buckets"]),
+                },
+            )
+            total["events"] += data["events"]
+            total["calls"] += data["calls"]
+            total["seconds"] += data["seconds"]
+            total["buckets"] = [
+                a + b for a, b in zip(total["buckets"], data["buckets"])
+            ]
+    return merged
+
+
+def load(shot: Dict[str, Dict[str, Any]]) -> None:
+    """Replace the stages with a snapshot, e.g. the merged worker stages."""
+    for key, data in shot.items():
+        current = stage(key)
+        current.events = data["events"]
+        current.histogram.count = data["calls"]
+        current.histogram.sum = data["seconds"]
+        current.histogram.counts = list(data["buckets"])
+
+
+def reset() -> None:
+    """Zero every stage in place, keeping references held by the pipeline valid."""
+    for value in stages.values():
+        value.events = 0
+        value.histogram.reset()
+
+
+def summary(shot: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Per-stage throughput and latency percentiles (ms) from a snapshot."""
+    shot = snapshot() if shot is None else shot
+    result = {}
+    for key, data in shot.items():
+        histogram = Histogram()
+        histogram.counts = data["buckets"]
+        histogram.count = data["calls"]
+        histogram.sum = data["seconds"]
+        result[key] = {
+            "events": data["events"],
+            "calls": data["calls"],
+            "busy_sec": round(data["seconds"], 3),
+            "p50_ms": round(histogram.quantile(0.5) * 1000, 3),
+            "p99_ms": round(histogram.quantile(0.99) * 1000, 3),
+        }
+    return result
+
+
+async def sample_loop_lag(
+    histogram: Histogram, interval: float = LOOP_LAG_INTERVAL_SEC
+) -> None:
+    """Record how late the event loop wakes a sleeping task, until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - start - interval))
+
+
+def start_loop_monitor(interval: float = LOOP_LAG_INTERVAL_SEC) -> asyncio.Task:
+    """Sample this process's loop lag into the loop_lag stage."""
+    global loop_implementation
+    loop = asyncio.get_running_loop()
+    loop_implementation = type(loop).__module__.split(".")[0]
+    return asyncio.create_task(sample_loop_lag(stage(LOOP_LAG).histogram, interval))
+
+
+def loop_lag_summary(shot: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict:
+    """Loop-lag percentiles (ms) and the loop implementation that was sampled."""
+    lag = summary(shot).get(LOOP_LAG, {"calls": 0, "p50_ms": 0.0, "p99_ms": 0.0})
+    return {
+        "loop": loop_implementation,
+        "samples": lag["calls"],
+        "p50_ms": lag["p50_ms"],
+        "p99_ms": lag["p99_ms"],
+    }
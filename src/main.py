@@ -1,6 +1,8 @@
 import argparse
 import asyncio
 import sys
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 import uvicorn
@@ -8,13 +10,23 @@ import yaml
 from rich.console import Console
 from rich.table import Table
 
-from .counters import counters
+from . import backfill, bench, capacity, edge_buffer, instrumentation
+from .counters import count_encoded, counters
 from .edge_buffer import cleanup, initialize_buffers
 from .emitter import launch_emitters
-from .sinks.factory import get_sink
-from .user_pool import generate_user_device_pool
-from .utils import generate_user_device_pool
+from .emitter_registry import EmitterRegistry
+from .event_log import EventLogReader, replay
+from .metrics_exporter import metrics_port, start_metrics_exporter
+from .rate_controller import start_rate_controller
+from .user_pool import load_user_pool
+from .utils import configure_generation
 from .web.app import app as web_app
+from .workers import merge_worker_stats, start_workers, stop_workers
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
 
 
 def load_config(sink_type="mock"):
@@ -25,7 +37,7 @@ def load_config(sink_type="mock"):
 
     # Override sink configuration based on sink_type
     if sink_type == "mock":
-        config["sinks"] = {"mock": {"type": "mock"}}
+        config["sinks"] = {"mock": config["sinks"].get("mock", {"type": "mock"})}
         config["region_sinks"] = {"default": ["mock"]}
     elif sink_type == "kafka":
         config["sinks"] = {"kafka": config["sinks"]["kafka"]}
@@ -33,6 +45,12 @@ def load_config(sink_type="mock"):
     elif sink_type == "fastapi":
         config["sinks"] = {"fastapi": config["sinks"]["fastapi"]}
         config["region_sinks"] = {"default": ["fastapi"]}
+    elif sink_type == "file":
+        config["sinks"] = {"file": config["sinks"]["file"]}
+        config["region_sinks"] = {"default": ["file"]}
+    elif sink_type == "parquet":
+        config["sinks"] = {"parquet": config["sinks"]["parquet"]}
+        config["region_sinks"] = {"default": ["parquet"]}
     return config
 
 
@@ -69,92 +87,506 @@ async def update_metrics(console, table, config):
         await asyncio.sleep(1)
 
 
-async def main(worker_id, sink_type="mock", mode="normal"):
-    """Main entry point for DataFlux worker."""
-    # Load configuration
-    config_path = Path(__file__).parent / "config.yaml"
-    with open(config_path) as f:
-        config = yaml.safe_load(f)
-
-    # Override config with command line arguments
-    config["sink_type"] = sink_type
-    config["mode"] = mode
-
-    # Initialize sink
-    sink = get_sink(sink_type)
-    sink.initialize(config)
-
-    # Generate user pool
-    user_pool = generate_user_device_pool(config["emitters"], config["regions"])
-
-    # Initialize buffers
-    buffers = initialize_buffers(config["regions"], config)
-
-    try:
-        # Launch emitters
-        await launch_emitters(user_pool, config, buffers)
-    finally:
-        # Ensure sink is closed
-        await sink.close()
-
-
 def main():
     """Main entry point for the application."""
     parser = argparse.ArgumentParser(
         description="DataFlux - High-throughput data simulation framework"
     )
-    parser.add_argument("command", choices=["run", "help"], help="Command to execute")
+    parser.add_argument(
+        "command",
+        choices=[
+            "run",
+            "record",
+            "replay",
+            "receive",
+            "bench",
+            "capacity",
+            "backfill",
+            "help",
+        ],
+        help="Command to execute",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (defaults to 'workers' in config.yaml)",
+    )
+    parser.add_argument(
+        "--sink",
+        choices=["mock", "kafka", "fastapi", "file", "parquet"],
+        default="mock",
+        help="Sink to send events to (configured under 'sinks' in config.yaml)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="Port for the local HTTP receiver (receive command)",
+    )
+    parser.add_argument(
+        "--log",
+        default="recordings/events.dflog",
+        help="Event log written by record and read by replay",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Seconds to record (record) or to run the whole pipeline (bench, capacity)",
+    )
+    parser.add_argument(
+        "--speed",
+        default="1",
+        help="Replay speed as a multiple of the recorded rate, or 'max'",
+    )
+    parser.add_argument(
+        "--loops", type=int, default=1, help="Times to replay the log (replay command)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics on this port (run and replay commands)",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSON results file (bench: bench-results.json by default; capacity)",
+    )
+    parser.add_argument(
+        "--baseline",
+        default="bench-baseline.json",
+        help="Stored bench results to compare against",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this bench run as the new baseline",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="Run only bench cases whose name starts with this prefix",
+    )
+    parser.add_argument(
+        "--target-eps",
+        type=float,
+        default=None,
+        help="Rate to size replicas for (capacity command; default events_per_second)",
+    )
+    parser.add_argument(
+        "--start",
+        default=None,
+        help="Backfill window start, ISO date or datetime (UTC unless offset)",
+    )
+    parser.add_argument(
+        "--end",
+        default=None,
+        help="Backfill window end, ISO date or datetime (UTC unless offset)",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=["asyncio", "uvloop"],
+        default="asyncio",
+        help="Event loop implementation (uvloop falls back to asyncio if missing)",
+    )
     args = parser.parse_args()
+    use_event_loop(args.loop)
 
     if args.command == "help":
         parser.print_help()
         return
 
     if args.command == "run":
-        try:
-            asyncio.run(run_dataflux())
-        except (KeyboardInterrupt, asyncio.CancelledError):
-            print("\nShutting down gracefully...")
-            sys.exit(0)
+        run_command(args.workers, args.sink, args.metrics_port)
+
+    if args.command == "record":
+        record_command(args.log, args.duration)
+
+    if args.command == "replay":
+        speed = None if args.speed == "max" else float(args.speed)
+        replay_command(args.log, args.sink, speed, args.loops, args.metrics_port)
+
+    if args.command == "receive":
+        receive_command(args.port)
+
+    if args.command == "bench":
+        bench_command(
+            args.sink,
+            args.duration,
+            args.output or "bench-results.json",
+            args.baseline,
+            args.save_baseline,
+            args.only,
+        )
+
+    if args.command == "backfill":
+        if not args.start or not args.end:
+            parser.error("backfill needs --start and --end")
+        backfill_command(args.start, args.end, args.sink)
+
+    if args.command == "capacity":
+        capacity_command(args.sink, args.duration, args.target_eps, args.output)
+
+
+def use_event_loop(name="asyncio"):
+    """Install uvloop's loop policy if asked for and installed; return the loop used."""
+    if name != "uvloop":
+        return "asyncio"
+    if uvloop is None:
+        Console().print(
+            "[yellow]uvloop is not installed (pip install uvloop); "
+            "using the asyncio loop[/yellow]"
+        )
+        return "asyncio"
+    # Set before any loop starts; forked workers inherit the policy.
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
 
 
 def start_command():
     """Command to start the DataFlux application."""
+    run_command()
+
+
+def enable_metrics(config, port=None):
+    """Turn the Prometheus exporter on in config when a port flag is given."""
+    if port:
+        config["metrics"] = {**(config.get("metrics") or {}), "enabled": True}
+        config["metrics"]["port"] = port
+
+
+def run_command(workers=None, sink_type="mock", metrics_port=None):
+    """Run DataFlux in a single process or sharded across worker processes."""
+    config = load_config(sink_type)
+    enable_metrics(config, metrics_port)
+    workers = workers or config.get("workers", 1)
     try:
-        asyncio.run(run_dataflux())
+        if workers > 1:
+            run_workers(config, workers)
+        else:
+            asyncio.run(run_dataflux(config))
     except (KeyboardInterrupt, asyncio.CancelledError):
         print("\nShutting down gracefully...")
         sys.exit(0)
 
 
-async def run_dataflux():
-    """Run the DataFlux application."""
-    console = Console()
+def record_command(log_path, duration=None):
+    """Record generated batches to an event log instead of sending them."""
     config = load_config()
+    config["sinks"] = {
+        "event_log": {"type": "event_log", "event_log": {"path": log_path}}
+    }
+    config["region_sinks"] = {"default": ["event_log"]}
+    try:
+        asyncio.run(run_dataflux(config, duration))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nShutting down gracefully...")
+    print(f"Recorded events to {log_path}")
 
-    # Initialize components
-    user_pool = generate_user_device_pool(config["emitters"], config["regions"])
-    buffers = initialize_buffers(config["regions"], config)
 
-    # Start the web dashboard
+def replay_command(log_path, sink_type="mock", speed=1.0, loops=1, metrics_port=None):
+    """Replay a recorded event log into the configured sink."""
+    config = load_config(sink_type)
+    enable_metrics(config, metrics_port)
+    try:
+        asyncio.run(run_replay(config, log_path, speed, loops))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nShutting down gracefully...")
+        sys.exit(0)
+
+
+def receive_command(port=8080):
+    """Serve the bundled HTTP receiver so the fastapi sink can be tested locally."""
+    uvicorn.run("src.web.receiver:app", host="0.0.0.0", port=port, log_level="warning")
+
+
+def bench_command(
+    sink_type="mock",
+    duration=None,
+    output="bench-results.json",
+    baseline="bench-baseline.json",
+    save_baseline=False,
+    only=None,
+):
+    """Benchmark the hot paths, write JSON results and compare with a baseline."""
+    console = Console()
+    config = load_config(sink_type)
+    results = asyncio.run(
+        bench.run_benchmarks(config, pipeline_sec=duration or 10.0, only=only)
+    )
+    bench.save_results(results, output)
+
+    previous = bench.load_results(baseline)
+    changes = {}
+    if previous and not save_baseline:
+        changes = {row["case"]: row for row in bench.compare(results, previous)}
+
+    table = Table(title="DataFlux Benchmarks")
+    table.add_column("Case", style="cyan")
+    table.add_column("Events/sec", justify="right", style="green")
+    table.add_column("MB/sec", justify="right", style="green")
+    table.add_column("vs baseline", justify="right")
+    for case, row in results["results"].items():
+        change = changes.get(case)
+        if change is None:
+            delta = "-"
+        else:
+            style = "red" if change["regression"] else "white"
+            delta = f"[{style}]{change['change']:+.1%}[/{style}]"
+        table.add_row(
+            case,
+            f"{row['events_per_sec']:,.0f}",
+            f"{row['bytes_per_sec'] / 1024 / 1024:,.1f}",
+            delta,
+        )
+    console.print(table)
+    pipeline = results["results"].get("pipeline")
+    if pipeline:
+        console.print(
+            f"Pipeline loop lag: p50 {pipeline['loop_lag_p50_ms']:,.1f} ms, "
+            f"p99 {pipeline['loop_lag_p99_ms']:,.1f} ms"
+        )
+    console.print(f"[cyan]Wrote results to {output}[/cyan]")
+
+    if save_baseline:
+        bench.save_results(results, baseline)
+        console.print(f"[cyan]Saved baseline to {baseline}[/cyan]")
+        return
+    regressions = [case for case, row in changes.items() if row["regression"]]
+    if regressions:
+        console.print(
+            f"[red]Regressed against {baseline}: {', '.join(regressions)}[/red]"
+        )
+        sys.exit(1)
+
+
+def backfill_command(start, end, sink_type="mock"):
+    """Generate a past event-time window into the sink, as fast as possible."""
+    console = Console()
+    config = load_config(sink_type)
+    start_ts, end_ts = backfill.parse_time(start), backfill.parse_time(end)
+    if end_ts <= start_ts:
+        console.print("[red]--end must be after --start[/red]")
+        sys.exit(1)
+    shape = backfill.event_rate(config, len(load_user_pool(config)))
+    console.print(
+        f"[cyan]Backfilling {start} to {end} into {sink_type}: about "
+        f"{backfill.expected_events(shape, end_ts - start_ts):,} events[/cyan]"
+    )
+
+    began = last = time.monotonic()
+
+    def progress(event_time, generated):
+        nonlocal last
+        now = time.monotonic()
+        if now - last >= 2:
+            last = now
+            done = (event_time - start_ts) / (end_ts - start_ts)
+            console.print(
+                f"  {datetime.fromtimestamp(event_time, timezone.utc):%Y-%m-%d %H:%M:%S}"
+                f" ({done:.0%}) {generated:,} events"
+            )
+
+    try:
+        generated = asyncio.run(
+            backfill.run_backfill(config, start_ts, end_ts, progress)
+        )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nShutting down gracefully...")
+        sys.exit(0)
+    elapsed = time.monotonic() - began
+    console.print(
+        f"[green]Backfilled {generated:,} events in {elapsed:.1f}s "
+        f"({(end_ts - start_ts) / max(elapsed, 1e-9):,.0f}x real time)[/green]"
+    )
+
+
+def capacity_command(sink_type="mock", duration=None, target_eps=None, output=None):
+    """Probe each stage's open-loop ceiling and report the bottleneck."""
+    console = Console()
+    config = load_config(sink_type)
+    report = asyncio.run(
+        capacity.probe(config, duration_sec=duration or 10.0, target_eps=target_eps)
+    )
+    if output:
+        bench.save_results(report, output)
+
+    table = Table(title=f"DataFlux Capacity ({report['emitter_mode']} emitters)")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Ceiling events/sec", justify="right", style="green")
+    table.add_column("µs/event", justify="right")
+    table.add_column("Share", justify="right")
+    rows = {**report["stages"], capacity.SCHEDULING: None}
+    for name, stage in rows.items():
+        if name not in report["cost_us_per_event"]:
+            continue
+        style = "bold red" if name == report["bottleneck"] else "white"
+        table.add_row(
+            f"[{style}]{name}[/{style}]",
+            f"{stage['events_per_sec']:,.0f}" if stage else "-",
+            f"{report['cost_us_per_event'][name]:.2f}",
+            f"{report['share'][name]:.0%}",
+        )
+    end_to_end = report["end_to_end"]
+    table.add_row(
+        "end to end",
+        f"{end_to_end['events_per_sec']:,.0f}",
+        f"{1e6 / max(end_to_end['events_per_sec'], 1e-9):.2f}",
+        f"{end_to_end['bytes_per_sec'] / 1024 / 1024:,.1f} MB/s",
+    )
+    console.print(table)
+    for name, sink in report["sinks"].items():
+        console.print(f"  sink {name}: {sink['events_per_sec']:,.0f} events/sec")
+    console.print(
+        f"Loop lag under full load: p50 {end_to_end['loop_lag_p50_ms']:,.1f} ms, "
+        f"p99 {end_to_end['loop_lag_p99_ms']:,.1f} ms"
+    )
+    console.print(f"[bold]Bottleneck: {report['bottleneck']}[/bold]")
+    if "replicas" in report:
+        console.print(
+            f"[cyan]{report['target_eps']:,.0f} events/sec needs replicaCount: "
+            f"{report['replicas']} at {report['workers']} worker(s) per pod[/cyan]"
+        )
+    if output:
+        console.print(f"[cyan]Wrote report to {output}[/cyan]")
+
+
+def start_dashboard():
+    """Start the web dashboard as a background task."""
     uvicorn_config = uvicorn.Config(
         web_app, host="0.0.0.0", port=8000, log_level="info", reload=True
     )
     server = uvicorn.Server(uvicorn_config)
-    dashboard_task = asyncio.create_task(server.serve())
+    return asyncio.create_task(server.serve())
+
 
+def start_metrics(config, get_registry=lambda: None):
+    """Start the Prometheus exporter if config enables it; returns its task."""
+    port = metrics_port(config)
+    if not port:
+        return None
+    interval = (config.get("metrics") or {}).get("interval_sec", 1.0)
+    task = start_metrics_exporter(port, get_registry, interval)
+    Console().print(f"[cyan]Serving Prometheus metrics on port {port}[/cyan]")
+    return task
+
+
+async def stop_task(task):
+    """Cancel a background task and wait for it to finish."""
+    task.cancel()
     try:
-        await launch_emitters(user_pool, config, buffers)
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+async def run_dataflux(config=None, duration=None):
+    """Run the DataFlux application, optionally stopping after duration seconds."""
+    console = Console()
+    config = config or load_config()
+
+    # Initialize components
+    configure_generation(config)
+    user_pool = load_user_pool(config)
+    buffers = initialize_buffers(config["regions"], config)
+
+    # Start the web dashboard
+    dashboard_task = start_dashboard()
+    rate_task = start_rate_controller(config, len(user_pool))
+    metrics_task = start_metrics(config, lambda: edge_buffer.emitter_registry)
+    loop_task = instrumentation.start_loop_monitor()
+
+    try:
+        await asyncio.wait_for(launch_emitters(user_pool, config, buffers), duration)
+    except asyncio.TimeoutError:
+        console.print(f"[cyan]Stopped after {duration} seconds[/cyan]")
     except (KeyboardInterrupt, asyncio.CancelledError):
         console.print("\n[yellow]Shutting down gracefully...[/yellow]")
     finally:
-        dashboard_task.cancel()
-        try:
-            await dashboard_task
-        except asyncio.CancelledError:
-            pass
+        for task in (rate_task, metrics_task, loop_task):
+            if task:
+                await stop_task(task)
+        await stop_task(dashboard_task)
         await cleanup()
 
 
+async def run_replay(config, log_path, speed=1.0, loops=1):
+    """Stream a recorded event log into the configured sinks."""
+    console = Console()
+    reader = EventLogReader(log_path)
+    registry = EmitterRegistry(config)
+
+    async def publish(encoded):
+        count_encoded(encoded)
+        await registry.publish("default", encoded)
+
+    console.print(
+        f"[cyan]Replaying {reader.event_count * loops} events from {log_path} "
+        f"at {f'{speed}x' if speed else 'max speed'}[/cyan]"
+    )
+    dashboard_task = start_dashboard()
+    metrics_task = start_metrics(config, lambda: registry)
+    loop_task = instrumentation.start_loop_monitor()
+    start = time.monotonic()
+    try:
+        sent = await replay(reader, publish, speed, loops)
+        await registry.close()
+        elapsed = time.monotonic() - start
+        console.print(
+            f"[green]Replayed {sent} events in {elapsed:.1f}s "
+            f"({sent / max(elapsed, 1e-9):,.0f} events/sec)[/green]"
+        )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        console.print("\n[yellow]Shutting down gracefully...[/yellow]")
+        await registry.close()
+    finally:
+        if metrics_task:
+            await stop_task(metrics_task)
+        await stop_task(loop_task)
+        await stop_task(dashboard_task)
+        reader.close()
+
+
+def run_workers(config, num_workers):
+    """Shard the user pool across worker processes and supervise them."""
+    # Workers are forked before the parent starts its own event loop.
+    configure_generation(config)
+    user_pool = load_user_pool(config)
+    processes, stats_queue = start_workers(user_pool, config, num_workers)
+    snapshots = {}
+    try:
+        asyncio.run(supervise_workers(processes, stats_queue, config, snapshots))
+    finally:
+        # Workers flush on SIGTERM and report their final counters.
+        stop_workers(processes, stats_queue, snapshots)
+        Console().print(f"[cyan]Workers sent {counters['total']:,} events[/cyan]")
+
+
+async def supervise_workers(processes, stats_queue, config, snapshots=None):
+    """Serve the dashboard and merge worker counters until all workers exit."""
+    console = Console()
+    console.print(f"[cyan]Started {len(processes)} DataFlux workers[/cyan]")
+    dashboard_task = start_dashboard()
+    merge_task = asyncio.create_task(
+        merge_worker_stats(stats_queue, snapshots=snapshots)
+    )
+    # Worker stages (loop lag included) arrive merged; sink queues live in the
+    # workers. The parent's own loop only serves the dashboard, so it isn't sampled.
+    metrics_task = start_metrics(config)
+    try:
+        while any(process.is_alive() for process in processes):
+            await asyncio.sleep(1)
+        console.print("[red]All DataFlux workers have exited[/red]")
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        console.print("\n[yellow]Shutting down gracefully...[/yellow]")
+    finally:
+        if metrics_task:
+            await stop_task(metrics_task)
+        await stop_task(merge_task)
+        await stop_task(dashboard_task)
+
+
 if __name__ == "__main__":
     main()
@@ -1,36 +1,186 @@
 """
-Prometheus metrics exporter for DataFlux sinks.
-Exposes /metrics endpoint and updates metrics from the EmitterRegistry.
+Prometheus metrics exporter for DataFlux.
+An event-loop task publishes an immutable snapshot of the counters, pipeline
+stages, sink queues and rate controller; the exporter's HTTP thread only reads
+the latest snapshot, so scrapes never race the pipeline.
 """
 
-import threading
-import time
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from prometheus_client import Gauge, start_http_server
+from src import instrumentation
+from src.counters import counters, stream_bytes
+from src.rate_controller import rate_status
 
-from src.emitter_registry import EmitterRegistry
+try:
+    from prometheus_client import CollectorRegistry, start_http_server
+    from prometheus_client.core import (
+        CounterMetricFamily,
+        GaugeMetricFamily,
+        HistogramMetricFamily,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    CollectorRegistry = None
 
-# Define Prometheus metrics
-sink_success = Gauge("sink_success", "Number of successful events per sink", ["sink"])
-sink_fail = Gauge("sink_fail", "Number of failed events per sink", ["sink"])
-sink_flush_latency = Gauge("sink_flush_latency", "Flush latency per sink", ["sink"])
+# Replaced wholesale by publish_snapshot(); never mutated in place.
+_latest: Dict[str, Any] = {}
 
+# Queue counters exported as Prometheus counters, by queue metrics key.
+SINK_COUNTERS = {
+    "sent_events": "Events delivered to the sink",
+    "sent_batches": "Batches delivered to the sink",
+    "dropped_events": "Events dropped by the sink queue overflow policy",
+    "spilled_batches": "Batches spilled to disk by the sink queue",
+    "error_count": "Batches the sink failed to send",
+}
 
-def update_metrics(registry: EmitterRegistry, interval: int = 5):
-    """Periodically update Prometheus metrics from the registry."""
+
+def build_snapshot(registry=None) -> Dict[str, Any]:
+    """Collect everything the exporter serves into plain data."""
+    return {
+        "counters": dict(counters),
+        "stream_bytes": dict(stream_bytes),
+        "stages": instrumentation.snapshot(),
+        "sinks": registry.get_all_metrics() if registry else {},
+        "rate": rate_status(),
+    }
+
+
+def publish_snapshot(registry=None) -> None:
+    """Publish a fresh snapshot for the exporter thread."""
+    global _latest
+    _latest = build_snapshot(registry)
+
+
+def latest_snapshot() -> Dict[str, Any]:
+    """Return the most recently published snapshot."""
+    return _latest
+
+
+def cumulative_buckets(stage: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """Prometheus (le, cumulative count) pairs for a stage snapshot."""
+    bounds = [str(bound) for bound in instrumentation.LATENCY_BUCKETS] + ["+Inf"]
+    cumulative, buckets = 0, []
+    for bound, count in zip(bounds, stage["buckets"]):
+        cumulative += count
+        buckets.append((bound, cumulative))
+    return buckets
+
+
+class DataFluxCollector:
+    """Prometheus collector that renders the latest published snapshot."""
+
+    def collect(self):
+        """Yield metric families for one scrape."""
+        shot = _latest
+        if not shot:
+            return
+
+        events = CounterMetricFamily(
+            "dataflux_events", "Events generated per stream", labels=["stream"]
+        )
+        data = CounterMetricFamily(
+            "dataflux_bytes", "Encoded bytes generated per stream", labels=["stream"]
+        )
+        for stream, count in shot["counters"].items():
+            if stream not in ("total", "bytes"):
+                events.add_metric([stream], count)
+        for stream, size in shot["stream_bytes"].items():
+            data.add_metric([stream], size)
+        yield events
+        yield data
+
+        stage_events = CounterMetricFamily(
+            "dataflux_stage_events",
+            "Events handled by each pipeline stage",
+            labels=["stage", "sink"],
+        )
+        stage_seconds = HistogramMetricFamily(
+            "dataflux_stage_seconds",
+            "Time spent per call in each pipeline stage",
+            labels=["stage", "sink"],
+        )
+        loop_lag = HistogramMetricFamily(
+            "dataflux_event_loop_lag_seconds",
+            "How late the event loop woke a sleeping task",
+        )
+        for key, stage in shot["stages"].items():
+            if key == instrumentation.LOOP_LAG:
+                loop_lag.add_metric([], cumulative_buckets(stage), stage["seconds"])
+                continue
+            name, _, sink = key.partition(":")
+            stage_events.add_metric([name, sink], stage["events"])
+            stage_seconds.add_metric(
+                [name, sink], cumulative_buckets(stage), stage["seconds"]
+            )
+        yield stage_events
+        yield stage_seconds
+        yield loop_lag
+
+        for key, description in SINK_COUNTERS.items():
+            family = CounterMetricFamily(
+                f"dataflux_sink_{key.replace('_count', 's')}",
+                description,
+                labels=["sink"],
+            )
+            for sink, metrics in shot["sinks"].items():
+                family.add_metric([sink], metrics["queue"][key])
+            yield family
+        depth = GaugeMetricFamily(
+            "dataflux_sink_queue_depth", "Batches waiting per sink", labels=["sink"]
+        )
+        lag = GaugeMetricFamily(
+            "dataflux_sink_queue_lag_seconds",
+            "Age of the oldest batch waiting per sink",
+            labels=["sink"],
+        )
+        for sink, metrics in shot["sinks"].items():
+            depth.add_metric([sink], metrics["queue"]["depth"])
+            lag.add_metric([sink], metrics["queue"]["lag_sec"])
+        yield depth
+        yield lag
+
+        rate = shot["rate"]
+        if rate:
+            yield GaugeMetricFamily(
+                "dataflux_target_eps",
+                "Target events per second",
+                value=rate["target_eps"],
+            )
+            yield GaugeMetricFamily(
+                "dataflux_achieved_eps",
+                "Events per second measured by the rate controller",
+                value=rate["achieved_eps"],
+            )
+
+
+async def publish_metrics(
+    get_registry: Callable[[], Any] = lambda: None, interval: float = 1.0
+) -> None:
+    """Publish a snapshot every interval; runs on the pipeline's event loop."""
     while True:
-        metrics = registry.get_all_metrics()
-        for name, m in metrics.items():
-            sink_success.labels(sink=name).set(m.get("success_count", 0))
-            sink_fail.labels(sink=name).set(m.get("fail_count", 0))
-            latencies = m.get("latencies", [])
-            avg_latency = sum(latencies) / len(latencies) if latencies else 0
-            sink_flush_latency.labels(sink=name).set(avg_latency)
-        time.sleep(interval)
-
-
-def start_metrics_exporter(registry: EmitterRegistry, port: int = 9100):
-    """Start the Prometheus metrics HTTP server and background updater."""
-    start_http_server(port)
-    t = threading.Thread(target=update_metrics, args=(registry,), daemon=True)
-    t.start()
+        publish_snapshot(get_registry())
+        await asyncio.sleep(interval)
+
+
+def start_metrics_exporter(
+    port: int = 9100,
+    get_registry: Callable[[], Any] = lambda: None,
+    interval: float = 1.0,
+) -> asyncio.Task:
+    """Serve /metrics on port and start publishing snapshots for it."""
+    if CollectorRegistry is None:
+        raise RuntimeError(
+            "The Prometheus exporter requires prometheus_client "
+            "(pip install prometheus_client)"
+        )
+    registry = CollectorRegistry()
+    registry.register(DataFluxCollector())
+    start_http_server(port, registry=registry)
+    return asyncio.create_task(publish_metrics(get_registry, interval))
+
+
+def metrics_port(config: Dict[str, Any]) -> Optional[int]:
+    """Return the exporter port if config enables the exporter, else None."""
+    metrics_config = config.get("metrics", {}) or {}
+    return metrics_config.get("port", 9100) if metrics_config.get("enabled") else None
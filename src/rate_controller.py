@@ -0,0 +1,313 @@
+"""
+Closed-loop rate control.
+A load shape gives the target events per second over time; the controller
+compares it with the rate measured from the counters and scales every emitter
+sleep interval up or down until the two agree.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from rich.console import Console
+
+from src import edge_buffer
+from src.counters import counters
+
+console = Console()
+
+# Multiplier on every emitter interval; below 1 emits faster, above 1 slower.
+_interval_scale = 1.0
+_controller = None
+# Longest single sleep, so long sleeps pick up scale changes part way through.
+_sleep_slice = 1.0
+
+LoadShape = Callable[[float], float]
+
+# Periods without the rate rising after which speeding up counts as futile.
+STALL_PERIODS = 3
+
+
+def interval_scale() -> float:
+    """Return the current emitter interval multiplier."""
+    return _interval_scale
+
+
+async def scaled_sleep(delay: float, floor: float = 0.0) -> None:
+    """Sleep delay * interval_scale(), following scale changes mid-sleep."""
+    remaining = delay
+    while True:
+        scale = _interval_scale
+        if _controller is None or remaining * scale <= _sleep_slice:
+            await asyncio.sleep(max(remaining * scale, floor))
+            return
+        await asyncio.sleep(_sleep_slice)
+        remaining -= _sleep_slice / scale
+
+
+def generated_events() -> int:
+    """Events counted at flush plus those still waiting in the region buffers."""
+    # Counters only move when a region flushes; adding the buffered events keeps
+    # the measured rate smooth even with long flush intervals.
+    return counters["total"] + sum(edge_buffer.buffer_sizes.values())
+
+
+def constant_shape(eps: float) -> LoadShape:
+    """Fixed target rate."""
+    return lambda elapsed: eps
+
+
+def ramp_shape(from_eps: float, to_eps: float, duration_sec: float) -> LoadShape:
+    """Linear ramp from from_eps to to_eps, then hold."""
+
+    def shape(elapsed):
+        progress = min(elapsed / duration_sec, 1.0) if duration_sec > 0 else 1.0
+        return from_eps + (to_eps - from_eps) * progress
+
+    return shape
+
+
+def step_shape(steps) -> LoadShape:
+    """Piecewise-constant rate from [at_sec, eps] pairs."""
+    steps = sorted((float(at), float(eps)) for at, eps in steps)
+
+    def shape(elapsed):
+        current = steps[0][1]
+        for at, eps in steps:
+            if elapsed < at:
+                break
+            current = eps
+        return current
+
+    return shape
+
+
+def spike_shape(
+    base_eps: float,
+    spike_eps: float,
+    at_sec: float,
+    duration_sec: float,
+    every_sec: Optional[float] = None,
+) -> LoadShape:
+    """Base rate with a spike of duration_sec at at_sec, optionally repeating."""
+
+    def shape(elapsed):
+        offset = elapsed - at_sec
+        if offset < 0:
+            return base_eps
+        if every_sec:
+            offset %= every_sec
+        return spike_eps if offset < duration_sec else base_eps
+
+    return shape
+
+
+def diurnal_shape(
+    min_eps: float, max_eps: float, period_sec: float = 86400, peak_at_sec: float = 0
+) -> LoadShape:
+    """Cosine day curve that peaks at peak_at_sec and bottoms out half a period later."""
+
+    def shape(elapsed):
+        phase = 2 * math.pi * (elapsed - peak_at_sec) / period_sec
+        return min_eps + (max_eps - min_eps) * (1 + math.cos(phase)) / 2
+
+    return shape
+
+
+def build_shape(config: Dict[str, Any]) -> Optional[LoadShape]:
+    """Build the load shape from config, or None if no target rate is set."""
+    rate_config = config.get("rate_control", {}) or {}
+    shape = rate_config.get("shape", "constant")
+    base = config.get("events_per_second")
+    if shape == "constant":
+        return constant_shape(base) if base else None
+    if shape == "ramp":
+        to_eps = rate_config.get("to_eps")
+        if to_eps is None:
+            to_eps = base
+        if to_eps is None:
+            raise ValueError(
+                "ramp load shape needs rate_control.to_eps or events_per_second"
+            )
+        return ramp_shape(
+            rate_config.get("from_eps", 0), to_eps, rate_config["duration_sec"]
+        )
+    if shape == "step":
+        return step_shape(rate_config["steps"])
+    if shape == "spike":
+        if base is None:
+            raise ValueError(
+                "spike load shape needs events_per_second as its base rate"
+            )
+        return spike_shape(
+            base,
+            rate_config["spike_eps"],
+            rate_config.get("at_sec", 0),
+            rate_config["duration_sec"],
+            rate_config.get("every_sec"),
+        )
+    if shape == "diurnal":
+        return diurnal_shape(
+            rate_config["min_eps"],
+            rate_config["max_eps"],
+            rate_config.get("period_sec", 86400),
+            rate_config.get("peak_at_sec", 0),
+        )
+    raise ValueError(f"Unknown load shape: {shape}")
+
+
+class RateController:
+    """Feedback loop that scales emitter intervals to hold a target rate."""
+
+    def __init__(
+        self,
+        shape: LoadShape,
+        nominal_eps: float,
+        tolerance: float = 0.05,
+        gain: float = 0.6,
+        patience: int = 10,
+        min_scale: float = 1e-4,
+        max_scale: float = 1e4,
+    ):
+        """Initialize from the load shape and the rate emitters reach at scale 1."""
+        self.shape = shape
+        self.nominal_eps = nominal_eps
+        self.tolerance = tolerance
+        self.gain = gain
+        self.patience = patience
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale = self._clamp(nominal_eps / max(shape(0), 1e-9))
+        self.target_eps = shape(0)
+        self.achieved_eps = 0.0
+        self.unreachable = False
+        self._short_periods = 0
+        self._recent = deque(maxlen=STALL_PERIODS)
+        # Rate the emitters reach at scale 1, learned while the target is met.
+        self._unit_eps = nominal_eps
+
+    def _clamp(self, scale: float) -> float:
+        return min(max(scale, self.min_scale), self.max_scale)
+
+    def update(self, achieved_eps: float, elapsed: float) -> float:
+        """Fold in one rate measurement and return the new interval scale."""
+        self.achieved_eps = achieved_eps
+        target = self.target_eps
+        self.target_eps = self.shape(elapsed)
+        if target <= 0 or self.target_eps <= 0:
+            # A zero target has no rate to hold; wait for a non-zero one.
+            return self.scale
+
+        short = achieved_eps < target * (1 - self.tolerance)
+        self._short_periods = self._short_periods + 1 if short else 0
+        # Falling short only means saturation once speeding up stops raising
+        # the rate; while it still climbs the emitters are just catching up.
+        stalled = False
+        if len(self._recent) == STALL_PERIODS:
+            old_scale, old_achieved = self._recent[0]
+            sped_up = self.scale < old_scale * (1 - self.tolerance)
+            sped_up = sped_up or self.scale <= self.min_scale
+            stalled = sped_up and achieved_eps < old_achieved * (1 + self.tolerance)
+        self._recent.append((self.scale, achieved_eps))
+        if self._short_periods >= self.patience and stalled and not self.unreachable:
+            self.unreachable = True
+            console.print(
+                f"[red]Target rate {target:,.0f} events/sec is unreachable; "
+                f"achieving {achieved_eps:,.0f} events/sec[/red]"
+            )
+        elif self.unreachable and not short:
+            self.unreachable = False
+            console.print(
+                f"[green]Holding target rate {target:,.0f} events/sec[/green]"
+            )
+
+        if not short:
+            self._unit_eps = achieved_eps * self.scale
+
+        # Rate is inversely proportional to the interval scale; correct part of
+        # the error each period, and carry over changes in the target directly.
+        factor = (achieved_eps / target) ** self.gain * (target / self.target_eps)
+        factor = min(max(factor, 0.5), 2.0)
+        scale = self._clamp(self.scale * factor)
+        if self.unreachable and achieved_eps > 0:
+            # Ask for at most twice the achieved rate so the emitters do not wind
+            # up while saturated, yet still speed up if capacity comes back.
+            scale = max(scale, self._clamp(self._unit_eps / (2 * achieved_eps)))
+        self.scale = scale
+        return self.scale
+
+    def status(self) -> Dict[str, Any]:
+        """Return the target and achieved rates and whether the target is met."""
+        return {
+            "target_eps": round(self.target_eps, 1),
+            "achieved_eps": round(self.achieved_eps, 1),
+            "interval_scale": self.scale,
+            "unreachable": self.unreachable,
+        }
+
+    async def run(self, interval: float = 1.0) -> None:
+        """Measure the counted rate every interval and adjust the emitters."""
+        global _interval_scale, _sleep_slice
+        _interval_scale = self.scale
+        _sleep_slice = interval
+        start = time.monotonic()
+        # The first period only sees every emitter's initial burst; skip it.
+        await asyncio.sleep(interval)
+        last_time, last_total = time.monotonic(), generated_events()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            total = generated_events()
+            achieved = (total - last_total) / (now - last_time)
+            last_total, last_time = total, now
+            _interval_scale = self.update(achieved, now - start)
+
+
+def mean_delay(interval: float, jitter: float) -> float:
+    """Mean of max(interval + uniform(-jitter, jitter), 0)."""
+    low, high = interval - jitter, interval + jitter
+    if low >= 0:
+        return interval
+    # Negative delays fire at once, so only the positive part adds up.
+    return max(high, 0) ** 2 / (2 * (high - low))
+
+
+def nominal_rate(config: Dict[str, Any], num_users: int) -> float:
+    """Events per second num_users produce at the configured intervals (scale 1)."""
+    # Emitters fire each user once per mean stream delay.
+    streams = config["streams"].values()
+    jitter = config.get("time_jitter_sec", 0)
+    mean_interval = sum(
+        s["weight"] * mean_delay(s["interval_sec"], jitter) for s in streams
+    ) / sum(s["weight"] for s in streams)
+    return num_users / mean_interval
+
+
+def start_rate_controller(
+    config: Dict[str, Any], num_users: int, share: float = 1.0
+) -> Optional[asyncio.Task]:
+    """Start rate control if config sets a target; share is this process's part."""
+    global _controller, _interval_scale
+    shape = build_shape(config)
+    if shape is None or not num_users:
+        _controller = None
+        _interval_scale = 1.0
+        return None
+
+    rate_config = config.get("rate_control", {}) or {}
+    _controller = RateController(
+        lambda elapsed: shape(elapsed) * share,
+        nominal_rate(config, num_users),
+        tolerance=rate_config.get("tolerance", 0.05),
+    )
+    _interval_scale = _controller.scale
+    return asyncio.create_task(
+        _controller.run(rate_config.get("control_interval_sec", 1.0))
+    )
+
+
+def rate_status() -> Optional[Dict[str, Any]]:
+    """Return the running controller's status, or None when rate control is off."""
+    return _controller.status() if _controller else None
@@ -0,0 +1,67 @@
+"""
+Hashed timing wheel used by the wheel emitter mode to decide which users fire
+on each tick, instead of keeping one sleeping coroutine per user.
+"""
+
+import numpy as np
+
+
+class TimingWheel:
+    """Hashed timing wheel of user indices keyed by their next fire tick."""
+
+    def __init__(self, tick_sec: float = 0.01, num_slots: int = 1024, start: float = 0):
+        """Initialize an empty wheel whose first tick covers the start time."""
+        self.tick_sec = tick_sec
+        self.num_slots = num_slots
+        self.current_tick = int(start // tick_sec)
+        self.slots = [[] for _ in range(num_slots)]
+        self.size = 0
+
+    def schedule(self, indices: np.ndarray, fire_times: np.ndarray) -> None:
+        """Schedule each index to fire at the matching time (seconds)."""
+        if not len(indices):
+            return
+        ticks = np.maximum(
+            (fire_times // self.tick_sec).astype(np.int64), self.current_tick
+        )
+        slots = ticks % self.num_slots
+        order = np.argsort(slots, kind="stable")
+        slots, ticks, indices = slots[order], ticks[order], indices[order]
+        bounds = np.flatnonzero(np.diff(slots)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(slots)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            self.slots[slots[start]].append((indices[start:end], ticks[start:end]))
+        self.size += len(indices)
+
+    def advance(self, now: float) -> np.ndarray:
+        """Return all indices due at or before now and move the wheel forward."""
+        target_tick = int(now // self.tick_sec)
+        if target_tick < self.current_tick:
+            return np.empty(0, dtype=np.int64)
+
+        # After a stall longer than one rotation, each slot is visited only once.
+        first_tick = max(self.current_tick, target_tick - self.num_slots + 1)
+        due = []
+        for tick in range(first_tick, target_tick + 1):
+            slot = self.slots[tick % self.num_slots]
+            if not slot:
+                continue
+            remaining = []
+            for indices, ticks in slot:
+                fire = ticks <= target_tick
+                if fire.all():
+                    due.append(indices)
+                elif fire.any():
+                    due.append(indices[fire])
+                    remaining.append((indices[~fire], ticks[~fire]))
+                else:
+                    remaining.append((indices, ticks))
+            self.slots[tick % self.num_slots] = remaining
+        self.current_tick = target_tick + 1
+
+        if not due:
+            return np.empty(0, dtype=np.int64)
+        fired = np.concatenate(due)
+        self.size -= len(fired)
+        return fired
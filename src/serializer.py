@@ -0,0 +1,162 @@
+"""
+Serialize-once stage between the edge buffers and the sinks.
+A flushed batch is encoded a single time into one NDJSON bytes buffer with
+per-record offsets; byte counters and every sink for the region reuse it.
+"""
+
+import json
+import struct
+from json.encoder import encode_basestring_ascii
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.event_batch import Column, EventBatch
+
+StreamStats = List[Tuple[Optional[str], int, int]]
+
+# Binary frame: stats length, buffer length, JSON stream stats, NDJSON buffer.
+FRAME_HEADER = struct.Struct("<IQ")
+
+
+class EncodedBatch:
+    """NDJSON records in one shared buffer, with offsets and per-stream sizes."""
+
+    def __init__(
+        self,
+        buffer: bytes,
+        offsets: np.ndarray,
+        stream_stats: StreamStats,
+        batch: Optional[EventBatch] = None,
+    ):
+        """Initialize from a buffer, n + 1 record start offsets and stream stats."""
+        self.buffer = buffer
+        self.offsets = offsets
+        self.stream_stats = stream_stats
+        self.batch = batch
+        # Pre-compressed copies of buffer by codec, filled in by the encoder pool.
+        self.compressed: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes, stream_stats: StreamStats) -> "EncodedBatch":
+        """Rebuild a batch from its NDJSON buffer, recomputing record offsets."""
+        newlines = np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8) == 10)
+        offsets = np.zeros(len(newlines) + 1, dtype=np.int64)
+        offsets[1:] = newlines + 1
+        return cls(buffer, offsets, stream_stats)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        """Total JSON payload bytes, excluding the newline separators."""
+        return len(self.buffer) - len(self)
+
+    def record(self, index: int) -> bytes:
+        """Return one JSON record without its trailing newline."""
+        return self.buffer[self.offsets[index] : self.offsets[index + 1] - 1]
+
+    def records(self) -> List[bytes]:
+        """Return every JSON record without trailing newlines."""
+        if not len(self):
+            return []
+        return self.buffer[:-1].split(b"\n")
+
+    def head(self, count: int) -> bytes:
+        """Return the NDJSON bytes of the first count records."""
+        return self.buffer[: self.offsets[min(count, len(self))]]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return the events as dicts, decoding only if no EventBatch is attached."""
+        if self.batch is not None:
+            return self.batch.to_dicts()
+        return [json.loads(record) for record in self.records()]
+
+    def event_batch(self) -> EventBatch:
+        """Return the columnar batch, rebuilding it from the records if needed."""
+        if self.batch is None:
+            self.batch = EventBatch.from_rows(self.to_dicts())
+        return self.batch
+
+
+def _encode_column(column: Column) -> List[str]:
+    """Encode every value of a column as a JSON fragment."""
+    if isinstance(column, np.ndarray):
+        if column.ndim > 1 or column.dtype == object:
+            return [json.dumps(value) for value in column.tolist()]
+        if column.dtype == bool:
+            return ["true" if value else "false" for value in column.tolist()]
+        if column.dtype.kind == "f":
+            return [repr(value) for value in column.tolist()]
+        if column.dtype.kind in "iu":
+            return [str(value) for value in column.tolist()]
+        return [encode_basestring_ascii(value) for value in column.tolist()]
+    if all(type(value) is str for value in column):
+        return [encode_basestring_ascii(value) for value in column]
+    return [json.dumps(value) for value in column]
+
+
+def encode_batch(batch: EventBatch) -> EncodedBatch:
+    """Encode a batch as NDJSON, byte-identical to json.dumps() of its dicts."""
+    lines: List[str] = []
+    stream_stats: StreamStats = []
+    for stream, columns in batch.as_columns().items():
+        count = batch.sizes[stream]
+        if not count:
+            continue
+        fields = list(columns)
+        template = ", ".join(
+            json.dumps(field).replace("%", "%%") + ": %s" for field in fields
+        )
+        if stream is not None and "stream" not in columns:
+            template += ', "stream": ' + json.dumps(stream).replace("%", "%%")
+        template = "{" + template + "}"
+
+        fragments = [_encode_column(columns[field]) for field in fields]
+        stream_lines = [template % values for values in zip(*fragments)]
+        stream_stats.append((stream, count, sum(map(len, stream_lines))))
+        lines.extend(stream_lines)
+
+    return _build(lines, stream_stats, batch)
+
+
+def encode_events(events: List[Dict[str, Any]]) -> EncodedBatch:
+    """Encode event dicts as NDJSON, keeping their order."""
+    lines = [json.dumps(event) for event in events]
+    totals: Dict[Optional[str], List[int]] = {}
+    for event, line in zip(events, lines):
+        stats = totals.setdefault(event.get("stream"), [0, 0])
+        stats[0] += 1
+        stats[1] += len(line)
+    stream_stats = [(stream, count, size) for stream, (count, size) in totals.items()]
+    return _build(lines, stream_stats, None)
+
+
+def _build(
+    lines: List[str], stream_stats: StreamStats, batch: Optional[EventBatch]
+) -> EncodedBatch:
+    """Join encoded lines into one buffer and compute record offsets."""
+    offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+    # Records are ASCII (ensure_ascii), so character and byte lengths agree.
+    np.cumsum([len(line) + 1 for line in lines], out=offsets[1:])
+    buffer = ("\n".join(lines) + "\n").encode("ascii") if lines else b""
+    return EncodedBatch(buffer, offsets, stream_stats, batch)
+
+
+def pack_frame(encoded: EncodedBatch) -> bytes:
+    """Pack an encoded batch into a length-prefixed binary frame."""
+    stats = json.dumps(encoded.stream_stats).encode("utf-8")
+    return FRAME_HEADER.pack(len(stats), len(encoded.buffer)) + stats + encoded.buffer
+
+
+def unpack_frame(data, offset: int = 0) -> Tuple[EncodedBatch, int]:
+    """Unpack the frame at offset; return the batch and the next frame's offset."""
+    stats_len, buffer_len = FRAME_HEADER.unpack_from(data, offset)
+    start = offset + FRAME_HEADER.size
+    stats = [
+        tuple(entry) for entry in json.loads(bytes(data[start : start + stats_len]))
+    ]
+    start += stats_len
+    buffer = bytes(data[start : start + buffer_len])
+    return EncodedBatch.from_buffer(buffer, stats), start + buffer_len
@@ -0,0 +1,232 @@
+"""
+Per-sink delivery queues.
+Each sink gets a bounded queue of encoded batches drained by its own worker
+task, so a slow sink only backs up (or sheds) its own queue.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src import instrumentation
+from src.serializer import FRAME_HEADER, EncodedBatch, pack_frame, unpack_frame
+from src.sinks.base import BaseSink
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+
+class SpillFile:
+    """Append-only file of packed batches, read back in FIFO order."""
+
+    def __init__(self, path: str):
+        """Initialize an empty spill file at path, discarding any stale one."""
+        self.path = path
+        # Frames left by an earlier run aren't counted, so they'd never be read.
+        if os.path.exists(path):
+            os.remove(path)
+        self.count = 0
+        self._read_offset = 0
+        self._write_offset = 0
+
+    def append(self, encoded: EncodedBatch) -> None:
+        """Append one batch to the end of the file."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        frame = pack_frame(encoded)
+        with open(self.path, "ab") as f:
+            f.write(frame)
+        self._write_offset += len(frame)
+        self.count += 1
+
+    def pop(self) -> EncodedBatch:
+        """Read the oldest batch; the file is truncated once fully read."""
+        with open(self.path, "rb") as f:
+            f.seek(self._read_offset)
+            data = f.read(self._frame_size(f))
+        encoded, size = unpack_frame(data)
+        self._read_offset += size
+        self.count -= 1
+        if not self.count:
+            os.remove(self.path)
+            self._read_offset = self._write_offset = 0
+        return encoded
+
+    def _frame_size(self, f) -> int:
+        """Return the size of the frame at the current position of f."""
+        header = f.read(FRAME_HEADER.size)
+        f.seek(-len(header), os.SEEK_CUR)
+        stats_len, buffer_len = FRAME_HEADER.unpack(header)
+        return FRAME_HEADER.size + stats_len + buffer_len
+
+
+class SinkQueue:
+    """Bounded queue of encoded batches with a worker task feeding one sink."""
+
+    def __init__(
+        self,
+        name: str,
+        sink: BaseSink,
+        max_batches: int = 64,
+        overflow: str = "block",
+        spill_dir: str = "spill",
+    ):
+        """Initialize the queue for a sink with a capacity and overflow policy."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.name = name
+        self.sink = sink
+        self.max_batches = max(1, max_batches)
+        self.overflow = overflow
+        # Only spill queues touch spill_dir, with one file per process there.
+        self.spill: Optional[SpillFile] = None
+        if overflow == "spill":
+            self.spill = SpillFile(
+                os.path.join(spill_dir, f"{name}-{os.getpid()}.spill")
+            )
+        self.enqueued_batches = 0
+        self.sent_batches = 0
+        self.sent_events = 0
+        self.dropped_batches = 0
+        self.dropped_events = 0
+        self.spilled_batches = 0
+        self.error_count = 0
+        self.last_wait_sec = 0.0
+        self.max_wait_sec = 0.0
+        self._items: Deque[Tuple[float, EncodedBatch]] = deque()
+        self._spill_times: Deque[float] = deque()
+        self._busy = False
+        self._changed = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+        self._wait_stage = instrumentation.stage(instrumentation.QUEUE_WAIT, name)
+        self._send_stage = instrumentation.stage(instrumentation.SEND, name)
+
+    @classmethod
+    def from_config(
+        cls, name: str, sink: BaseSink, config: Dict[str, Any]
+    ) -> "SinkQueue":
+        """Create a queue from a sink's optional "queue" config block."""
+        queue_config = config.get("queue", {})
+        return cls(
+            name,
+            sink,
+            max_batches=queue_config.get("max_batches", 64),
+            overflow=queue_config.get("overflow", "block"),
+            spill_dir=queue_config.get("spill_dir", "spill"),
+        )
+
+    @property
+    def depth(self) -> int:
+        """Batches waiting for delivery, in memory or spilled to disk."""
+        return len(self._items) + self.spilled_depth
+
+    @property
+    def spilled_depth(self) -> int:
+        """Batches waiting in the spill file."""
+        return self.spill.count if self.spill else 0
+
+    def start(self) -> None:
+        """Start the worker task if it is not running."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, encoded: EncodedBatch) -> None:
+        """Enqueue a batch, applying the overflow policy when the queue is full."""
+        self.start()
+        async with self._changed:
+            self.enqueued_batches += 1
+            # Once anything is spilled, later batches follow it to keep FIFO order.
+            if self.spilled_depth or len(self._items) >= self.max_batches:
+                if self.overflow == "spill":
+                    await asyncio.to_thread(self.spill.append, encoded)
+                    self._spill_times.append(time.monotonic())
+                    self.spilled_batches += 1
+                    self._changed.notify_all()
+                    return
+                if self.overflow == "drop_oldest":
+                    _, dropped = self._items.popleft()
+                    self.dropped_batches += 1
+                    self.dropped_events += len(dropped)
+                else:
+                    await self._changed.wait_for(
+                        lambda: len(self._items) < self.max_batches
+                    )
+            self._items.append((time.monotonic(), encoded))
+            self._changed.notify_all()
+
+    async def _next(self) -> Tuple[float, EncodedBatch]:
+        """Wait for and remove the oldest batch."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.depth > 0)
+            if self._items:
+                item = self._items.popleft()
+            else:
+                item = (
+                    self._spill_times.popleft(),
+                    await asyncio.to_thread(self.spill.pop),
+                )
+            self._busy = True
+            self._changed.notify_all()
+            return item
+
+    async def _run(self) -> None:
+        """Deliver batches to the sink one at a time, oldest first."""
+        while True:
+            enqueued_at, encoded = await self._next()
+            self.last_wait_sec = time.monotonic() - enqueued_at
+            self.max_wait_sec = max(self.max_wait_sec, self.last_wait_sec)
+            self._wait_stage.observe(self.last_wait_sec, len(encoded))
+            try:
+                start = time.perf_counter()
+                await self.sink.send_encoded(encoded)
+                self._send_stage.observe(time.perf_counter() - start, len(encoded))
+                self.sent_batches += 1
+                self.sent_events += len(encoded)
+            except Exception as e:
+                self.error_count += 1
+                print(f"Error sending batch to sink {self.name}: {e}")
+            finally:
+                async with self._changed:
+                    self._busy = False
+                    self._changed.notify_all()
+
+    async def join(self) -> None:
+        """Wait until every queued batch has been handed to the sink."""
+        if self._worker is None:
+            return
+        async with self._changed:
+            await self._changed.wait_for(lambda: not self.depth and not self._busy)
+
+    async def close(self) -> None:
+        """Drain the queue and stop the worker."""
+        await self.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def get_metrics(self) -> dict:
+        """Return queue depth, lag and overflow counters."""
+        # In-memory batches are always older than spilled ones.
+        if self._items:
+            oldest = self._items[0][0]
+        elif self._spill_times:
+            oldest = self._spill_times[0]
+        else:
+            oldest = None
+        return {
+            "depth": self.depth,
+            "max_batches": self.max_batches,
+            "overflow": self.overflow,
+            "spilled_depth": self.spilled_depth,
+            "lag_sec": time.monotonic() - oldest if oldest is not None else 0.0,
+            "last_wait_sec": self.last_wait_sec,
+            "max_wait_sec": self.max_wait_sec,
+            "enqueued_batches": self.enqueued_batches,
+            "sent_batches": self.sent_batches,
+            "sent_events": self.sent_events,
+            "dropped_batches": self.dropped_batches,
+            "dropped_events": self.dropped_events,
+            "spilled_batches": self.spilled_batches,
+            "error_count": self.error_count,
+        }
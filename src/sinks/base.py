@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
+from src.event_batch import EventBatch
+from src.serializer import EncodedBatch
+
 
 class BaseSink(ABC):
     """Base class for all sinks."""
@@ -15,6 +18,14 @@ class BaseSink(ABC):
         """Send events to the sink."""
         pass
 
+    async def send_batch(self, batch: EventBatch) -> None:
+        """Send a columnar batch; by default adapted to send() as event dicts."""
+        await self.send(batch.to_dicts())
+
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Send a batch already serialized to NDJSON; by default uses send_batch()."""
+        await self.send_batch(encoded.event_batch())
+
     @abstractmethod
     async def close(self) -> None:
         """Close the sink and cleanup resources."""
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Dict, List
+
+from src.event_log import EventLogWriter
+from src.serializer import EncodedBatch, encode_events
+from src.sinks.base import BaseSink
+
+
+class EventLogSink(BaseSink):
+    """Sink that records encoded batches to a binary event log for replay."""
+
+    def __init__(self):
+        """Initialize the event log sink."""
+        self.path = "recordings/events.dflog"
+        self.writer = None
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """Initialize the event log sink with configuration."""
+        log_config = config.get("event_log", {})
+        self.path = log_config.get("path", "recordings/events.dflog")
+        self.writer = EventLogWriter(self.path)
+
+    async def send(self, events: List[Dict[str, Any]]) -> None:
+        """Record event dicts."""
+        await self.send_encoded(encode_events(events))
+
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Append the encoded batch to the log off the event loop."""
+        if len(encoded):
+            await asyncio.to_thread(self.writer.append, encoded)
+
+    async def close(self) -> None:
+        """Close the event log."""
+        if self.writer:
+            await asyncio.to_thread(self.writer.close)
+
+    def get_metrics(self) -> dict:
+        """Return metrics for the event log sink."""
+        return {
+            "type": "event_log",
+            "event_count": self.writer.event_count if self.writer else 0,
+            "batch_count": self.writer.batch_count if self.writer else 0,
+            "path": self.path,
+        }
@@ -1,9 +1,12 @@
 from typing import Any, Dict
 
 from src.sinks.base import BaseSink
+from src.sinks.event_log_sink import EventLogSink
 from src.sinks.fastapi_sink import FastAPISink
+from src.sinks.file_sink import FileSink
 from src.sinks.kafka_sink import KafkaSink
 from src.sinks.mock_sink import MockSink
+from src.sinks.parquet_sink import ParquetSink
 
 
 class SinkFactory:
@@ -13,6 +16,9 @@ class SinkFactory:
         "kafka": KafkaSink,
         "mock": MockSink,
         "fastapi": FastAPISink,
+        "file": FileSink,
+        "parquet": ParquetSink,
+        "event_log": EventLogSink,
     }
 
     @classmethod
@@ -34,5 +40,11 @@ def get_sink(sink_type: str):
         return KafkaSink()
     elif sink_type == "fastapi":
         return FastAPISink()
+    elif sink_type == "file":
+        return FileSink()
+    elif sink_type == "parquet":
+        return ParquetSink()
+    elif sink_type == "event_log":
+        return EventLogSink()
     else:
         raise ValueError(f"Unknown sink type: {sink_type}")
@@ -1,32 +1,144 @@
+import asyncio
+import gzip
+import time
+from collections import deque
 from typing import Any, Dict, List
 
+import httpx
+import numpy as np
+
+from src.serializer import EncodedBatch, encode_events
 from src.sinks.base import BaseSink
 
 
 class FastAPISink(BaseSink):
-    """FastAPI sink implementation."""
+    """HTTP sink that POSTs gzip-compressed NDJSON batches over pooled connections."""
 
     def __init__(self):
         """Initialize the FastAPI sink."""
         self.client = None
+        self.url = "http://localhost:8080/ingest"
+        self.max_connections = 16
+        self.max_in_flight = 32
+        self.timeout_sec = 10.0
+        self.compression_level = 1
+        self.max_retries = 3
+        self.retry_backoff_sec = 0.1
         self.event_count = 0
+        self.request_count = 0
+        self.error_count = 0
+        self.failed_count = 0
+        self.bytes_sent = 0
+        self.latencies = deque(maxlen=10_000)
+        self._in_flight = None
+        self._pending = set()
 
     def initialize(self, config: Dict[str, Any]) -> None:
         """Initialize the FastAPI sink with configuration."""
-        # For now, just store the config
-        self.config = config
+        http_config = config.get("fastapi", {})
+        self.url = http_config.get("url", "http://localhost:8080/ingest")
+        self.max_connections = http_config.get("max_connections", 16)
+        self.max_in_flight = http_config.get("max_in_flight", 32)
+        self.timeout_sec = http_config.get("timeout_sec", 10.0)
+        self.compression_level = http_config.get("compression_level", 1)
+        self.max_retries = http_config.get("max_retries", 3)
+        self.retry_backoff_sec = http_config.get("retry_backoff_ms", 100) / 1000
+
+    def _ensure_client(self):
+        """Create the pooled keep-alive client on first use."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.timeout_sec,
+            )
 
     async def send(self, events: List[Dict[str, Any]]) -> None:
-        """Send events to FastAPI endpoint."""
-        # For now, just print events
-        for event in events:
-            self.event_count += 1
+        """Send events to the FastAPI endpoint."""
+        await self.send_encoded(encode_events(events))
+
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Compress the encoded batch and queue a POST, up to max_in_flight pending."""
+        if not len(encoded):
+            return
+        self._ensure_client()
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        # Reuse the encoder pool's gzip payload when it made one.
+        body = encoded.compressed.get("gzip")
+        if body is None:
+            # zlib releases the GIL, so compression runs in parallel with the loop.
+            body = await asyncio.to_thread(
+                gzip.compress, encoded.buffer, self.compression_level
+            )
+        await self._in_flight.acquire()
+        task = asyncio.create_task(self._post(body, len(encoded)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _post(self, body: bytes, count: int) -> None:
+        """POST one batch, retrying on connection errors and 5xx responses."""
+        headers = {
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+        }
+        try:
+            for attempt in range(1, self.max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    response = await self.client.post(
+                        self.url, content=body, headers=headers
+                    )
+                    response.raise_for_status()
+                    self.latencies.append(time.perf_counter() - start)
+                    self.event_count += count
+                    self.request_count += 1
+                    self.bytes_sent += len(body)
+                    return
+                except httpx.HTTPError as e:
+                    self.error_count += 1
+                    retryable = not isinstance(e, httpx.HTTPStatusError) or (
+                        e.response.status_code >= 500
+                    )
+                    if not retryable or attempt == self.max_retries:
+                        self.failed_count += count
+                        print(f"Failed to POST {count} events to {self.url}: {e}")
+                        return
+                    await asyncio.sleep(self.retry_backoff_sec * attempt)
+        finally:
+            self._in_flight.release()
 
     async def close(self) -> None:
-        """Close the FastAPI sink."""
+        """Wait for in-flight requests and close the FastAPI sink."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
         if self.client:
-            await self.client.close()
+            await self.client.aclose()
+            self.client = None
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        """Return p50/p95/p99 request latency in milliseconds."""
+        if not self.latencies:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(self.latencies, float), [50, 95, 99])
+        return {
+            "p50": round(float(p50) * 1000, 2),
+            "p95": round(float(p95) * 1000, 2),
+            "p99": round(float(p99) * 1000, 2),
+        }
 
     def get_metrics(self) -> dict:
         """Return metrics for the FastAPI sink."""
-        return {"type": "fastapi", "event_count": self.event_count}
+        return {
+            "type": "fastapi",
+            "event_count": self.event_count,
+            "request_count": self.request_count,
+            "error_count": self.error_count,
+            "failed_count": self.failed_count,
+            "bytes_sent": self.bytes_sent,
+            "in_flight": len(self._pending),
+            "latency_ms": self.latency_percentiles(),
+            "url": self.url,
+        }
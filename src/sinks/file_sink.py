@@ -0,0 +1,182 @@
+import asyncio
+import gzip
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.serializer import EncodedBatch, encode_events
+from src.sinks.base import BaseSink
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for compression: zstd
+    zstandard = None
+
+_EXTENSIONS = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+class FileSink(BaseSink):
+    """File sink that appends NDJSON from a background writer thread."""
+
+    def __init__(self):
+        """Initialize the file sink."""
+        self.output_dir = "output"
+        self.prefix = "events"
+        self.compression = None
+        self.compression_level = None
+        self.rotate_bytes = 256 * 1024 * 1024
+        self.rotate_interval_sec = 300
+        self.write_buffer_size = 1024 * 1024
+        self.event_count = 0
+        self.bytes_written = 0
+        self.files_written = 0
+        self.error_count = 0
+        self.current_file = None
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._file = None
+        self._raw_file = None
+        self._file_bytes = 0
+        self._file_opened_at = 0.0
+        self._sequence = 0
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """Initialize the file sink with configuration."""
+        file_config = config.get("file", {})
+        self.output_dir = file_config.get("output_dir", "output")
+        self.prefix = file_config.get("prefix", "events")
+        self.compression = file_config.get("compression")
+        if self.compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown compression: {self.compression}")
+        if self.compression == "zstd" and zstandard is None:
+            raise RuntimeError(
+                "zstd compression requires the zstandard package: pip install zstandard"
+            )
+        self.compression_level = file_config.get("compression_level")
+        self.rotate_bytes = file_config.get("rotate_mb", 256) * 1024 * 1024
+        self.rotate_interval_sec = file_config.get("rotate_interval_sec", 300)
+        self.write_buffer_size = file_config.get("write_buffer_kb", 1024) * 1024
+        self._queue = queue.Queue(maxsize=file_config.get("max_queued_batches", 64))
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use."""
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="file-sink-writer", daemon=True
+            )
+            self._writer.start()
+
+    async def send(self, events: List[Dict[str, Any]]) -> None:
+        """Write events as NDJSON."""
+        await self.send_encoded(encode_events(events))
+
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Hand the encoded buffer to the writer thread without blocking the loop."""
+        if not len(encoded):
+            return
+        self._ensure_writer()
+        item = (encoded.buffer, len(encoded))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # The writer is behind: wait for room off the event loop.
+            await asyncio.to_thread(self._queue.put, item)
+
+    def _write_loop(self):
+        """Writer thread: drain the queue, rotating files by size and age."""
+        while True:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._file is not None and self._rotation_due():
+                    self._close_file()
+                continue
+            if item is None:
+                self._close_file()
+                return
+            buffer, count = item
+            try:
+                if self._file is not None and self._rotation_due():
+                    self._close_file()
+                if self._file is None:
+                    self._open_file()
+                self._file.write(buffer)
+                self._file_bytes += len(buffer)
+                self.bytes_written += len(buffer)
+                self.event_count += count
+            except Exception as e:
+                self.error_count += 1
+                print(f"Error writing to {self.current_file}: {e}")
+
+    def _rotation_due(self) -> bool:
+        """Return whether the current file reached its size or age limit."""
+        return (
+            self._file_bytes >= self.rotate_bytes
+            or time.monotonic() - self._file_opened_at >= self.rotate_interval_sec
+        )
+
+    def _open_file(self):
+        """Open the next output file with the configured compression."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        while True:
+            self._sequence += 1
+            # The pid keeps --workers N processes apart; "xb" never overwrites.
+            name = f"{self.prefix}_{timestamp}_{os.getpid()}_{self._sequence:05d}"
+            self.current_file = os.path.join(
+                self.output_dir, name + _EXTENSIONS[self.compression]
+            )
+            try:
+                self._raw_file = open(
+                    self.current_file, "xb", buffering=self.write_buffer_size
+                )
+                break
+            except FileExistsError:
+                continue
+        if self.compression == "gzip":
+            level = 6 if self.compression_level is None else self.compression_level
+            self._file = gzip.GzipFile(
+                fileobj=self._raw_file, mode="wb", compresslevel=level
+            )
+        elif self.compression == "zstd":
+            level = 3 if self.compression_level is None else self.compression_level
+            self._file = zstandard.ZstdCompressor(level=level).stream_writer(
+                self._raw_file, closefd=False
+            )
+        else:
+            self._file = self._raw_file
+        self._file_bytes = 0
+        self._file_opened_at = time.monotonic()
+        self.files_written += 1
+
+    def _close_file(self):
+        """Flush and close the current output file."""
+        if self._file is None:
+            return
+        if self._file is not self._raw_file:
+            self._file.close()
+        self._raw_file.close()
+        self._file = self._raw_file = None
+
+    async def close(self) -> None:
+        """Flush queued batches and stop the writer thread."""
+        if self._writer is None:
+            return
+        await asyncio.to_thread(self._queue.put, None)
+        await asyncio.to_thread(self._writer.join)
+        self._writer = None
+
+    def get_metrics(self) -> dict:
+        """Return metrics for the file sink."""
+        return {
+            "type": "file",
+            "event_count": self.event_count,
+            "bytes_written": self.bytes_written,
+            "files_written": self.files_written,
+            "error_count": self.error_count,
+            "queued_batches": self._queue.qsize() if self._queue else 0,
+            "output_file": self.current_file,
+        }
@@ -1,10 +1,11 @@
 import asyncio
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from aiokafka import AIOKafkaProducer
-from aiokafka.errors import KafkaError
+from aiokafka.errors import KafkaError, UnknownTopicOrPartitionError
 
+from src.serializer import EncodedBatch, encode_events
 from src.sinks.base import BaseSink
 
 
@@ -16,10 +17,20 @@ class KafkaSink(BaseSink):
         self.producer = None
         self.event_count = 0
         self.error_count = 0
+        self.failed_count = 0
+        self.batch_count = 0
         self.topic = None
         self.bootstrap_servers = None
         self.retry_count = 0
         self.max_retries = 3
+        self.retry_backoff_sec = 0.1
+        self.pipelined = False
+        self.max_in_flight = 64
+        self.max_batch_size = 16384
+        self._in_flight = None
+        self._pending = set()
+        self._partitions = None
+        self._next_partition = 0
 
     def initialize(self, config: Dict[str, Any]) -> None:
         """Initialize the Kafka sink with configuration."""
@@ -27,14 +38,22 @@ class KafkaSink(BaseSink):
         self.bootstrap_servers = kafka_config.get("bootstrap_servers", "localhost:9092")
         self.topic = kafka_config.get("topic", "dataflux-events")
         self.max_retries = kafka_config.get("max_retries", 3)
+        self.retry_backoff_sec = kafka_config.get("retry_backoff_ms", 100) / 1000
+        self.pipelined = kafka_config.get("pipelined", False)
+        self.max_in_flight = kafka_config.get("max_in_flight", 64)
+        self.max_batch_size = kafka_config.get("max_batch_size", 16384)
 
         # Create producer configuration
         self.producer_config = {
             "bootstrap_servers": self.bootstrap_servers,
-            "value_serializer": lambda v: json.dumps(v).encode("utf-8"),
+            "value_serializer": lambda v: (
+                v if isinstance(v, bytes) else json.dumps(v).encode("utf-8")
+            ),
             "acks": kafka_config.get("acks", "all"),
-            "retries": self.max_retries,
             "retry_backoff_ms": kafka_config.get("retry_backoff_ms", 100),
+            "linger_ms": kafka_config.get("linger_ms", 0),
+            "max_batch_size": self.max_batch_size,
+            "compression_type": kafka_config.get("compression_type"),
         }
 
     async def _ensure_producer(self):
@@ -49,25 +68,37 @@ class KafkaSink(BaseSink):
 
     async def send(self, events: List[Dict[str, Any]]) -> None:
         """Send events to Kafka with retry logic."""
+        await self.send_encoded(encode_events(events))
+
+    def _metadata_suffix(self) -> bytes:
+        """Return the encoded _kafka_metadata field appended to each record."""
+        metadata = {
+            "topic": self.topic,
+            "timestamp": asyncio.get_event_loop().time(),
+        }
+        return b', "_kafka_metadata": ' + json.dumps(metadata).encode("utf-8") + b"}"
+
+    def _with_metadata(self, encoded: EncodedBatch) -> List[bytes]:
+        """Splice the metadata into each encoded record instead of re-encoding it."""
+        suffix = self._metadata_suffix()
+        return [
+            record[:-1] + (suffix if record != b"{}" else suffix[2:])
+            for record in encoded.records()
+        ]
+
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Send pre-encoded records to Kafka with retry logic."""
         await self._ensure_producer()
+        values = self._with_metadata(encoded)
+        if self.pipelined:
+            await self._send_pipelined(values)
+            return
 
-        for event in events:
+        for value in values:
             retry_count = 0
             while retry_count < self.max_retries:
                 try:
-                    # Add metadata to the event
-                    event_with_metadata = {
-                        **event,
-                        "_kafka_metadata": {
-                            "topic": self.topic,
-                            "timestamp": asyncio.get_event_loop().time(),
-                        },
-                    }
-
-                    # Send to Kafka
-                    await self.producer.send_and_wait(
-                        topic=self.topic, value=event_with_metadata
-                    )
+                    await self.producer.send_and_wait(topic=self.topic, value=value)
                     self.event_count += 1
                     break
                 except KafkaError as e:
@@ -80,8 +111,123 @@ class KafkaSink(BaseSink):
                     else:
                         await asyncio.sleep(0.1 * retry_count)  # Exponential backoff
 
+    def _split_batches(self, values: List[bytes]) -> List[List[bytes]]:
+        """Split records into chunks that fit in one producer batch."""
+        # Leave room for the per-record and per-batch framing overhead.
+        limit = max(self.max_batch_size - 512, 1)
+        chunks, chunk, size = [], [], 0
+        for value in values:
+            record_size = len(value) + 64
+            if chunk and size + record_size > limit:
+                chunks.append(chunk)
+                chunk, size = [], 0
+            chunk.append(value)
+            size += record_size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _send_pipelined(self, values: List[bytes]) -> None:
+        """Queue record batches for delivery, keeping up to max_in_flight pending."""
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        for chunk in self._split_batches(values):
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._deliver(chunk))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _deliver(self, values: List[bytes]) -> None:
+        """Deliver one chunk, retrying only the records whose batches failed."""
+        try:
+            pending = values
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    failed, error = await self._send_chunk(pending)
+                except Exception as e:
+                    # E.g. a stopped producer: nothing in the chunk was sent.
+                    failed, error = pending, e
+                self.event_count += len(pending) - len(failed)
+                if not failed:
+                    self.batch_count += 1
+                    return
+                self.error_count += 1
+                pending = failed
+                if attempt == self.max_retries:
+                    self.failed_count += len(failed)
+                    print(
+                        f"Failed to send {len(failed)} events to Kafka "
+                        f"after {self.max_retries} retries: {error}"
+                    )
+                else:
+                    await asyncio.sleep(self.retry_backoff_sec * attempt)
+        finally:
+            self._in_flight.release()
+
+    async def _send_chunk(
+        self, values: List[bytes]
+    ) -> Tuple[List[bytes], Optional[Exception]]:
+        """Send records as producer batches; return the records that failed."""
+        sends = []
+        if not hasattr(self.producer, "create_batch"):
+            sends = [([value], self._send_value(value)) for value in values]
+        else:
+            batch, records = self.producer.create_batch(), []
+            for value in values:
+                if batch.append(key=None, value=value, timestamp=None) is not None:
+                    records.append(value)
+                    continue
+                if records:
+                    sends.append((records, self._send_batch(batch)))
+                    batch, records = self.producer.create_batch(), []
+                    if batch.append(key=None, value=value, timestamp=None) is not None:
+                        records.append(value)
+                        continue
+                # Larger than a whole producer batch: send the record on its own.
+                sends.append(([value], self._send_value(value)))
+            if records:
+                sends.append((records, self._send_batch(batch)))
+
+        results = await asyncio.gather(
+            *(self._wait_delivery(send) for _, send in sends), return_exceptions=True
+        )
+        failed, error = [], None
+        for (records, _), result in zip(sends, results):
+            if isinstance(result, Exception):
+                # Timeouts and serialization errors are failures too, not just
+                # KafkaError; anything else (cancellation) propagates.
+                failed.extend(records)
+                error = result
+            elif isinstance(result, BaseException):
+                raise result
+        return failed, error
+
+    @staticmethod
+    async def _wait_delivery(send) -> None:
+        """Enqueue a send, then wait for the broker to acknowledge it."""
+        future = await send
+        await future
+
+    async def _send_value(self, value: bytes):
+        """Send one record through the producer's own batching."""
+        return await self.producer.send(self.topic, value=value)
+
+    async def _send_batch(self, batch):
+        """Send one producer batch to the next partition, round-robin."""
+        if not self._partitions:
+            # A missing or just-created topic has no partitions yet; retry later.
+            partitions = await self.producer.partitions_for(self.topic)
+            if not partitions:
+                raise UnknownTopicOrPartitionError(f"No partitions for {self.topic}")
+            self._partitions = sorted(partitions)
+        partition = self._partitions[self._next_partition % len(self._partitions)]
+        self._next_partition += 1
+        return await self.producer.send_batch(batch, self.topic, partition=partition)
+
     async def close(self) -> None:
         """Close the Kafka sink."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
         if self.producer:
             try:
                 await self.producer.stop()
@@ -94,6 +240,9 @@ class KafkaSink(BaseSink):
             "type": "kafka",
             "event_count": self.event_count,
             "error_count": self.error_count,
+            "failed_count": self.failed_count,
+            "batch_count": self.batch_count,
+            "in_flight": len(self._pending),
             "topic": self.topic,
             "bootstrap_servers": self.bootstrap_servers,
         }
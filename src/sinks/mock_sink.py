@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from typing import Any, Dict, List
 
+from src.serializer import EncodedBatch
 from src.sinks.base import BaseSink
 
 
@@ -47,6 +48,16 @@ class MockSink(BaseSink):
                     f.write(json.dumps(event) + "\n")
             self.stored_count += len(events_to_store)
 
+    async def send_encoded(self, encoded: EncodedBatch) -> None:
+        """Store the first 100 encoded records as-is, count the rest."""
+        self.event_count += len(encoded)
+
+        remaining_slots = max(0, self.max_stored_events - self.stored_count)
+        if remaining_slots > 0:
+            with open(self.current_file, "ab") as f:
+                f.write(encoded.head(remaining_slots))
+            self.stored_count += min(remaining_slots, len(encoded))
+
     async def close(self) -> None:
         """No cleanup needed for mock sink."""
         pass
@@ -0,0 +1,218 @@
+import asyncio
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from src.event_batch import Column, EventBatch
+from src.event_generators import SCHEMAS
+from src.sinks.base import BaseSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for the parquet sink
+    pa = pq = None
+
+# (stream, date, hour) of one Hive-style output directory.
+PartitionKey = Tuple[str, str, str]
+# Date and hour directory names for rows without an event timestamp.
+UNKNOWN_PARTITION = "unknown"
+
+
+def arrow_type(spec):
+    """Map a generator SCHEMA type spec to an Arrow type."""
+    if isinstance(spec, tuple):
+        if spec[0] == "list":
+            return pa.list_(arrow_type(spec[1]))
+        if spec[0] == "fixed_size_list":
+            return pa.list_(arrow_type(spec[1]), spec[2])
+        raise ValueError(f"Unknown column type: {spec}")
+    if spec == "timestamp":
+        return pa.timestamp("us", tz="UTC")
+    return pa.type_for_alias(spec)
+
+
+def arrow_schema(schema: Dict[str, Any]):
+    """Build an Arrow schema from a generator SCHEMA."""
+    return pa.schema([(name, arrow_type(spec)) for name, spec in schema.items()])
+
+
+def to_arrow(column: Column, arrow_dtype):
+    """Convert one event column to an Arrow array of the given type."""
+    if pa.types.is_fixed_size_list(arrow_dtype):
+        values = np.asarray(column, dtype=arrow_dtype.value_type.to_pandas_dtype())
+        return pa.FixedSizeListArray.from_arrays(
+            pa.array(values.reshape(-1)), arrow_dtype.list_size
+        )
+    if pa.types.is_timestamp(arrow_dtype):
+        # ISO strings without an offset are UTC; parse naive, then attach the zone.
+        naive = pa.array(column, pa.string()).cast(pa.timestamp(arrow_dtype.unit))
+        return naive.cast(arrow_dtype)
+    return pa.array(column, arrow_dtype)
+
+
+class ParquetSink(BaseSink):
+    """Parquet sink writing per-stream row groups in a Hive-style layout."""
+
+    def __init__(self):
+        """Initialize the parquet sink."""
+        self.output_dir = "parquet"
+        self.row_group_size = 100_000
+        self.max_open_writers = 32
+        self.compression = "snappy"
+        self.event_count = 0
+        self.row_groups_written = 0
+        self.files_written = 0
+        self.evicted_writers = 0
+        self._schemas = {}
+        self._pending: Dict[PartitionKey, List[Any]] = {}
+        self._pending_rows: Dict[PartitionKey, int] = {}
+        self._writers: "OrderedDict[PartitionKey, Any]" = OrderedDict()
+        self._sequence = 0
+        # One thread serializes all Arrow conversion and file I/O off the loop.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def initialize(self, config: Dict[str, Any]) -> None:
+        """Initialize the parquet sink with configuration."""
+        if pa is None:
+            raise RuntimeError(
+                "The parquet sink requires the pyarrow package: pip install pyarrow"
+            )
+        parquet_config = config.get("parquet", {})
+        self.output_dir = parquet_config.get("output_dir", "parquet")
+        self.row_group_size = parquet_config.get("row_group_size", 100_000)
+        self.max_open_writers = parquet_config.get("max_open_writers", 32)
+        self.compression = parquet_config.get("compression", "snappy")
+        self._schemas = {
+            stream: arrow_schema(schema) for stream, schema in SCHEMAS.items()
+        }
+
+    async def send(self, events: List[Dict[str, Any]]) -> None:
+        """Write event dicts, grouped into columns by stream."""
+        await self.send_batch(EventBatch.from_rows(events))
+
+    async def send_batch(self, batch: EventBatch) -> None:
+        """Buffer a columnar batch and write any row groups that filled up."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._add_batch, batch)
+
+    def _add_batch(self, batch: EventBatch) -> None:
+        """Split a batch by stream and event hour and buffer it as Arrow tables."""
+        for stream, columns in batch.as_columns().items():
+            count = batch.sizes[stream]
+            if not count:
+                continue
+            table = self._to_table(stream, columns, count)
+            self.event_count += count
+            # Rows without a usable timestamp go to the unknown partition.
+            hours = [
+                ts[:13] if isinstance(ts, str) else UNKNOWN_PARTITION
+                for ts in columns.get("timestamp", [None] * count)
+            ]
+            unique_hours, inverse = np.unique(hours, return_inverse=True)
+            for i, hour in enumerate(unique_hours.tolist()):
+                part = (
+                    table
+                    if len(unique_hours) == 1
+                    else table.take(np.flatnonzero(inverse == i))
+                )
+                if hour == UNKNOWN_PARTITION:
+                    date, hour = UNKNOWN_PARTITION, UNKNOWN_PARTITION
+                else:
+                    date, hour = hour[:10], hour[11:13]
+                self._buffer((stream or "unknown", date, hour), part)
+
+    def _to_table(self, stream, columns: Dict[str, Column], count: int):
+        """Convert a stream's columns to a table with the stream's fixed schema."""
+        schema = self._schemas.get(stream)
+        if schema is None:
+            # Streams without a generator SCHEMA fall back to inferred types.
+            return pa.table(
+                {name: pa.array(list(col)) for name, col in columns.items()}
+            )
+        arrays = [
+            (
+                to_arrow(columns[field.name], field.type)
+                if field.name in columns
+                else pa.nulls(count, field.type)
+            )
+            for field in schema
+        ]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _buffer(self, key: PartitionKey, table) -> None:
+        """Queue rows for a partition, writing a row group once it is full."""
+        self._pending.setdefault(key, []).append(table)
+        self._pending_rows[key] = self._pending_rows.get(key, 0) + table.num_rows
+        if self._pending_rows[key] >= self.row_group_size:
+            self._write_pending(key)
+
+    def _write_pending(self, key: PartitionKey) -> None:
+        """Write a partition's buffered rows as one row group."""
+        tables = self._pending.pop(key, [])
+        self._pending_rows.pop(key, None)
+        if not tables:
+            return
+        table = pa.concat_tables(tables)
+        self._writer(key, table.schema).write_table(
+            table, row_group_size=max(table.num_rows, 1)
+        )
+        self.row_groups_written += 1
+
+    def _writer(self, key: PartitionKey, schema):
+        """Return the open writer for a partition, evicting the least recent one."""
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+        while len(self._writers) >= self.max_open_writers:
+            _, old = self._writers.popitem(last=False)
+            # Rows still buffered for the evicted partition go to a later file.
+            old.close()
+            self.evicted_writers += 1
+
+        stream, date, hour = key
+        directory = os.path.join(
+            self.output_dir, f"stream={stream}", f"date={date}", f"hour={hour}"
+        )
+        os.makedirs(directory, exist_ok=True)
+        self._sequence += 1
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # The pid keeps --workers N processes from writing the same part file.
+        name = f"part-{timestamp}-{os.getpid()}-{self._sequence:05d}.parquet"
+        path = os.path.join(directory, name)
+        writer = pq.ParquetWriter(path, schema, compression=self.compression)
+        self._writers[key] = writer
+        self.files_written += 1
+        return writer
+
+    def _close_all(self) -> None:
+        """Write every buffered row group and close all writers."""
+        for key in list(self._pending):
+            self._write_pending(key)
+        while self._writers:
+            _, writer = self._writers.popitem(last=False)
+            writer.close()
+
+    async def close(self) -> None:
+        """Flush buffered rows and close all open files."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_all)
+        self._executor.shutdown(wait=True)
+
+    def get_metrics(self) -> dict:
+        """Return metrics for the parquet sink."""
+        return {
+            "type": "parquet",
+            "event_count": self.event_count,
+            "row_groups_written": self.row_groups_written,
+            "files_written": self.files_written,
+            "open_writers": len(self._writers),
+            "evicted_writers": self.evicted_writers,
+            "buffered_rows": sum(self._pending_rows.values()),
+            "output_dir": self.output_dir,
+        }
@@ -1,8 +1,79 @@
 import random
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.utils import get_rng
+
+
+class StreamSampler:
+    """Walker alias-method sampler over the weighted `streams` config."""
+
+    def __init__(self, streams: Dict[str, Dict[str, Any]]):
+        """Build the alias table from the stream weights."""
+        self.streams = streams
+        self._build()
+
+    def _build(self) -> None:
+        """(Re)build the probability and alias tables."""
+        self.names: List[str] = list(self.streams)
+        self.weights = [props["weight"] for props in self.streams.values()]
+        k = len(self.names)
+        total = sum(self.weights)
+        scaled = [weight * k / total for weight in self.weights]
+        prob = [1.0] * k
+        alias = list(range(k))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        self.prob = prob
+        self.alias = alias
+        self._prob_array = np.array(prob)
+        self._alias_array = np.array(alias, dtype=np.int64)
+        self._names_array = np.array(self.names, dtype=object)
+
+    def refresh(self) -> None:
+        """Rebuild the tables if any stream name or weight changed since the build."""
+        # Called explicitly after editing streams in place, never per sample.
+        current = [(name, props["weight"]) for name, props in self.streams.items()]
+        if current != list(zip(self.names, self.weights)):
+            self._build()
+
+    def sample(self) -> str:
+        """Draw one stream name."""
+        column = int(random.random() * len(self.names))
+        if random.random() < self.prob[column]:
+            return self.names[column]
+        return self.names[self.alias[column]]
+
+    def sample_indices(self, n: int) -> np.ndarray:
+        """Draw n stream indices (into self.names) in one vectorized call."""
+        rng = get_rng()
+        columns = rng.integers(0, len(self.names), n)
+        accept = rng.random(n) < self._prob_array[columns]
+        return np.where(accept, columns, self._alias_array[columns])
+
+    def sample_many(self, n: int) -> List[str]:
+        """Draw n stream names in one vectorized call."""
+        return self._names_array[self.sample_indices(n)].tolist()
+
+
+_sampler = None
+
+
+def get_sampler(streams: Dict[str, Dict[str, Any]]) -> StreamSampler:
+    """Return the cached sampler for this streams config, building it if needed."""
+    global _sampler
+    if _sampler is None or _sampler.streams is not streams:
+        _sampler = StreamSampler(streams)
+    return _sampler
 
 
 def weighted_random_choice(streams):
-    choices = []
-    for name, props in streams.items():
-        choices.extend([name] * int(props["weight"] * 100))
-    return random.choice(choices)
+    return get_sampler(streams).sample()
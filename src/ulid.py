@@ -0,0 +1,136 @@
+"""
+Monotonic ULID generation with batch allocation.
+A ULID is a 48-bit millisecond timestamp followed by 80 random bits, encoded
+as 26 Crockford base32 characters, so ids sort by creation time.
+"""
+
+import os
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ALPHABET = np.frombuffer(CROCKFORD.encode("ascii"), dtype=np.uint8)
+_PAIRS = [a + b for a in CROCKFORD for b in CROCKFORD]
+_RANDOM_LIMIT = 1 << 80
+_LOW_MASK = (1 << 64) - 1
+
+
+class RandomPool:
+    """Buffered source of random bytes, refilled in large blocks."""
+
+    def __init__(
+        self, block_size: int = 64 * 1024, source: Callable[[int], bytes] = os.urandom
+    ):
+        """Initialize an empty pool that refills from source."""
+        self.block_size = block_size
+        self.source = source
+        self._buffer = b""
+        self._offset = 0
+
+    def take(self, n: int) -> bytes:
+        """Return n random bytes."""
+        if self._offset + n > len(self._buffer):
+            self._buffer = self._buffer[self._offset :] + self.source(
+                max(self.block_size, n)
+            )
+            self._offset = 0
+        chunk = self._buffer[self._offset : self._offset + n]
+        self._offset += n
+        return chunk
+
+
+def encode_time(ms: int) -> str:
+    """Encode a 48-bit millisecond timestamp as 10 base32 characters."""
+    return "".join(CROCKFORD[(ms >> shift) & 31] for shift in range(45, -5, -5))
+
+
+def encode_random(value: int) -> str:
+    """Encode an 80-bit integer as 16 base32 characters."""
+    pairs = _PAIRS
+    return (
+        pairs[value >> 70 & 1023]
+        + pairs[value >> 60 & 1023]
+        + pairs[value >> 50 & 1023]
+        + pairs[value >> 40 & 1023]
+        + pairs[value >> 30 & 1023]
+        + pairs[value >> 20 & 1023]
+        + pairs[value >> 10 & 1023]
+        + pairs[value & 1023]
+    )
+
+
+def decode(ulid: str) -> Tuple[int, int]:
+    """Return the (milliseconds, random) parts of a ULID string."""
+    value = 0
+    for char in ulid:
+        value = (value << 5) | CROCKFORD.index(char)
+    return value >> 80, value & (_RANDOM_LIMIT - 1)
+
+
+class UlidGenerator:
+    """Monotonic ULID generator that can hand out blocks of ids in one call."""
+
+    def __init__(
+        self, pool: RandomPool = None, time_source: Callable[[], float] = time.time
+    ):
+        """Initialize the generator with a random pool and a clock."""
+        self.pool = pool or RandomPool()
+        self.time_source = time_source
+        self._last_ms = -1
+        self._last_random = 0
+        self._time_prefix = ""
+
+    def _reserve(self, count: int) -> Tuple[int, int]:
+        """Reserve count consecutive random values within one millisecond."""
+        ms = int(self.time_source() * 1000)
+        if ms > self._last_ms:
+            base = int.from_bytes(self.pool.take(10), "big")
+        else:
+            # Same millisecond (or the clock stepped back): keep counting up.
+            ms = self._last_ms
+            base = self._last_random + 1
+        if base + count > _RANDOM_LIMIT:
+            ms += 1
+            base = int.from_bytes(self.pool.take(10), "big") >> 1
+        if ms != self._last_ms:
+            self._time_prefix = encode_time(ms)
+        self._last_ms = ms
+        self._last_random = base + count - 1
+        return ms, base
+
+    def new(self) -> str:
+        """Return the next ULID."""
+        if (
+            int(self.time_source() * 1000) == self._last_ms
+            and self._last_random + 1 < _RANDOM_LIMIT
+        ):
+            self._last_random += 1
+            return self._time_prefix + encode_random(self._last_random)
+        _, base = self._reserve(1)
+        return self._time_prefix + encode_random(base)
+
+    def new_many(self, n: int) -> List[str]:
+        """Return n consecutive ULIDs from a single reservation."""
+        if n <= 0:
+            return []
+        _, base = self._reserve(n)
+        low0 = np.uint64(base & _LOW_MASK)
+        low = low0 + np.arange(n, dtype=np.uint64)
+        high = np.uint64(base >> 64) + (low < low0).astype(np.uint64)
+
+        chars = np.empty((n, 26), dtype=np.uint8)
+        chars[:, :10] = np.frombuffer(self._time_prefix.encode("ascii"), np.uint8)
+        for i in range(16):
+            shift = 75 - 5 * i
+            if shift >= 64:
+                digits = high >> np.uint64(shift - 64)
+            elif shift + 5 <= 64:
+                digits = low >> np.uint64(shift)
+            else:
+                digits = (low >> np.uint64(shift)) | (high << np.uint64(64 - shift))
+            chars[:, 10 + i] = _ALPHABET[digits & np.uint64(31)]
+
+        text = chars.tobytes().decode("ascii")
+        return [text[i : i + 26] for i in range(0, 26 * n, 26)]
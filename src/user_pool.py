@@ -1,12 +1,158 @@
-import random
-import uuid
+"""
+Compact, array-backed pool of simulated users and their devices.
+Users live in one NumPy structured array (index, region code, devices) that can
+be saved to and memory-mapped from a .npy file; ids are formatted on demand.
+"""
 
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-def generate_user_device_pool(count, regions):
-    pool = []
-    for i in range(count):
-        user_id = f"u{str(i).zfill(6)}"
-        devices = [f"d{uuid.uuid4().hex[:6]}" for _ in range(random.randint(1, 3))]
-        region = random.choice(regions)["name"]
-        pool.append({"user_id": user_id, "devices": devices, "region": region})
+import numpy as np
+
+from src.utils import get_rng
+
+MAX_DEVICES = 3
+USER_DTYPE = np.dtype(
+    [
+        ("user_index", "<u4"),
+        ("region", "<u2"),
+        ("device_count", "u1"),
+        ("devices", "<u8", (MAX_DEVICES,)),
+    ]
+)
+
+
+def format_user_ids(indices: np.ndarray) -> List[str]:
+    """Format user indices as ids like "u00000042"."""
+    return [f"u{index:08d}" for index in indices.tolist()]
+
+
+def format_device_ids(values: np.ndarray) -> List[str]:
+    """Format 48-bit device numbers as ids like "d00a1b2c3d4e5"."""
+    return [f"d{value:012x}" for value in values.tolist()]
+
+
+class UserPool:
+    """Users as parallel columns of one structured array, with lazy id formatting."""
+
+    def __init__(
+        self, records: np.ndarray, region_names: List[str], seed: Optional[int] = None
+    ):
+        """Wrap USER_DTYPE records and the names their region codes refer to."""
+        self.records = records
+        self.region_names = region_names
+        # The generation seed the pool was drawn with, kept with saved pools.
+        self.seed = seed
+
+    @classmethod
+    def generate(
+        cls,
+        emitters: Union[int, Dict[str, Any]],
+        regions: List[Dict[str, Any]],
+        rng: Optional[np.random.Generator] = None,
+    ) -> "UserPool":
+        """Generate users with a random region and one to three devices each."""
+        # If emitters is a number, use it directly as the number of users
+        num_users = emitters if isinstance(emitters, int) else emitters["num_users"]
+        rng = rng or get_rng()
+        records = np.empty(num_users, dtype=USER_DTYPE)
+        records["user_index"] = np.arange(num_users)
+        records["region"] = rng.integers(0, len(regions), num_users)
+        records["device_count"] = rng.integers(1, MAX_DEVICES + 1, num_users)
+        records["devices"] = rng.integers(
+            0, 1 << 48, (num_users, MAX_DEVICES), dtype=np.uint64
+        )
+        return cls(records, [region["name"] for region in regions])
+
+    def save(self, path: str) -> None:
+        """Write the records to a .npy file and the region names beside it."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            # A file object keeps np.save from appending ".npy" to the path.
+            np.save(f, self.records, allow_pickle=False)
+        with open(path + ".json", "w") as f:
+            json.dump({"regions": self.region_names, "seed": self.seed}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "UserPool":
+        """Memory-map a saved pool; pages are shared by every process using it."""
+        records = np.load(path, mmap_mode="r", allow_pickle=False)
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        return cls(records, meta["regions"], meta.get("seed"))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key):
+        """Return one user as a dict, or a sub-pool for a slice or index array."""
+        if isinstance(key, (int, np.integer)):
+            return self.user(int(key))
+        return UserPool(self.records[key], self.region_names)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.user(i)
+
+    def user(self, i: int) -> Dict[str, Any]:
+        """Return user i as a dict with user_id, region and device ids."""
+        record = self.records[i]
+        return {
+            "user_id": f"u{int(record['user_index']):08d}",
+            "region": self.region_names[record["region"]],
+            "devices": format_device_ids(record["devices"][: record["device_count"]]),
+        }
+
+    @property
+    def region_codes(self) -> np.ndarray:
+        """Region code of every user."""
+        return self.records["region"]
+
+    def shard(self, worker_id: int, num_workers: int) -> "UserPool":
+        """Return every num_workers-th user starting at worker_id, without copying."""
+        return self[worker_id::num_workers]
+
+    def by_region(self) -> Dict[str, np.ndarray]:
+        """Return the positions of the users in each region."""
+        codes = self.region_codes
+        return {
+            name: np.flatnonzero(codes == code)
+            for code, name in enumerate(self.region_names)
+            if (codes == code).any()
+        }
+
+    def user_ids(self, positions: np.ndarray) -> List[str]:
+        """Format the user ids at the given positions."""
+        return format_user_ids(self.records["user_index"][positions])
+
+    def device_ids(
+        self, positions: np.ndarray, rng: Optional[np.random.Generator] = None
+    ) -> List[str]:
+        """Pick one random device for each user at the given positions."""
+        rng = rng or get_rng()
+        records = self.records[positions]
+        choice = (rng.random(len(records)) * records["device_count"]).astype(np.int64)
+        devices = records["devices"][np.arange(len(records)), choice]
+        return format_device_ids(devices)
+
+
+def load_user_pool(config: Dict[str, Any]) -> UserPool:
+    """Load the pool from config's user_pool_file, generating and saving it once."""
+    path = config.get("user_pool_file")
+    emitters = config["emitters"]
+    num_users = emitters if isinstance(emitters, int) else emitters["num_users"]
+    if path and os.path.exists(path):
+        pool = UserPool.load(path)
+        # Reuse the file only while it still matches the configured pool.
+        if (
+            len(pool) == num_users
+            and pool.region_names == [region["name"] for region in config["regions"]]
+            and pool.seed == config.get("seed")
+        ):
+            return pool
+    pool = UserPool.generate(config["emitters"], config["regions"])
+    pool.seed = config.get("seed")
+    if path:
+        pool.save(path)
     return pool
@@ -1,14 +1,136 @@
 import random
-import uuid
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from src.clock import CoarseClock
+from src.ulid import RandomPool, UlidGenerator
+
+_rng = np.random.default_rng()
+_random_pool = RandomPool()
+_ulid_generator = UlidGenerator(_random_pool)
+_id_format = "ulid"
+_clock = CoarseClock()
+_timestamp_jitter_sec = 0
+
 
 def now():
-    return datetime.utcnow().isoformat()
+    return _clock.now()
+
+
+def timestamps(n):
+    """Return timestamps for n events, jittered if timestamp_jitter is enabled."""
+    return _clock.timestamps(n, _timestamp_jitter_sec, _rng)
+
+
+def uuid4s(n):
+    """Format n RFC 4122 version 4 UUIDs from the shared random pool."""
+    raw = np.frombuffer(_random_pool.take(16 * n), np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    text = raw.tobytes().hex()
+    return [
+        f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        for h in (text[i : i + 32] for i in range(0, 32 * n, 32))
+    ]
 
 
 def generate_ulid():
-    return uuid.uuid4().hex
+    if _id_format == "uuid4":
+        return uuid4s(1)[0]
+    return _ulid_generator.new()
+
+
+def generate_ulids(n):
+    """Generate n event ids in one call."""
+    if _id_format == "uuid4":
+        return uuid4s(n)
+    return _ulid_generator.new_many(n)
+
+
+def random_hex(length, n=None):
+    """Return a random hex string, or a list of n of them, from the shared pool."""
+    if n is None:
+        return _random_pool.take((length + 1) // 2).hex()[:length]
+    size = (length + 1) // 2
+    raw = _random_pool.take(size * n).hex()
+    return [raw[i : i + length] for i in range(0, 2 * size * n, 2 * size)]
+
+
+def set_id_format(id_format):
+    """Select the event id format: "ulid" (default) or "uuid4"."""
+    global _id_format
+    if id_format not in ("ulid", "uuid4"):
+        raise ValueError(f"Unknown id format: {id_format}")
+    _id_format = id_format
+
+
+def seed_generation(seed, worker_id=None):
+    """Reseed every random source from seed (fresh entropy if None); each worker_id
+    gets its own stream."""
+    global _rng, _random_pool, _ulid_generator
+    # Worker streams are the spawned children of the root SeedSequence.
+    spawn_key = () if worker_id is None else (worker_id,)
+    sequence = np.random.SeedSequence(seed, spawn_key=spawn_key)
+    numpy_seq, python_seq, bytes_seq = sequence.spawn(3)
+    _rng = np.random.default_rng(numpy_seq)
+    random.seed(int(python_seq.generate_state(1, np.uint64)[0]))
+    _random_pool = RandomPool(source=np.random.default_rng(bytes_seq).bytes)
+    _ulid_generator = UlidGenerator(_random_pool, _ulid_generator.time_source)
+
+
+def set_time_source(time_source):
+    """Drive event timestamps and ULID times from time_source instead of time.time."""
+    global _ulid_generator
+    _clock.time_source = time_source
+    _clock.set_resolution(_clock.resolution_us / 1_000_000)
+    # A fresh generator: monotonic state from the old clock would pin its times.
+    _ulid_generator = UlidGenerator(_random_pool, time_source)
+
+
+def set_timestamp_jitter(jitter_sec):
+    """Spread batch timestamps by +/- jitter_sec around the clock (0 disables)."""
+    global _timestamp_jitter_sec
+    _timestamp_jitter_sec = jitter_sec
+
+
+def configure_generation(config, worker_id=None):
+    """Apply the generation-related settings from config."""
+    global _timestamp_jitter_sec
+    # Forked workers would otherwise all continue the parent's random streams.
+    if config.get("seed") is not None or worker_id is not None:
+        seed_generation(config.get("seed"), worker_id)
+    set_id_format(config.get("id_format", "ulid"))
+    _clock.set_resolution(config.get("clock_resolution_ms", 1) / 1000)
+    _timestamp_jitter_sec = (
+        config.get("time_jitter_sec", 0) if config.get("timestamp_jitter") else 0
+    )
+
+
+def get_rng():
+    """Return the NumPy generator used by the batch event generators."""
+    return _rng
+
+
+def rounded_uniform(rng, low, high, decimals, n):
+    """Draw n uniform floats rounded like round(random.uniform(low, high), decimals)."""
+    scale = 10**decimals
+    return np.rint(rng.uniform(low, high, n) * scale) / scale
+
+
+def version_strings(rng, n):
+    """Draw n "major.minor.patch" strings with the same ranges as the generators."""
+    parts = zip(
+        rng.integers(1, 6, n).tolist(),
+        rng.integers(0, 10, n).tolist(),
+        rng.integers(0, 10, n).tolist(),
+    )
+    return [f"{major}.{minor}.{patch}" for major, minor, patch in parts]
+
+
+def prefixed(prefix, values):
+    """Format an integer array as prefix-tagged strings, e.g. "vid_1234"."""
+    return [f"{prefix}{value}" for value in values.tolist()]
 
 
 def apply_jitter(timestamp, jitter_seconds):
@@ -16,21 +138,3 @@ def apply_jitter(timestamp, jitter_seconds):
         datetime.fromisoformat(timestamp)
         + timedelta(seconds=random.uniform(-jitter_seconds, jitter_seconds))
     ).isoformat()
-
-
-def generate_user_device_pool(emitters, regions):
-    """Generate a pool of users and their devices for data generation."""
-    users = []
-    # If emitters is a number, use it directly as the number of users
-    num_users = emitters if isinstance(emitters, int) else emitters["num_users"]
-
-    for _ in range(num_users):
-        user = {
-            "user_id": generate_ulid(),
-            "region": random.choice(regions)[
-                "name"
-            ],  # Get the name from the region dictionary
-            "devices": [generate_ulid() for _ in range(random.randint(1, 3))],
-        }
-        users.append(user)
-    return users
@@ -1,23 +1,227 @@
+"""
+Web dashboard for DataFlux.
+One snapshot task computes the metrics once per tick and broadcasts the
+pre-encoded frame to every viewer. Viewers get a full frame when they connect
+(or fall behind) and only the changed fields after that; a viewer that cannot
+keep up skips ticks and is eventually dropped, never blocking the loop.
+"""
+
 import asyncio
+import json
 import time
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, Request, WebSocket
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from ..counters import (
-    counters,
-    global_bytes,
-    global_events,
-    rolling_bytes,
-    rolling_events,
-    stream_bytes,
-)
+from .. import instrumentation
+from ..counters import counters, stream_bytes
+from ..rate_controller import rate_status
+
+SNAPSHOT_INTERVAL_SEC = 1.0
+# A send slower than this drops the viewer.
+SEND_TIMEOUT_SEC = 2.0
+# Ticks a busy viewer may skip before it is dropped.
+MAX_SKIPPED_FRAMES = 5
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the fields of new that differ from old; removed keys map to None."""
+    changes = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff(previous, value)
+            if nested:
+                changes[key] = nested
+        elif value != previous or key not in old:
+            changes[key] = value
+    for key in old.keys() - new.keys():
+        changes[key] = None
+    return changes
+
+
+class MetricsSnapshotter:
+    """Computes dashboard snapshots and the rates behind them, once per tick."""
+
+    def __init__(self):
+        """Initialize empty rate history."""
+        self.start_time = time.time()
+        self.rolling = deque(maxlen=5)
+        self.history = deque(maxlen=30)
+        self._last = None
+
+    def take(self) -> Dict[str, Any]:
+        """Sample the counters and return the current snapshot."""
+        now = time.monotonic()
+        total_events = counters["total"]
+        total_bytes = counters["bytes"]
+        if self._last is not None:
+            last_time, last_events, last_bytes = self._last
+            elapsed = max(now - last_time, 1e-9)
+            rates = (
+                (total_events - last_events) / elapsed,
+                (total_bytes - last_bytes) / elapsed,
+            )
+            self.rolling.append(rates)
+            self.history.append(rates)
+        self._last = (now, total_events, total_bytes)
+
+        streams = {}
+        for stream, count in list(counters.items()):
+            if stream in ("total", "bytes"):
+                continue
+            percent = (count / total_events * 100) if total_events > 0 else 0
+            streams[stream] = {
+                "count": count,
+                "percent": round(percent, 1),
+                "bytes": stream_bytes.get(stream, 0),
+            }
+
+        rolling_eps, rolling_bps = self._mean(self.rolling)
+        global_eps, global_bps = self._mean(self.history)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "elapsed": round(time.time() - self.start_time, 1),
+            "total_events": total_events,
+            "total_bytes": total_bytes,
+            "rolling_eps": round(rolling_eps, 0),
+            "global_eps": round(global_eps, 0),
+            "rolling_bps": round(rolling_bps / 1024 / 1024, 2),  # Convert to MB/s
+            "global_bps": round(global_bps / 1024 / 1024, 2),  # Convert to MB/s
+            "streams": streams,
+            "stages": instrumentation.summary(),
+            "loop_lag": instrumentation.loop_lag_summary(),
+            "rate": rate_status(),
+        }
+
+    @staticmethod
+    def _mean(samples) -> tuple:
+        if not samples:
+            return 0.0, 0.0
+        return (
+            sum(eps for eps, _ in samples) / len(samples),
+            sum(bps for _, bps in samples) / len(samples),
+        )
+
+
+class Viewer:
+    """One dashboard WebSocket and the last frame it was sent."""
+
+    def __init__(self, websocket: WebSocket):
+        """Wrap an accepted WebSocket."""
+        self.websocket = websocket
+        self.last_seq: Optional[int] = None
+        self.skipped = 0
+        self.sending: Optional[asyncio.Task] = None
+        self.closed = False
+
+    @property
+    def busy(self) -> bool:
+        """Whether the previous frame is still being sent."""
+        return self.sending is not None and not self.sending.done()
+
+    def send(self, frame: str, seq: int) -> None:
+        """Start sending a frame without waiting for the client."""
+        self.skipped = 0
+        self.last_seq = seq
+        self.sending = asyncio.create_task(self._send(frame))
+
+    async def _send(self, frame: str) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.send_text(frame), SEND_TIMEOUT_SEC)
+        except Exception:
+            await self.close()
+
+    async def close(self) -> None:
+        """Drop the viewer."""
+        if self.closed:
+            return
+        self.closed = True
+        if self in active_connections:
+            active_connections.remove(self)
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
+class Broadcaster:
+    """Encodes each snapshot once and fans it out to all viewers."""
+
+    def __init__(self, snapshotter: MetricsSnapshotter):
+        """Initialize with no snapshot yet."""
+        self.snapshotter = snapshotter
+        self.seq = 0
+        self.snapshot: Dict[str, Any] = {}
+        self._full_frame: Optional[str] = None
+        self.frames_encoded = 0
+
+    def full_frame(self) -> str:
+        """The current snapshot as a full frame, encoded at most once per tick."""
+        if self._full_frame is None:
+            self._full_frame = json.dumps(
+                {"type": "full", "seq": self.seq, "data": self.snapshot}
+            )
+            self.frames_encoded += 1
+        return self._full_frame
+
+    def tick(self) -> None:
+        """Take a snapshot and send every ready viewer its frame."""
+        snapshot = self.snapshotter.take()
+        changes = diff(self.snapshot, snapshot)
+        self.seq += 1
+        self.snapshot = snapshot
+        self._full_frame = None
+        delta_frame = None
+
+        for viewer in list(active_connections):
+            if viewer.busy:
+                viewer.skipped += 1
+                if viewer.skipped > MAX_SKIPPED_FRAMES:
+                    asyncio.create_task(viewer.close())
+                continue
+            if viewer.last_seq == self.seq - 1:
+                if delta_frame is None:
+                    delta_frame = json.dumps(
+                        {"type": "delta", "seq": self.seq, "data": changes}
+                    )
+                    self.frames_encoded += 1
+                viewer.send(delta_frame, self.seq)
+            else:
+                # New or lagging viewers need the whole state.
+                viewer.send(self.full_frame(), self.seq)
+
+    async def run(self) -> None:
+        """Tick every SNAPSHOT_INTERVAL_SEC until cancelled."""
+        while True:
+            self.tick()
+            await asyncio.sleep(SNAPSHOT_INTERVAL_SEC)
+
+
+# Store active WebSocket connections
+active_connections: List[Viewer] = []
+broadcaster = Broadcaster(MetricsSnapshotter())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the snapshot task for as long as the app is served."""
+    task = asyncio.create_task(broadcaster.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        for viewer in list(active_connections):
+            await viewer.close()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="src/web/static"), name="static")
@@ -25,74 +229,33 @@ app.mount("/static", StaticFiles(directory="src/web/static"), name="static")
 # Templates
 templates = Jinja2Templates(directory="src/web/templates")
 
-# Store active WebSocket connections
-active_connections: List[WebSocket] = []
-
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     return templates.TemplateResponse("dashboard.html", {"request": request})
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Return the latest snapshot, already encoded."""
+    return Response(broadcaster.full_frame(), media_type="application/json")
+
+
 @app.websocket("/ws/metrics")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time metrics updates."""
     await websocket.accept()
-    active_connections.append(websocket)
+    viewer = Viewer(websocket)
+    active_connections.append(viewer)
+    if broadcaster.seq:
+        viewer.send(broadcaster.full_frame(), broadcaster.seq)
     try:
+        # Frames are pushed by the broadcaster; this only notices the close.
         while True:
-            # Calculate metrics
-            elapsed = time.time() - _start_time
-            total_events = counters["total"]
-            total_bytes = counters["bytes"]
-
-            # Calculate rates
-            rolling_eps = (
-                sum(rolling_events) / len(rolling_events) if rolling_events else 0
-            )
-            global_eps = sum(global_events) / len(global_events) if global_events else 0
-            rolling_bps = (
-                sum(rolling_bytes) / len(rolling_bytes) if rolling_bytes else 0
-            )
-            global_bps = sum(global_bytes) / len(global_bytes) if global_bytes else 0
-
-            # Prepare stream data
-            stream_data = []
-            for stream, count in sorted(counters.items(), key=lambda x: -x[1]):
-                if stream in ("total", "bytes"):
-                    continue
-                percent = (count / total_events * 100) if total_events > 0 else 0
-                stream_data.append(
-                    {
-                        "name": stream,
-                        "count": count,
-                        "percent": round(percent, 1),
-                        "bytes": stream_bytes.get(stream, 0),
-                    }
-                )
-
-            # Prepare metrics data
-            metrics_data = {
-                "timestamp": datetime.now().isoformat(),
-                "elapsed": round(elapsed, 1),
-                "total_events": total_events,
-                "total_bytes": total_bytes,
-                "rolling_eps": round(rolling_eps, 0),
-                "global_eps": round(global_eps, 0),
-                "rolling_bps": round(rolling_bps / 1024 / 1024, 2),  # Convert to MB/s
-                "global_bps": round(global_bps / 1024 / 1024, 2),  # Convert to MB/s
-                "streams": stream_data,
-            }
-
-            # Send metrics to client
-            await websocket.send_json(metrics_data)
-            await asyncio.sleep(1)  # Update every second
-
-    except Exception:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
         pass
     finally:
-        active_connections.remove(websocket)
-
-
-# Global variable for start time
-_start_time = time.time()
+        viewer.closed = True
+        if viewer in active_connections:
+            active_connections.remove(viewer)
@@ -0,0 +1,40 @@
+"""
+Local ingestion endpoint for load-testing the HTTP sink on one machine.
+Accepts gzip or plain NDJSON batches on POST /ingest and counts what arrives.
+"""
+
+import asyncio
+import gzip
+import time
+
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+
+stats = {"requests": 0, "events": 0, "bytes": 0, "started": time.time()}
+
+
+@app.post("/ingest")
+async def ingest(request: Request):
+    """Accept one NDJSON batch and return the number of records received."""
+    body = await request.body()
+    stats["bytes"] += len(body)
+    if request.headers.get("content-encoding") == "gzip":
+        body = await asyncio.to_thread(gzip.decompress, body)
+    count = body.count(b"\n")
+    if body and not body.endswith(b"\n"):
+        count += 1
+    stats["requests"] += 1
+    stats["events"] += count
+    return {"accepted": count}
+
+
+@app.get("/stats")
+async def get_stats():
+    """Return totals and the average ingest rate since startup."""
+    elapsed = time.time() - stats["started"]
+    return {
+        **stats,
+        "elapsed": round(elapsed, 1),
+        "events_per_sec": round(stats["events"] / elapsed, 1) if elapsed else 0,
+    }
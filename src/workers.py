@@ -0,0 +1,176 @@
+"""
+Multi-process worker sharding for DataFlux.
+Each worker owns a slice of the user pool and runs its own event loop, buffers
+and sinks; the parent merges the per-worker counters into the dashboard.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import signal
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import instrumentation
+from src.counters import counters, stream_bytes
+from src.edge_buffer import cleanup, initialize_buffers
+from src.emitter import launch_emitters
+from src.rate_controller import start_rate_controller
+from src.user_pool import UserPool
+from src.utils import configure_generation
+
+
+def shard_user_pool(user_pool: UserPool, num_workers: int) -> List[UserPool]:
+    """Split the user pool into one round-robin shard per worker."""
+    return [user_pool.shard(i, num_workers) for i in range(num_workers)]
+
+
+def worker_stats(worker_id: int) -> Tuple[int, Dict, Dict, Dict]:
+    """Snapshot this worker's counters and pipeline stages for the parent."""
+    return worker_id, dict(counters), dict(stream_bytes), instrumentation.snapshot()
+
+
+async def report_stats(worker_id: int, stats_queue, interval: float) -> None:
+    """Periodically publish this worker's counters to the parent process."""
+    while True:
+        await asyncio.sleep(interval)
+        stats_queue.put(worker_stats(worker_id))
+
+
+async def run_worker(
+    worker_id: int,
+    users: UserPool,
+    config: Dict[str, Any],
+    stats_queue,
+    report_interval: float = 0.5,
+    share: float = 1.0,
+) -> None:
+    """Run emitters for one shard of users until cancelled or sent SIGTERM."""
+    # SIGTERM cancels the emitters so buffers flush and sinks close below.
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+    configure_generation(config, worker_id)
+    buffers = initialize_buffers(config["regions"], config)
+    reporter = asyncio.create_task(
+        report_stats(worker_id, stats_queue, report_interval)
+    )
+    # Each worker holds its share of the target rate, in proportion to its users.
+    rate_task = start_rate_controller(config, len(users), share)
+    loop_task = instrumentation.start_loop_monitor()
+    try:
+        await launch_emitters(users, config, buffers)
+    finally:
+        if rate_task:
+            rate_task.cancel()
+        loop_task.cancel()
+        reporter.cancel()
+        await cleanup()
+        stats_queue.put(worker_stats(worker_id))
+
+
+def worker_process(
+    worker_id, users, config, stats_queue, report_interval, share=1.0
+) -> None:
+    """Process entry point for a single DataFlux worker."""
+    # The parent owns Ctrl-C handling and stops workers with SIGTERM on shutdown.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(
+            run_worker(worker_id, users, config, stats_queue, report_interval, share)
+        )
+    except asyncio.CancelledError:
+        pass
+
+
+def start_workers(
+    user_pool: UserPool,
+    config: Dict[str, Any],
+    num_workers: int,
+    report_interval: float = 0.5,
+) -> Tuple[List[multiprocessing.Process], Any]:
+    """Start one worker process per user pool shard."""
+    stats_queue = multiprocessing.Queue()
+    processes = []
+    for worker_id, users in enumerate(shard_user_pool(user_pool, num_workers)):
+        process = multiprocessing.Process(
+            target=worker_process,
+            args=(
+                worker_id,
+                users,
+                config,
+                stats_queue,
+                report_interval,
+                len(users) / max(len(user_pool), 1),
+            ),
+            name=f"dataflux-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    return processes, stats_queue
+
+
+def stop_workers(
+    processes: List[multiprocessing.Process],
+    stats_queue=None,
+    snapshots: Optional[Dict[int, Tuple[Dict, Dict, Dict]]] = None,
+    timeout: float = 5,
+) -> None:
+    """Ask workers to flush and exit, killing any still running after timeout."""
+    snapshots = {} if snapshots is None else snapshots
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    while any(process.is_alive() for process in processes):
+        if time.monotonic() >= deadline:
+            break
+        # Keep draining so a worker never blocks on a full queue while exiting.
+        if stats_queue is not None:
+            drain_worker_stats(stats_queue, snapshots)
+        time.sleep(0.05)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+        process.join()
+    if stats_queue is not None:
+        drain_worker_stats(stats_queue, snapshots)
+        merge_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots: Dict[int, Tuple[Dict, Dict, Dict]]) -> None:
+    """Replace the parent's counters and stages with the sum of all workers'."""
+    counters.clear()
+    stream_bytes.clear()
+    for worker_counters, worker_bytes, _ in snapshots.values():
+        for key, value in worker_counters.items():
+            counters[key] += value
+        for key, value in worker_bytes.items():
+            stream_bytes[key] += value
+    instrumentation.load(
+        instrumentation.merge(stages for _, _, stages in snapshots.values())
+    )
+
+
+def drain_worker_stats(stats_queue, snapshots: Dict[int, Tuple[Dict, Dict, Dict]]):
+    """Keep the latest queued snapshot from each worker."""
+    try:
+        while True:
+            worker_id, *stats = stats_queue.get_nowait()
+            snapshots[worker_id] = tuple(stats)
+    except queue.Empty:
+        pass
+
+
+async def merge_worker_stats(
+    stats_queue,
+    interval: float = 0.5,
+    snapshots: Optional[Dict[int, Tuple[Dict, Dict, Dict]]] = None,
+) -> None:
+    """Drain worker snapshots and merge them into the parent's counters."""
+    snapshots = {} if snapshots is None else snapshots
+    while True:
+        drain_worker_stats(stats_queue, snapshots)
+        merge_snapshots(snapshots)
+        await asyncio.sleep(interval)
@@ -0,0 +1,91 @@
+import json
+import time
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from src import backfill, utils
+from src.clock import SimulatedClock
+from src.rate_controller import nominal_rate
+from src.ulid import decode
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "emitters": 100,
+        "emitter_batch_size": 200,
+        "regions": [{"name": "us-west"}, {"name": "us-east"}],
+        "streams": {
+            "video_logs": {"weight": 0.75, "interval_sec": 1.0},
+            "user_interactions": {"weight": 0.25, "interval_sec": 1.0},
+        },
+        "flush_batch_size": 500,
+        "flush_interval_sec": 1,
+        "time_jitter_sec": 0,
+        "seed": 3,
+        "events_per_second": 400,
+        "sinks": {
+            "file": {"type": "file", "file": {"output_dir": str(tmp_path / "out")}}
+        },
+    }
+
+
+def read_events(tmp_path):
+    return [
+        json.loads(line)
+        for path in sorted((tmp_path / "out").glob("*.jsonl"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+def test_parse_time_defaults_to_utc():
+    assert backfill.parse_time("2024-01-01") == 1704067200
+    assert backfill.parse_time("2024-01-01T01:00:00+01:00") == 1704067200
+
+
+def test_time_source_change_moves_ulid_times():
+    utils.generate_ulid()
+    start = backfill.parse_time("2024-01-01")
+    utils.set_time_source(SimulatedClock(start))
+    try:
+        assert decode(utils.generate_ulid())[0] == start * 1000
+        assert decode(utils.generate_ulids(3)[0])[0] == start * 1000
+    finally:
+        utils.set_time_source(time.time)
+    assert decode(utils.generate_ulid())[0] > start * 1000
+
+
+def test_rate_follows_the_shape_or_the_live_rate(config):
+    shape = backfill.event_rate(config, 100)
+    assert shape(0) == 400
+    assert backfill.expected_events(shape, 90) == 36_000
+
+    config["events_per_second"] = None
+    assert backfill.event_rate(config, 100)(0) == nominal_rate(config, 100) == 100
+
+
+@pytest.mark.asyncio
+async def test_backfill_fills_the_window_without_sleeping(config, tmp_path):
+    start = backfill.parse_time("2024-01-01T00:00:00")
+    end = start + 600
+    began = time.monotonic()
+    generated = await backfill.run_backfill(config, start, end)
+    assert time.monotonic() - began < 30
+
+    events = read_events(tmp_path)
+    assert generated == len(events) == pytest.approx(240_000, abs=1)
+    stamps = sorted(event["timestamp"] for event in events)
+    assert stamps[0] >= "2024-01-01T00:00:00"
+    assert stamps[-1] < "2024-01-01T00:10:00"
+    # Events are spread over the window, not bunched at its ends.
+    minutes = Counter(stamp[:16] for stamp in stamps)
+    assert len(minutes) == 10
+    assert min(minutes.values()) > 20_000
+    streams = Counter(event["stream"] for event in events)
+    assert streams["video_logs"] / len(events) == pytest.approx(0.75, abs=0.01)
+    assert start * 1000 <= decode(events[0]["event_id"])[0] < end * 1000
+
+    # The wall clock is back once the backfill ends.
+    assert utils.now()[:10] == datetime.utcnow().isoformat()[:10]
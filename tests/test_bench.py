@@ -0,0 +1,72 @@
+import pytest
+
+from src import bench
+
+
+@pytest.fixture
+def config():
+    return {
+        "streams": {
+            "video_logs": {"weight": 0.75},
+            "user_interactions": {"weight": 0.25},
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_only_runs_matching_cases(config):
+    sampler = await bench.run_benchmarks(config, case_sec=0.01, only="weighted")
+    assert sampler["results"]["weighted_random_choice"]["events"] > 0
+
+    results = await bench.run_benchmarks(config, case_sec=0.01, only="registry")
+    assert list(results["results"]) == ["registry.flush"]
+    flush = results["results"]["registry.flush"]
+    assert flush["events"] > 0
+    assert flush["bytes_per_sec"] > flush["events_per_sec"]
+    assert results["cpu_count"]
+
+
+@pytest.mark.asyncio
+async def test_every_sink_runs_against_its_stand_in():
+    results = await bench.bench_sinks(0.01)
+    assert {"sinks.mock", "sinks.file", "sinks.event_log", "sinks.kafka"} <= set(
+        results
+    )
+    assert "sinks.fastapi" in results
+    assert all(row["events"] > 0 for row in results.values())
+
+
+def test_generator_cases_cover_every_stream():
+    results = bench.bench_generators(0.005)
+    for stream in bench.event_generators_map:
+        assert results[f"generators.{stream}"]["events"] > 0
+        assert results[f"batch_generators.{stream}"]["events"] > 0
+
+
+def test_compare_flags_drops_beyond_tolerance():
+    baseline = {
+        "results": {
+            "fast": bench.result(1000, 0, 1.0),
+            "slow": bench.result(1000, 0, 1.0),
+        }
+    }
+    current = {
+        "results": {
+            "fast": bench.result(900, 0, 1.0),
+            "slow": bench.result(700, 0, 1.0),
+            "new": bench.result(10, 0, 1.0),
+        }
+    }
+    rows = {row["case"]: row for row in bench.compare(current, baseline, 0.2)}
+    assert set(rows) == {"fast", "slow"}
+    assert not rows["fast"]["regression"]
+    assert rows["slow"]["regression"]
+    assert rows["slow"]["change"] == pytest.approx(-0.3)
+
+
+def test_results_round_trip(tmp_path):
+    path = tmp_path / "nested" / "bench.json"
+    assert bench.load_results(str(path)) is None
+    bench.save_results({"results": {"x": bench.result(5, 10, 2.0)}}, str(path))
+    loaded = bench.load_results(str(path))
+    assert loaded["results"]["x"]["events_per_sec"] == 2.5
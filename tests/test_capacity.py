@@ -0,0 +1,62 @@
+import pytest
+
+from src import capacity
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "mode": "safe",
+        "emitters": 200,
+        "emitter_mode": "batch",
+        "emitter_batch_size": 50,
+        "regions": [{"name": "us-west"}, {"name": "us-east"}],
+        "streams": {
+            "video_logs": {"weight": 0.5, "interval_sec": 0.5},
+            "user_interactions": {"weight": 0.5, "interval_sec": 1.0},
+        },
+        "flush_batch_size": 100,
+        "flush_interval_sec": 0.05,
+        "time_jitter_sec": 2,
+        "events_per_second": 5000,
+        "sinks": {
+            "file": {"type": "file", "file": {"output_dir": str(tmp_path / "out")}}
+        },
+    }
+
+
+def test_open_loop_removes_sleeps_without_touching_config(config):
+    probed = capacity.open_loop(config)
+    assert all(props["interval_sec"] == 0 for props in probed["streams"].values())
+    assert probed["time_jitter_sec"] == 0
+    assert probed["events_per_second"] is None
+    assert probed["mode"] != "safe"
+    assert config["streams"]["video_logs"]["interval_sec"] == 0.5
+
+
+def test_bottleneck_is_the_costliest_stage_including_scheduling():
+    stages = {
+        "generate": {"events_per_sec": 500_000},
+        "serialize": {"events_per_sec": 100_000},
+    }
+    # 2us + 10us of stage work per event leaves 8us of scheduling at 50k/s.
+    report = capacity.find_bottleneck(stages, 50_000)
+    assert report["bottleneck"] == "serialize"
+    assert report["serial_ceiling_eps"] == pytest.approx(1e6 / 12, rel=1e-3)
+    assert report["cost_us_per_event"]["scheduling"] == pytest.approx(8.0)
+    assert capacity.find_bottleneck(stages, 20_000)["bottleneck"] == "scheduling"
+
+
+def test_replicas_round_up_per_pod_capacity():
+    assert capacity.replicas_for(1_000_000, 100_000, 4) == 3
+    assert capacity.replicas_for(1_000_000, 0, 4) == 0
+
+
+@pytest.mark.asyncio
+async def test_probe_reports_every_stage(config):
+    report = await capacity.probe(config, stage_sec=0.02, duration_sec=0.3)
+    assert set(report["stages"]) == {"generate", "buffer", "serialize", "sink"}
+    assert report["sinks"]["file"]["events"] > 0
+    assert report["end_to_end"]["events_per_sec"] > 0
+    assert report["bottleneck"] in report["cost_us_per_event"]
+    assert report["replicas"] >= 1
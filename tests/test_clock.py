@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.clock import CoarseClock
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_now_matches_isoformat_and_is_cached_per_step():
+    source = FakeClock(1_700_000_000.123456)
+    clock = CoarseClock(resolution_sec=0.001, time_source=source)
+    expected = datetime.fromtimestamp(1_700_000_000.123, timezone.utc)
+    assert clock.now() == expected.replace(tzinfo=None).isoformat()
+
+    first = clock.now()
+    source.now += 0.0004
+    assert clock.now() is first
+    source.now += 0.001
+    assert clock.now() != first
+
+    source.now = 1_700_000_001.0
+    assert clock.now() == "2023-11-14T22:13:21"
+
+
+def test_batch_timestamps_with_jitter_stay_in_range():
+    source = FakeClock(1_700_000_000.5)
+    clock = CoarseClock(resolution_sec=0.001, time_source=source)
+    assert clock.timestamps(3) == [clock.now()] * 3
+
+    stamps = clock.timestamps(1000, jitter_sec=0.1, rng=np.random.default_rng(1))
+    assert len(stamps) == 1000
+    assert len(set(stamps)) > 50
+    assert min(stamps) >= "2023-11-14T22:13:20.400000"
+    assert max(stamps) <= "2023-11-14T22:13:20.600000"
@@ -0,0 +1,74 @@
+import json
+import multiprocessing
+import time
+
+import pytest
+
+from src import utils
+from src.emitter import batch_event_generators_map, event_generators_map
+from src.event_batch import EventBatch
+from src.serializer import encode_batch
+from src.user_pool import UserPool
+
+
+@pytest.fixture
+def pinned_clock():
+    utils.set_time_source(lambda: 1_700_000_000.25)
+    yield
+    utils.set_time_source(time.time)
+
+
+def generate_all(seed, worker_id=None):
+    """Encode a batch and a few scalar events from every generator."""
+    utils.configure_generation({"seed": seed}, worker_id)
+    user_ids = [f"u{i}" for i in range(50)]
+    device_ids = [f"d{i}" for i in range(50)]
+    output = b""
+    for stream, generate_batch in batch_event_generators_map.items():
+        columns = generate_batch(user_ids, device_ids, 50)
+        output += encode_batch(EventBatch.from_columns(stream, columns)).buffer
+    for generate in event_generators_map.values():
+        for i in range(5):
+            output += json.dumps(generate(f"u{i}", f"d{i}")).encode() + b"\n"
+    return output
+
+
+def test_same_seed_gives_byte_identical_output(pinned_clock):
+    assert generate_all(42) == generate_all(42)
+    assert generate_all(42, worker_id=3) == generate_all(42, worker_id=3)
+
+
+def test_seed_and_worker_select_independent_streams(pinned_clock):
+    assert generate_all(42) != generate_all(43)
+    assert generate_all(42, worker_id=0) != generate_all(42, worker_id=1)
+
+
+def draw_in_worker(worker_id, results):
+    utils.configure_generation({}, worker_id)
+    results.put(
+        (utils.get_rng().integers(0, 1 << 62, 4).tolist(), utils.random_hex(32))
+    )
+
+
+def test_unseeded_forked_workers_draw_independent_streams():
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(target=draw_in_worker, args=(worker_id, results))
+        for worker_id in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    draws = [results.get(timeout=10) for _ in workers]
+    for worker in workers:
+        worker.join()
+    assert draws[0][0] != draws[1][0]
+    assert draws[0][1] != draws[1][1]
+
+
+def test_user_pool_is_reproducible(pinned_clock):
+    regions = [{"name": "us-west"}, {"name": "us-east"}]
+    utils.configure_generation({"seed": 7})
+    first = list(UserPool.generate(100, regions))
+    utils.configure_generation({"seed": 7})
+    assert list(UserPool.generate(100, regions)) == first
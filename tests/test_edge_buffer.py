@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from src import edge_buffer
+
+
+class RecordingRegistry:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.flushed = []
+
+    async def flush(self, region, batch, counters):
+        await asyncio.sleep(self.delay)
+        self.flushed.append((region, len(batch)))
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = RecordingRegistry()
+    monkeypatch.setattr(edge_buffer, "emitter_registry", registry)
+    yield registry
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_interval_without_reaching_batch_size(registry):
+    for i in range(3):
+        await edge_buffer.add_to_buffer({"event_id": i}, "r1", 100, 0.05, {})
+    assert registry.flushed == []
+    await asyncio.sleep(0.15)
+    assert registry.flushed == [("r1", 3)]
+    await edge_buffer.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_batch_size_flush_runs_off_the_emitter_path(registry):
+    registry.delay = 0.2
+    for i in range(10):
+        await edge_buffer.add_to_buffer({"event_id": i}, "r2", 10, 5, {})
+    # The emitter returns immediately; the flush happens in the background.
+    assert edge_buffer.buffer_sizes["r2"] == 10
+    await asyncio.sleep(0.05)
+    assert edge_buffer.buffer_sizes["r2"] == 0
+    assert registry.flushed == []
+    await asyncio.sleep(0.25)
+    assert registry.flushed == [("r2", 10)]
+    await edge_buffer.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_flushes_leftover_events(registry):
+    await edge_buffer.add_to_buffer({"event_id": 1}, "r3", 100, 5, {})
+    await edge_buffer.cleanup()
+    assert registry.flushed == [("r3", 1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_counted_not_lost(registry, monkeypatch):
+    async def fail(region, batch, counters):
+        raise RuntimeError("encoder crashed")
+
+    monkeypatch.setattr(registry, "flush", fail)
+    monkeypatch.setattr(edge_buffer, "flush_errors", edge_buffer.defaultdict(int))
+    monkeypatch.setattr(
+        edge_buffer, "flush_dropped_events", edge_buffer.defaultdict(int)
+    )
+    for i in range(4):
+        await edge_buffer.add_to_buffer({"event_id": i}, "r4", 2, 5, {})
+    await asyncio.sleep(0.01)
+    await edge_buffer.cleanup()
+    assert edge_buffer.flush_errors["r4"] == 1
+    assert edge_buffer.flush_dropped_events["r4"] == 4
@@ -0,0 +1,106 @@
+import asyncio
+import gzip
+import threading
+import time
+
+import pytest
+
+from src import encoder_pool
+from src.emitter_registry import EmitterRegistry
+from src.encoder_pool import EncoderPool
+from src.event_batch import EventBatch
+from src.instrumentation import Histogram, sample_loop_lag
+from src.serializer import encode_batch
+from src.sinks.fastapi_sink import FastAPISink
+
+
+def make_batch(n=50):
+    return EventBatch.from_columns(
+        "clicks", {"event_id": list(range(n)), "page": ["home"] * n}
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+async def test_pools_encode_like_the_serializer(kind):
+    pool = EncoderPool(kind, workers=1, compression="gzip")
+    batch = make_batch()
+    try:
+        encoded = await pool.encode(batch)
+    finally:
+        await pool.close()
+    expected = encode_batch(batch)
+    assert encoded.buffer == expected.buffer
+    assert encoded.stream_stats == expected.stream_stats
+    assert encoded.batch is batch
+    assert gzip.decompress(encoded.compressed["gzip"]) == encoded.buffer
+    assert pool.get_metrics()["encoded_batches"] == 1
+
+
+def test_unknown_pool_or_compression_is_rejected():
+    with pytest.raises(ValueError):
+        EncoderPool("fiber")
+    with pytest.raises(ValueError):
+        EncoderPool("thread", compression="lz4")
+
+
+@pytest.mark.asyncio
+async def test_inflight_batches_are_bounded(monkeypatch):
+    running, peak = 0, 0
+    lock = threading.Lock()
+    encode = encoder_pool.encode_payload
+
+    def slow_encode(*args):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return encode(*args)
+
+    monkeypatch.setattr(encoder_pool, "encode_payload", slow_encode)
+    pool = EncoderPool("thread", workers=4, max_inflight=2)
+    await asyncio.gather(*[pool.encode(make_batch()) for _ in range(6)])
+    await pool.close()
+    assert peak == 2
+    assert pool.inflight == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_flushes_through_the_configured_pool():
+    registry = EmitterRegistry({"sinks": {}, "encoder": {"pool": "thread"}})
+    await registry.flush("us-west", make_batch(), {})
+    assert registry.encoder.get_metrics()["encoded_batches"] == 1
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_fastapi_sink_reuses_the_pool_gzip_payload(monkeypatch):
+    posts = []
+    sink = FastAPISink()
+
+    async def post(body, count):
+        posts.append(body)
+        sink._in_flight.release()
+
+    monkeypatch.setattr(sink, "_post", post)
+    monkeypatch.setattr(gzip, "compress", pytest.fail)
+    encoded = encode_batch(make_batch())
+    encoded.compressed["gzip"] = b"precompressed"
+    await sink.send_encoded(encoded)
+    await asyncio.sleep(0)
+    assert posts == [b"precompressed"]
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_sampler_sees_a_blocked_loop():
+    histogram = Histogram()
+    sampler = asyncio.create_task(sample_loop_lag(histogram, 0.001))
+    await asyncio.sleep(0.005)
+    time.sleep(0.05)
+    await asyncio.sleep(0.005)
+    sampler.cancel()
+    assert histogram.count >= 2
+    assert histogram.quantile(1.0) >= 0.025
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from src.event_batch import EventBatch
+from src.sinks.mock_sink import MockSink
+
+
+def test_rows_and_columns_round_trip():
+    events = [
+        {"event_id": "a", "value": 1, "stream": "s1"},
+        {"event_id": "b", "value": 2, "stream": "s2"},
+        {"event_id": "c", "value": 3, "stream": "s1"},
+    ]
+    batch = EventBatch.from_rows(events)
+    assert len(batch) == 3
+    assert batch.as_columns()["s1"] == {"event_id": ["a", "c"], "value": [1, 3]}
+    assert sorted(batch.to_dicts(), key=lambda e: e["event_id"]) == events
+
+
+def test_concat_and_lazy_rows():
+    first = EventBatch.from_columns(
+        "s1", {"event_id": ["a", "b"], "value": np.array([1.5, 2.5])}
+    )
+    second = EventBatch.from_columns(
+        "s1", {"event_id": ["c"], "value": np.array([3.5])}
+    )
+    batch = EventBatch.from_parts([first, second, {"event_id": "d", "stream": "s2"}])
+    assert batch.sizes == {"s1": 3, "s2": 1}
+    assert isinstance(batch.as_columns()["s1"]["value"], np.ndarray)
+
+    rows = list(batch.rows())
+    assert rows[2]["value"] == 3.5
+    assert type(rows[2]["value"]) is float
+    assert rows[2]["stream"] == "s1"
+    assert dict(rows[3]) == {"event_id": "d", "stream": "s2"}
+
+
+@pytest.mark.asyncio
+async def test_default_send_batch_adapter():
+    sink = MockSink()
+    sink.initialize({})
+    batch = EventBatch.from_columns("s1", {"event_id": ["a", "b"]})
+    await sink.send_batch(batch)
+    assert sink.get_metrics()["total_event_count"] == 2
@@ -0,0 +1,36 @@
+import pytest
+
+from src.emitter import batch_event_generators_map, event_generators_map
+from src.event_batch import EventBatch
+
+
+def generate_batch(stream, n):
+    columns = batch_event_generators_map[stream](["u000001"] * n, ["d000001"] * n, n)
+    return EventBatch.from_columns(stream, columns).to_dicts()
+
+
+@pytest.mark.parametrize("stream", sorted(event_generators_map))
+def test_batch_generator_matches_scalar_schema(stream):
+    scalar = event_generators_map[stream]("u000001", "d000001")
+    scalar["stream"] = stream
+    batch = generate_batch(stream, 50)
+    assert len(batch) == 50
+    for event in batch:
+        assert list(event) == list(scalar)
+        for key, value in scalar.items():
+            assert type(event[key]) is type(value), key
+
+
+def test_batch_generator_value_ranges():
+    n = 2000
+    events = generate_batch("recommendation_feedback", n)
+    for event in events:
+        assert event["items_shown"].index(event["item_clicked"]) + 1 == (
+            event["click_rank"]
+        )
+        assert 5 <= event["engagement_time_sec"] <= 300
+
+    events = generate_batch("device_telemetry", n)
+    error_rate = sum(1 for event in events if event["errors"]) / n
+    assert 0.08 < error_rate < 0.22
+    assert all(10 <= event["battery"] <= 100 for event in events)
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from src.event_log import EventLogReader, EventLogWriter, replay
+from src.serializer import encode_events
+from src.sinks.factory import SinkFactory
+
+
+def encoded(*ids):
+    return encode_events([{"event_id": i, "stream": "s"} for i in ids])
+
+
+def test_reader_returns_recorded_frames(tmp_path):
+    path = str(tmp_path / "events.dflog")
+    writer = EventLogWriter(path)
+    writer.append(encoded(1, 2))
+    writer.append(encoded(3))
+    writer.close()
+
+    reader = EventLogReader(path)
+    assert len(reader) == 2
+    assert reader.event_count == 3
+    assert reader.frame(0).buffer == encoded(1, 2).buffer
+    assert reader.frame(1).stream_stats == encoded(3).stream_stats
+    assert [e["event_id"] for e in reader.frame(1).to_dicts()] == [3]
+    reader.close()
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"event_id": 1}\n')
+    with pytest.raises(ValueError):
+        EventLogReader(str(path))
+
+
+@pytest.mark.asyncio
+async def test_event_log_sink_records_for_max_speed_replay(tmp_path):
+    path = str(tmp_path / "events.dflog")
+    sink = SinkFactory.create_sink("event_log", {"event_log": {"path": path}})
+    await sink.send_encoded(encoded(1, 2, 3))
+    await sink.send([{"event_id": 4, "stream": "s"}])
+    await sink.close()
+
+    reader = EventLogReader(path)
+    published = []
+
+    async def publish(batch):
+        published.append(batch.buffer)
+
+    assert await replay(reader, publish, speed=None, loops=3) == 12
+    assert published == [encoded(1, 2, 3).buffer, encoded(4).buffer] * 3
+    reader.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_follows_recorded_timing_scaled_by_speed(tmp_path):
+    path = str(tmp_path / "events.dflog")
+    writer = EventLogWriter(path)
+    writer.append(encoded(1))
+    time.sleep(0.2)
+    writer.append(encoded(2))
+    writer.close()
+
+    reader = EventLogReader(path)
+
+    async def publish(batch):
+        pass
+
+    start = time.monotonic()
+    await replay(reader, publish, speed=2)
+    assert 0.08 <= time.monotonic() - start < 0.2
+    reader.close()
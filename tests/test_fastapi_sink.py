@@ -1,20 +1,54 @@
-from unittest.mock import MagicMock
+import gzip
 
+import httpx
 import pytest
 
 from src.sinks.fastapi_sink import FastAPISink
+from src.web import receiver
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.posts = []
+
+    async def post(self, url, content, headers):
+        self.posts.append((url, gzip.decompress(content), headers))
+        return FakeResponse()
+
+    async def aclose(self):
+        pass
 
 
 @pytest.mark.asyncio
 async def test_fastapi_sink_event_count_and_metrics():
     sink = FastAPISink()
-    sink.client = MagicMock()  # Mock the HTTP client
+    client = sink.client = FakeClient()
     events = [{"event_id": i} for i in range(5)]
     await sink.send(events)
-    metrics = sink.get_metrics()
-    assert metrics["type"] == "fastapi"
-    assert metrics["event_count"] == 5
-    # Send more events
     await sink.send(events)
+    await sink.close()
     metrics = sink.get_metrics()
+    assert metrics["type"] == "fastapi"
     assert metrics["event_count"] == 10
+    assert metrics["request_count"] == 2
+    assert metrics["latency_ms"]["p99"] >= metrics["latency_ms"]["p50"] >= 0
+    url, body, headers = client.posts[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert body.count(b"\n") == 5
+
+
+@pytest.mark.asyncio
+async def test_fastapi_sink_posts_to_bundled_receiver():
+    receiver.stats.update(requests=0, events=0, bytes=0)
+    sink = FastAPISink()
+    sink.initialize({"fastapi": {"url": "http://receiver/ingest"}})
+    sink.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=receiver.app))
+    await sink.send([{"event_id": i} for i in range(100)])
+    await sink.close()
+    assert receiver.stats["events"] == 100
+    assert sink.get_metrics()["failed_count"] == 0
@@ -0,0 +1,64 @@
+import gzip
+import json
+
+import pytest
+
+from src.sinks.factory import SinkFactory
+
+
+def make_sink(tmp_path, **file_config):
+    return SinkFactory.create_sink(
+        "file", {"file": {"output_dir": str(tmp_path), **file_config}}
+    )
+
+
+def read_lines(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_file_sink_writes_every_event(tmp_path):
+    sink = make_sink(tmp_path)
+    await sink.send([{"event_id": i} for i in range(250)])
+    await sink.close()
+    files = list(tmp_path.glob("*.jsonl"))
+    assert len(files) == 1
+    assert [e["event_id"] for e in read_lines(files[0])] == list(range(250))
+    metrics = sink.get_metrics()
+    assert metrics["type"] == "file"
+    assert metrics["event_count"] == 250
+
+
+@pytest.mark.asyncio
+async def test_file_sink_rotates_gzip_files_by_size(tmp_path):
+    sink = make_sink(tmp_path, compression="gzip", rotate_mb=0.001)
+    for start in range(0, 100, 10):
+        await sink.send(
+            [{"event_id": i, "pad": "x" * 100} for i in range(start, start + 10)]
+        )
+    await sink.close()
+    files = sorted(tmp_path.glob("*.jsonl.gz"))
+    assert len(files) > 1
+    assert sink.get_metrics()["files_written"] == len(files)
+    events = [e["event_id"] for path in files for e in read_lines(path)]
+    assert events == list(range(100))
+
+
+@pytest.mark.asyncio
+async def test_file_sinks_sharing_a_directory_never_overwrite(tmp_path):
+    sinks = [make_sink(tmp_path), make_sink(tmp_path)]
+    for offset, sink in enumerate(sinks):
+        await sink.send([{"event_id": offset * 10 + i} for i in range(10)])
+    for sink in sinks:
+        await sink.close()
+    files = list(tmp_path.glob("*.jsonl"))
+    assert len(files) == 2
+    events = sorted(e["event_id"] for path in files for e in read_lines(path))
+    assert events == list(range(20))
+
+
+def test_file_sink_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        make_sink(tmp_path, compression="lzma")
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from src import instrumentation, metrics_exporter
+from src.instrumentation import Histogram
+from src.serializer import encode_events
+from src.sink_queue import SinkQueue
+
+
+class RecordingSink:
+    def __init__(self):
+        self.received = 0
+
+    async def send_encoded(self, encoded):
+        await asyncio.sleep(0.002)
+        self.received += len(encoded)
+
+    async def close(self):
+        pass
+
+    def get_metrics(self):
+        return {"type": "recording"}
+
+
+class FakeRegistry:
+    def __init__(self, queue):
+        self.queue = queue
+
+    def get_all_metrics(self):
+        return {self.queue.name: {"queue": self.queue.get_metrics()}}
+
+
+@pytest.fixture(autouse=True)
+def clean_stages():
+    instrumentation.reset()
+    yield
+    instrumentation.reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram((0.001, 0.01, 0.1))
+    for seconds in [0.0005] * 50 + [0.005] * 49 + [5.0]:
+        histogram.observe(seconds)
+    assert histogram.counts == [50, 49, 0, 1]
+    assert histogram.count == 100
+    assert histogram.sum == pytest.approx(5.27, rel=1e-3)
+    assert histogram.quantile(0.5) == pytest.approx(0.001)
+    assert 0.001 < histogram.quantile(0.9) <= 0.01
+    # The overflow bucket reports its lower bound.
+    assert histogram.quantile(1.0) == 0.1
+
+
+def test_snapshots_merge_across_workers():
+    instrumentation.stage("generate").observe(0.002, 100)
+    first = instrumentation.snapshot()
+    instrumentation.reset()
+    instrumentation.stage("generate").observe(0.02, 50)
+    instrumentation.stage("send", "kafka").observe(0.1, 150)
+    merged = instrumentation.merge([first, instrumentation.snapshot()])
+    assert merged["generate"]["events"] == 150
+    assert merged["generate"]["calls"] == 2
+    assert merged["send:kafka"]["calls"] == 1
+
+    instrumentation.load(merged)
+    summary = instrumentation.summary()
+    assert summary["generate"]["events"] == 150
+    assert summary["generate"]["p99_ms"] > summary["generate"]["p50_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_sink_queue_records_wait_and_send_stages():
+    queue = SinkQueue("recorder", RecordingSink())
+    for i in range(3):
+        await queue.put(encode_events([{"event_id": i, "stream": "s"}] * 10))
+    await queue.close()
+    summary = instrumentation.summary()
+    assert summary["queue_wait:recorder"]["events"] == 30
+    assert summary["send:recorder"]["calls"] == 3
+    assert summary["send:recorder"]["busy_sec"] >= 0.006
+
+
+@pytest.mark.asyncio
+async def test_prometheus_collector_renders_the_published_snapshot():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    queue = SinkQueue("recorder", RecordingSink())
+    await queue.put(encode_events([{"event_id": 1, "stream": "s"}] * 4))
+    await queue.close()
+    metrics_exporter.publish_snapshot(FakeRegistry(queue))
+
+    registry = prometheus_client.CollectorRegistry()
+    registry.register(metrics_exporter.DataFluxCollector())
+    text = prometheus_client.generate_latest(registry).decode()
+    assert 'dataflux_stage_events_total{sink="recorder",stage="send"} 4.0' in text
+    assert 'dataflux_stage_seconds_count{sink="recorder",stage="send"} 1.0' in text
+    assert 'dataflux_sink_sent_events_total{sink="recorder"} 4.0' in text
+    assert 'dataflux_sink_queue_depth{sink="recorder"} 0.0' in text
+
+
+def test_metrics_port_is_off_unless_enabled():
+    assert metrics_exporter.metrics_port({}) is None
+    assert metrics_exporter.metrics_port({"metrics": {"enabled": True}}) == 9100
+    config = {"metrics": {"enabled": True, "port": 9200}}
+    assert metrics_exporter.metrics_port(config) == 9200
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_feeds_its_own_prometheus_histogram():
+    prometheus_client = pytest.importorskip("prometheus_client")
+    task = instrumentation.start_loop_monitor(0.001)
+    await asyncio.sleep(0.02)
+    task.cancel()
+    lag = instrumentation.loop_lag_summary()
+    assert lag["loop"] == "asyncio"
+    assert lag["samples"] > 0
+
+    metrics_exporter.publish_snapshot()
+    registry = prometheus_client.CollectorRegistry()
+    registry.register(metrics_exporter.DataFluxCollector())
+    text = prometheus_client.generate_latest(registry).decode()
+    assert "dataflux_event_loop_lag_seconds_count" in text
+    assert 'stage="loop_lag"' not in text
+
+
+def test_uvloop_flag_falls_back_to_asyncio(monkeypatch):
+    from src import main
+
+    monkeypatch.setattr(main, "uvloop", None)
+    assert main.use_event_loop("uvloop") == "asyncio"
+    assert main.use_event_loop("asyncio") == "asyncio"
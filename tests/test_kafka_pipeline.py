@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import pytest
+from aiokafka.errors import KafkaError
+
+from src.serializer import encode_events
+from src.sinks.kafka_sink import KafkaSink
+
+
+class FakeBatch:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.values = []
+        self.size = 0
+
+    def append(self, *, key, value, timestamp):
+        if len(value) > self.max_size or (
+            self.values and self.size + len(value) > self.max_size
+        ):
+            return None
+        self.values.append(value)
+        self.size += len(value)
+        return object()
+
+
+class FakeProducer:
+    """In-process stand-in for AIOKafkaProducer's batch API."""
+
+    def __init__(self, fail_first=0, max_size=1024, fail_attempts=(), partitions=None):
+        self.fail_first = fail_first
+        self.fail_attempts = set(fail_attempts)
+        self.max_size = max_size
+        self.partitions = partitions or [{0, 1, 2}]
+        self.sent = []
+        self.attempts = 0
+
+    def create_batch(self):
+        return FakeBatch(self.max_size)
+
+    async def partitions_for(self, topic):
+        return (
+            self.partitions.pop(0) if len(self.partitions) > 1 else self.partitions[0]
+        )
+
+    async def send(self, topic, *, value):
+        future = asyncio.get_running_loop().create_future()
+        self.sent.append((None, [value]))
+        future.set_result(None)
+        return future
+
+    async def send_batch(self, batch, topic, *, partition):
+        self.attempts += 1
+        future = asyncio.get_running_loop().create_future()
+        if self.attempts <= self.fail_first or self.attempts in self.fail_attempts:
+            future.set_exception(KafkaError("broker unavailable"))
+        else:
+            self.sent.append((partition, batch.values))
+            future.set_result(None)
+        return future
+
+    async def stop(self):
+        pass
+
+
+def make_sink(producer, **kafka_config):
+    sink = KafkaSink()
+    sink.initialize(
+        {"kafka": {"pipelined": True, "retry_backoff_ms": 1, **kafka_config}}
+    )
+    sink.producer = producer
+    return sink
+
+
+@pytest.mark.asyncio
+async def test_pipelined_send_batches_records_across_partitions():
+    producer = FakeProducer()
+    sink = make_sink(producer, max_batch_size=4096, max_in_flight=2)
+    events = [{"event_id": i, "stream": "s", "pad": "x" * 100} for i in range(200)]
+    await sink.send_encoded(encode_events(events))
+    await sink.close()
+
+    values = [value for _, batch in producer.sent for value in batch]
+    assert len(values) == 200
+    decoded = [json.loads(value) for value in values]
+    assert sorted(event["event_id"] for event in decoded) == list(range(200))
+    assert decoded[0]["_kafka_metadata"]["topic"] == "dataflux-events"
+    assert len(producer.sent) > 1
+    assert {partition for partition, _ in producer.sent} == {0, 1, 2}
+    metrics = sink.get_metrics()
+    assert metrics["event_count"] == 200
+    assert metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pipelined_send_retries_whole_batch():
+    producer = FakeProducer(fail_first=2)
+    sink = make_sink(producer, max_retries=3)
+    await sink.send([{"event_id": i} for i in range(5)])
+    await sink.close()
+
+    assert producer.attempts == 3
+    assert len(producer.sent) == 1
+    metrics = sink.get_metrics()
+    assert metrics["event_count"] == 5
+    assert metrics["error_count"] == 2
+    assert metrics["failed_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pipelined_retry_resends_only_failed_batches():
+    producer = FakeProducer(fail_attempts={2})
+    sink = make_sink(producer, max_batch_size=4096)
+    events = [{"event_id": i, "pad": "x" * 100} for i in range(30)]
+    await sink.send(events)
+    await sink.close()
+
+    ids = [
+        json.loads(value)["event_id"] for _, batch in producer.sent for value in batch
+    ]
+    assert sorted(ids) == list(range(30))
+    metrics = sink.get_metrics()
+    assert metrics["event_count"] == 30
+    assert metrics["error_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_records_larger_than_a_batch_are_sent_alone():
+    producer = FakeProducer(max_size=200)
+    sink = make_sink(producer)
+    await sink.send([{"event_id": 0}, {"event_id": 1, "pad": "x" * 500}])
+    await sink.close()
+
+    assert sorted(len(batch) for _, batch in producer.sent) == [1, 1]
+    assert sink.get_metrics()["event_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_topic_without_partitions_is_retried():
+    producer = FakeProducer(partitions=[set(), {0}])
+    sink = make_sink(producer, max_retries=2)
+    await sink.send([{"event_id": i} for i in range(3)])
+    await sink.close()
+
+    assert producer.sent == [(0, producer.sent[0][1])]
+    metrics = sink.get_metrics()
+    assert metrics["event_count"] == 3
+    assert metrics["error_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_kafka_errors_are_counted_as_failed():
+    producer = FakeProducer()
+
+    def closed():
+        raise RuntimeError("producer is closed")
+
+    producer.create_batch = closed
+    sink = make_sink(producer, max_retries=2)
+    await sink.send([{"event_id": i} for i in range(4)])
+    await sink.close()
+
+    metrics = sink.get_metrics()
+    assert metrics["event_count"] == 0
+    assert metrics["failed_count"] == 4
+    assert metrics["error_count"] == 2
+    assert metrics["in_flight"] == 0
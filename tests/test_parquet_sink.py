@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.emitter import batch_event_generators_map
+from src.event_batch import EventBatch
+from src.sinks.factory import SinkFactory
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def make_sink(tmp_path, **parquet_config):
+    return SinkFactory.create_sink(
+        "parquet", {"parquet": {"output_dir": str(tmp_path), **parquet_config}}
+    )
+
+
+def generated(stream, n):
+    cols = batch_event_generators_map[stream](["u1"] * n, ["d1"] * n, n)
+    return EventBatch.from_columns(stream, cols)
+
+
+@pytest.mark.asyncio
+async def test_parquet_sink_writes_hive_partitions_with_fixed_schema(tmp_path):
+    sink = make_sink(tmp_path)
+    batch = EventBatch.concat(
+        [generated("training_data", 20), generated("video_logs", 30)]
+    )
+    await sink.send_batch(batch)
+    await sink.close()
+
+    files = sorted(tmp_path.rglob("*.parquet"))
+    assert len(files) == 2
+    for path in files:
+        parts = path.relative_to(tmp_path).parts
+        assert parts[0].startswith("stream=")
+        assert parts[1].startswith("date=")
+        assert parts[2].startswith("hour=")
+
+    table = pq.read_table(next(tmp_path.glob("stream=training_data/*/*/*.parquet")))
+    assert table.num_rows == 20
+    embedding = table.schema.field("embedding").type
+    assert pa.types.is_fixed_size_list(embedding)
+    assert embedding.list_size == 128
+    assert embedding.value_type == pa.float32()
+    assert pa.types.is_timestamp(table.schema.field("timestamp").type)
+    assert np.asarray(table["embedding"][0].as_py()).shape == (128,)
+    assert sink.get_metrics()["event_count"] == 50
+
+
+@pytest.mark.asyncio
+async def test_parquet_sink_splits_event_hours_and_caps_open_writers(tmp_path):
+    sink = make_sink(tmp_path, row_group_size=1, max_open_writers=1)
+    events = [
+        {
+            "stream": "user_interactions",
+            "event_id": str(i),
+            "user_id": "u",
+            "device_id": "d",
+            "timestamp": f"2025-01-01T{hour:02d}:00:00",
+            "event_type": "click",
+            "element": "button",
+            "page": "home",
+        }
+        for i, hour in enumerate([1, 2, 1])
+    ]
+    for event in events:
+        await sink.send([event])
+    await sink.close()
+    hours = sorted(p.parent.name for p in tmp_path.rglob("*.parquet"))
+    assert hours == ["hour=01", "hour=01", "hour=02"]
+    assert sink.get_metrics()["evicted_writers"] == 2
+
+
+@pytest.mark.asyncio
+async def test_parquet_sink_keeps_rows_without_a_timestamp(tmp_path):
+    sink = make_sink(tmp_path)
+    await sink.send([{"stream": "custom", "event_id": str(i)} for i in range(3)])
+    await sink.close()
+    [path] = tmp_path.rglob("*.parquet")
+    assert path.relative_to(tmp_path).parts[:3] == (
+        "stream=custom",
+        "date=unknown",
+        "hour=unknown",
+    )
+    assert f"-{os.getpid()}-" in path.name
+    assert pq.read_table(path).num_rows == 3
+
+
+@pytest.mark.asyncio
+async def test_parquet_sink_splits_rows_missing_a_timestamp(tmp_path):
+    sink = make_sink(tmp_path)
+    await sink.send(
+        [
+            {"stream": "clicks", "x": 1, "timestamp": "2025-01-01T05:00:00"},
+            {"stream": "clicks", "x": 2},
+        ]
+    )
+    await sink.close()
+    partitions = sorted(
+        path.relative_to(tmp_path).parts[1:3] for path in tmp_path.rglob("*.parquet")
+    )
+    assert partitions == [
+        ("date=2025-01-01", "hour=05"),
+        ("date=unknown", "hour=unknown"),
+    ]
+    assert sink.get_metrics()["event_count"] == 2
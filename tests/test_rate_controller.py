@@ -0,0 +1,103 @@
+import pytest
+
+from src import rate_controller
+from src.rate_controller import (
+    RateController,
+    build_shape,
+    diurnal_shape,
+    ramp_shape,
+    spike_shape,
+    start_rate_controller,
+    step_shape,
+)
+
+STREAMS = {
+    "a": {"weight": 1, "interval_sec": 1.0},
+    "b": {"weight": 3, "interval_sec": 3.0},
+}
+
+
+def simulate(controller, capacity, periods, nominal, start=0):
+    """Feed the controller the rate a node with the given ceiling would reach."""
+    for elapsed in range(start, start + periods):
+        achieved = min(capacity, nominal / controller.scale)
+        controller.update(achieved, elapsed + 1)
+    return achieved
+
+
+def test_load_shapes():
+    ramp = ramp_shape(100, 200, 10)
+    assert ramp(0) == 100 and ramp(5) == 150 and ramp(20) == 200
+
+    step = step_shape([[10, 500], [0, 100]])
+    assert step(0) == 100 and step(9.9) == 100 and step(10) == 500
+
+    spike = spike_shape(100, 1000, at_sec=5, duration_sec=2, every_sec=10)
+    expected = [100, 1000, 1000, 100, 1000, 100]
+    assert [spike(t) for t in (0, 5, 6.5, 7, 15, 18)] == expected
+
+    diurnal = diurnal_shape(100, 300, period_sec=100, peak_at_sec=25)
+    assert diurnal(25) == pytest.approx(300)
+    assert diurnal(75) == pytest.approx(100)
+
+
+def test_build_shape_from_config():
+    assert build_shape({}) is None
+    assert build_shape({"events_per_second": 500})(123) == 500
+    ramp = build_shape(
+        {"rate_control": {"shape": "ramp", "to_eps": 50, "duration_sec": 10}}
+    )
+    assert ramp(5) == 25
+    with pytest.raises(ValueError):
+        build_shape({"rate_control": {"shape": "sawtooth"}})
+    with pytest.raises(ValueError, match="to_eps"):
+        build_shape({"rate_control": {"shape": "ramp", "duration_sec": 10}})
+    with pytest.raises(ValueError, match="events_per_second"):
+        build_shape(
+            {
+                "events_per_second": None,
+                "rate_control": {"shape": "spike", "spike_eps": 9, "duration_sec": 1},
+            }
+        )
+
+
+def test_controller_converges_within_tolerance():
+    nominal = 1000
+    # The node is slower than the open-loop estimate, as with a busy event loop.
+    controller = RateController(lambda t: 5000, nominal_eps=nominal * 0.7)
+    achieved = simulate(controller, capacity=1e9, periods=20, nominal=nominal)
+    assert achieved == pytest.approx(5000, rel=0.05)
+    assert not controller.unreachable
+
+
+def test_controller_follows_a_changing_target():
+    nominal = 1000
+    controller = RateController(step_shape([[0, 2000], [10, 500]]), nominal)
+    simulate(controller, capacity=1e9, periods=9, nominal=nominal)
+    achieved = simulate(controller, capacity=1e9, periods=10, nominal=nominal, start=9)
+    assert achieved == pytest.approx(500, rel=0.05)
+
+
+def test_unreachable_target_is_reported_and_not_chased(capsys):
+    controller = RateController(lambda t: 10000, nominal_eps=1000)
+    simulate(controller, capacity=3000, periods=20, nominal=1000)
+    assert controller.unreachable
+    assert controller.status()["unreachable"]
+    assert "unreachable" in capsys.readouterr().out
+    # Once saturated the controller asks for at most twice the achieved rate.
+    assert controller.scale > 1e-3
+
+
+@pytest.mark.asyncio
+async def test_start_rate_controller_splits_target_across_workers():
+    config = {"events_per_second": 1000, "streams": STREAMS}
+    # Mean interval is 2.5s, so 1000 users reach 400 events/sec at scale 1.
+    task = start_rate_controller(config, 1000, share=0.5)
+    try:
+        assert rate_controller.rate_status()["target_eps"] == 500
+        assert rate_controller.interval_scale() == pytest.approx(0.8)
+    finally:
+        task.cancel()
+    assert start_rate_controller({"streams": STREAMS}, 1000) is None
+    assert rate_controller.interval_scale() == 1.0
+    assert rate_controller.rate_status() is None
@@ -0,0 +1,26 @@
+import numpy as np
+
+from src.scheduler import TimingWheel
+
+
+def test_wheel_fires_indices_when_due():
+    wheel = TimingWheel(tick_sec=0.01, num_slots=8, start=0)
+    wheel.schedule(np.array([0, 1, 2]), np.array([0.015, 0.035, 0.5]))
+    assert wheel.size == 3
+
+    assert wheel.advance(0.005).tolist() == []
+    assert wheel.advance(0.02).tolist() == [0]
+    assert wheel.advance(0.04).tolist() == [1]
+    # Index 2 is several rotations away and must survive passes over its slot.
+    assert wheel.advance(0.3).tolist() == []
+    assert wheel.advance(0.5).tolist() == [2]
+    assert wheel.size == 0
+
+
+def test_wheel_catches_up_after_stall_and_past_due():
+    wheel = TimingWheel(tick_sec=0.01, num_slots=4, start=0)
+    wheel.schedule(np.arange(10), np.linspace(0.0, 0.2, 10))
+    assert sorted(wheel.advance(1.0).tolist()) == list(range(10))
+
+    wheel.schedule(np.array([42]), np.array([0.5]))
+    assert wheel.advance(1.01).tolist() == [42]
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+
+from src.emitter import batch_event_generators_map
+from src.event_batch import EventBatch
+from src.serializer import encode_batch, encode_events
+
+
+def test_encoded_batch_matches_json_dumps_of_rows():
+    batches = [
+        EventBatch.from_columns(
+            stream, generator(["u1", "u2", "u3"], ["d1", "d2", "d3"], 3)
+        )
+        for stream, generator in batch_event_generators_map.items()
+    ]
+    batch = EventBatch.concat(batches)
+    encoded = encode_batch(batch)
+
+    expected = [json.dumps(event).encode("ascii") for event in batch.to_dicts()]
+    assert encoded.records() == expected
+    assert encoded.record(4) == expected[4]
+    assert encoded.head(2) == expected[0] + b"\n" + expected[1] + b"\n"
+    assert encoded.size == sum(map(len, expected))
+    assert {stream: count for stream, count, _ in encoded.stream_stats} == {
+        stream: 3 for stream in batch_event_generators_map
+    }
+
+
+def test_encoding_handles_mixed_and_special_values():
+    batch = EventBatch.from_columns(
+        "s",
+        {
+            "text": ['quote " and ü', "100%"],
+            "flag": np.array([True, False]),
+            "maybe": [None, {"nested": [1, 2]}],
+        },
+    )
+    encoded = encode_batch(batch)
+    assert [json.loads(record) for record in encoded.records()] == batch.to_dicts()
+
+
+def test_encode_events_keeps_order_and_sizes():
+    events = [{"id": 1, "stream": "b"}, {"id": 2, "stream": "a"}, {"id": 3}]
+    encoded = encode_events(events)
+    assert encoded.to_dicts() == events
+    sizes = {stream: size for stream, _, size in encoded.stream_stats}
+    assert sizes == {
+        "b": len(json.dumps(events[0])),
+        "a": len(json.dumps(events[1])),
+        None: len(json.dumps(events[2])),
+    }
@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+import pytest
+
+from src.emitter_registry import EmitterRegistry
+from src.serializer import encode_events
+from src.sink_queue import SinkQueue
+
+
+class SlowSink:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.received = []
+
+    async def send_encoded(self, encoded):
+        await asyncio.sleep(self.delay)
+        self.received.append([event["event_id"] for event in encoded.to_dicts()])
+
+    async def close(self):
+        pass
+
+    def get_metrics(self):
+        return {"type": "slow"}
+
+
+def encoded(*ids):
+    return encode_events([{"event_id": i, "stream": "s"} for i in ids])
+
+
+@pytest.mark.asyncio
+async def test_block_policy_waits_for_room():
+    sink = SlowSink(delay=0.05)
+    queue = SinkQueue("slow", sink, max_batches=1)
+    await queue.put(encoded(1))
+    await asyncio.sleep(0)  # worker takes batch 1
+    await queue.put(encoded(2))
+    put = asyncio.create_task(queue.put(encoded(3)))
+    await asyncio.sleep(0.01)
+    assert not put.done()
+    await queue.close()
+    assert put.done()
+    assert sink.received == [[1], [2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy_sheds_stale_batches():
+    sink = SlowSink(delay=0.05)
+    queue = SinkQueue("slow", sink, max_batches=2, overflow="drop_oldest")
+    await queue.put(encoded(1))
+    await asyncio.sleep(0)
+    for i in range(2, 6):
+        await queue.put(encoded(i, i))
+    metrics = queue.get_metrics()
+    assert metrics["depth"] == 2
+    assert metrics["dropped_batches"] == 2
+    assert metrics["dropped_events"] == 4
+    assert metrics["lag_sec"] > 0
+    await queue.close()
+    assert sink.received == [[1], [4, 4], [5, 5]]
+
+
+@pytest.mark.asyncio
+async def test_spill_policy_round_trips_batches_in_order(tmp_path):
+    sink = SlowSink(delay=0.01)
+    queue = SinkQueue("slow", sink, max_batches=1, overflow="spill", spill_dir=tmp_path)
+    for i in range(5):
+        await queue.put(encoded(i))
+    assert queue.get_metrics()["spilled_batches"] > 0
+    await queue.close()
+    assert sink.received == [[0], [1], [2], [3], [4]]
+    assert not os.path.exists(queue.spill.path)
+
+
+@pytest.mark.asyncio
+async def test_spill_files_are_per_process_and_start_empty(tmp_path):
+    stale = tmp_path / f"slow-{os.getpid()}.spill"
+    stale.write_bytes(b"frames from an earlier run")
+    queue = SinkQueue("slow", SlowSink(), overflow="spill", spill_dir=tmp_path)
+    assert queue.spill.path == str(stale)
+    assert not stale.exists()
+    assert queue.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_sink_does_not_delay_fast_sink():
+    registry = EmitterRegistry({"sinks": {}})
+    slow, fast = SlowSink(delay=0.2), SlowSink()
+    registry.sinks = {"slow": slow, "fast": fast}
+    registry.queues = {
+        "slow": SinkQueue("slow", slow),
+        "fast": SinkQueue("fast", fast),
+    }
+    registry.default_sinks = ["slow", "fast"]
+    await registry.flush("r1", [{"event_id": 1, "stream": "s"}], {})
+    await asyncio.sleep(0.05)
+    assert fast.received == [[1]]
+    assert slow.received == []
+    assert registry.get_all_metrics()["slow"]["queue"]["depth"] == 0
+    await registry.close()
+    assert slow.received == [[1]]
+
+
+@pytest.mark.asyncio
+async def test_only_spill_queues_touch_the_spill_dir(tmp_path):
+    spill_dir = tmp_path / "spill"
+    stale = spill_dir / f"slow-{os.getpid()}.spill"
+    spill_dir.mkdir()
+    stale.write_bytes(b"left by a spill queue")
+    for overflow in ("block", "drop_oldest"):
+        queue = SinkQueue("slow", SlowSink(), overflow=overflow, spill_dir=spill_dir)
+        assert queue.spill is None
+        await queue.put(encoded(1))
+        await queue.close()
+        assert queue.get_metrics()["spilled_depth"] == 0
+    assert stale.exists()
@@ -0,0 +1,40 @@
+from collections import Counter
+
+from src.stream_weights import StreamSampler, get_sampler, weighted_random_choice
+
+STREAMS = {
+    "a": {"weight": 0.5, "interval_sec": 0.01},
+    "b": {"weight": 0.3, "interval_sec": 0.01},
+    "c": {"weight": 0.2, "interval_sec": 0.01},
+}
+
+
+def test_sample_many_matches_weights():
+    sampler = StreamSampler({name: dict(props) for name, props in STREAMS.items()})
+    counts = Counter(sampler.sample_many(100_000))
+    assert abs(counts["a"] / 100_000 - 0.5) < 0.01
+    assert abs(counts["b"] / 100_000 - 0.3) < 0.01
+    assert abs(counts["c"] / 100_000 - 0.2) < 0.01
+
+    counts = Counter(sampler.sample() for _ in range(50_000))
+    assert abs(counts["c"] / 50_000 - 0.2) < 0.015
+
+
+def test_sampler_rebuilds_when_weights_change():
+    streams = {name: dict(props) for name, props in STREAMS.items()}
+    sampler = get_sampler(streams)
+    assert get_sampler(streams) is sampler
+
+    streams["a"]["weight"] = 0.0
+    streams["b"]["weight"] = 0.0
+    sampler.refresh()
+    assert set(sampler.sample_many(1000)) == {"c"}
+    assert weighted_random_choice(streams) == "c"
+
+
+def test_sampler_rebuilds_when_a_stream_is_renamed():
+    streams = {"a": {"weight": 1.0}, "b": {"weight": 0.0}}
+    sampler = StreamSampler(streams)
+    streams["z"] = streams.pop("a")
+    sampler.refresh()
+    assert set(sampler.sample_many(100)) == {"z"}
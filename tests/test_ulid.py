@@ -0,0 +1,59 @@
+import uuid
+
+from src import utils
+from src.ulid import CROCKFORD, RandomPool, UlidGenerator, decode
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_ulids_are_monotonic_within_a_millisecond():
+    clock = FakeClock(1_700_000_000.0005)
+    generator = UlidGenerator(RandomPool(), time_source=clock)
+    ids = [generator.new() for _ in range(5)] + generator.new_many(1000)
+    ids += [generator.new()]
+
+    assert all(len(ulid) == 26 and set(ulid) <= set(CROCKFORD) for ulid in ids)
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    decoded = [decode(ulid) for ulid in ids]
+    assert {ms for ms, _ in decoded} == {1_700_000_000_000}
+    randoms = [value for _, value in decoded]
+    assert randoms == list(range(randoms[0], randoms[0] + len(ids)))
+
+
+def test_batch_carries_across_64_bit_boundary():
+    clock = FakeClock(1.0)
+    pool = RandomPool(source=lambda n: b"\x00\x00" + b"\xff" * (n - 2))
+    generator = UlidGenerator(pool, time_source=clock)
+    ids = generator.new_many(3)
+    values = [decode(ulid)[1] for ulid in ids]
+    assert values == [(1 << 64) - 1, 1 << 64, (1 << 64) + 1]
+
+
+def test_new_millisecond_sorts_after_previous():
+    clock = FakeClock(10.0)
+    generator = UlidGenerator(RandomPool(), time_source=clock)
+    first = generator.new_many(10)
+    clock.now = 10.002
+    second = generator.new_many(10)
+    assert first[-1] < second[0]
+
+
+def test_uuid4_id_format_produces_rfc_4122_uuids():
+    utils.set_id_format("uuid4")
+    try:
+        ids = utils.generate_ulids(100) + [utils.generate_ulid()]
+    finally:
+        utils.set_id_format("ulid")
+    assert len(set(ids)) == 101
+    for value in ids:
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
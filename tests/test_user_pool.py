@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.emitter import group_users_by_region
+from src.user_pool import UserPool, load_user_pool
+from src.utils import configure_generation
+
+REGIONS = [{"name": "us-west"}, {"name": "us-east"}, {"name": "us-south"}]
+
+
+def test_generated_users_have_ids_regions_and_devices():
+    pool = UserPool.generate(1000, REGIONS, np.random.default_rng(1))
+    assert len(pool) == 1000
+    user = pool[42]
+    assert user["user_id"] == "u00000042"
+    assert user["region"] in {"us-west", "us-east", "us-south"}
+    assert 1 <= len(user["devices"]) <= 3
+    assert all(len(device) == 13 and device[0] == "d" for device in user["devices"])
+
+
+def test_device_ids_come_from_each_users_devices():
+    pool = UserPool.generate(200, REGIONS, np.random.default_rng(2))
+    positions = np.arange(200)
+    picked = pool.device_ids(positions, np.random.default_rng(3))
+    assert pool.user_ids(positions[:2]) == ["u00000000", "u00000001"]
+    assert all(device in pool[i]["devices"] for i, device in enumerate(picked))
+
+
+def test_save_and_load_memory_maps_the_pool(tmp_path):
+    pool = UserPool.generate(500, REGIONS, np.random.default_rng(4))
+    path = str(tmp_path / "users.pool")
+    pool.save(path)
+    loaded = UserPool.load(path)
+    assert isinstance(loaded.records, np.memmap)
+    assert list(loaded) == list(pool)
+    assert loaded.region_names == pool.region_names
+
+
+def test_load_user_pool_reuses_matching_file(tmp_path):
+    config = {"emitters": 50, "regions": REGIONS, "user_pool_file": str(tmp_path / "p")}
+    first = load_user_pool(config)
+    assert isinstance(load_user_pool(config).records, np.memmap)
+    assert list(load_user_pool(config)) == list(first)
+    config["emitters"] = 60
+    assert len(load_user_pool(config)) == 60
+
+
+def test_load_user_pool_regenerates_when_the_seed_changes(tmp_path):
+    config = {"emitters": 50, "regions": REGIONS, "user_pool_file": str(tmp_path / "p")}
+    configure_generation({**config, "seed": 1})
+    first = load_user_pool({**config, "seed": 1})
+    configure_generation({**config, "seed": 2})
+    second = load_user_pool({**config, "seed": 2})
+    assert second.seed == 2
+    assert list(second) != list(first)
+    configure_generation({**config, "seed": 1})
+    assert list(load_user_pool({**config, "seed": 1})) == list(first)
+
+
+def test_shards_and_region_groups_cover_every_user_once():
+    pool = UserPool.generate(101, REGIONS, np.random.default_rng(5))
+    shards = [pool.shard(i, 4) for i in range(4)]
+    ids = sorted(u["user_id"] for shard in shards for u in shard)
+    assert ids == sorted(u["user_id"] for u in pool)
+    groups = group_users_by_region(pool, 10)
+    assert sum(len(users) for _, users in groups) == 101
+    for region, users in groups:
+        assert len(users) <= 10
+        assert {u["region"] for u in users} == {region}
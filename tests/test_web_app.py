@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.counters import counters
+from src.web import app as web
+from src.web.app import Broadcaster, MetricsSnapshotter, Viewer, diff
+
+
+class FakeSocket:
+    def __init__(self, block=False):
+        self.frames = []
+        self.closed = False
+        self.unblock = asyncio.Event()
+        if not block:
+            self.unblock.set()
+
+    async def send_text(self, frame):
+        await self.unblock.wait()
+        self.frames.append(json.loads(frame))
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def viewers(monkeypatch):
+    connections = []
+    monkeypatch.setattr(web, "active_connections", connections)
+    return connections
+
+
+def test_diff_keeps_only_changed_fields():
+    old = {"total": 1, "streams": {"a": {"count": 1, "bytes": 10}}, "gone": 1}
+    new = {"total": 2, "streams": {"a": {"count": 1, "bytes": 20}, "b": {"count": 1}}}
+    assert diff(old, new) == {
+        "total": 2,
+        "streams": {"a": {"bytes": 20}, "b": {"count": 1}},
+        "gone": None,
+    }
+    assert diff(new, new) == {}
+
+
+@pytest.mark.asyncio
+async def test_each_tick_is_encoded_once_for_all_viewers(viewers, monkeypatch):
+    broadcaster = Broadcaster(MetricsSnapshotter())
+    sockets = [FakeSocket() for _ in range(20)]
+    viewers.extend(Viewer(socket) for socket in sockets)
+
+    broadcaster.tick()
+    await asyncio.sleep(0.01)
+    monkeypatch.setitem(counters, "total", counters["total"] + 5)
+    broadcaster.tick()
+    await asyncio.sleep(0.01)
+
+    # One full frame for the new viewers, then one shared delta.
+    assert broadcaster.frames_encoded == 2
+    for socket in sockets:
+        full, delta = socket.frames
+        assert full["type"] == "full" and "streams" in full["data"]
+        assert delta["type"] == "delta" and delta["seq"] == full["seq"] + 1
+        assert delta["data"]["total_events"] == full["data"]["total_events"] + 5
+        assert "total_bytes" not in delta["data"]
+
+
+@pytest.mark.asyncio
+async def test_slow_viewers_skip_frames_and_are_dropped(viewers, monkeypatch):
+    monkeypatch.setattr(web, "MAX_SKIPPED_FRAMES", 2)
+    broadcaster = Broadcaster(MetricsSnapshotter())
+    fast, slow = FakeSocket(), FakeSocket(block=True)
+    viewers.extend([Viewer(fast), Viewer(slow)])
+
+    for _ in range(3):
+        broadcaster.tick()
+        await asyncio.sleep(0.01)
+    # The slow viewer's first send is still pending; the others were skipped.
+    assert len(fast.frames) == 3 and not slow.frames
+    slow.unblock.set()
+    await asyncio.sleep(0.01)
+    broadcaster.tick()
+    await asyncio.sleep(0.01)
+    # It fell behind, so it is resynced with a full frame rather than a delta.
+    assert [frame["type"] for frame in slow.frames] == ["full", "full"]
+
+    slow.unblock.clear()
+    for _ in range(4):
+        broadcaster.tick()
+        await asyncio.sleep(0.01)
+    assert slow.closed
+    assert len(viewers) == 1 and len(fast.frames) == 8
+
+
+def test_rest_and_websocket_serve_the_shared_snapshot(monkeypatch):
+    monkeypatch.setattr(web, "SNAPSHOT_INTERVAL_SEC", 0.05)
+    with TestClient(web.app) as client:
+        snapshot = client.get("/api/metrics").json()
+        assert snapshot["type"] == "full"
+        assert "total_events" in snapshot["data"]
+        with client.websocket_connect("/ws/metrics") as websocket:
+            first = websocket.receive_json()
+            second = websocket.receive_json()
+        assert first["type"] == "full"
+        assert second == {
+            "type": "delta",
+            "seq": first["seq"] + 1,
+            "data": second["data"],
+        }
+        assert "total_events" not in second["data"]
@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+
+from src import counters as counters_module
+from src.user_pool import UserPool
+from src.workers import merge_snapshots, shard_user_pool, start_workers, stop_workers
+
+REGIONS = [{"name": "us-west"}, {"name": "us-east"}]
+
+
+def test_shards_cover_the_pool_exactly_once():
+    pool = UserPool.generate(1001, REGIONS, np.random.default_rng(1))
+    shards = shard_user_pool(pool, 4)
+    ids = [user["user_id"] for shard in shards for user in shard]
+    assert sorted(ids) == sorted(user["user_id"] for user in pool)
+    assert len(set(ids)) == len(pool)
+
+
+def test_merged_counters_add_up():
+    snapshots = {
+        0: ({"total": 3, "clicks": 3}, {"clicks": 30}, {}),
+        1: ({"total": 5, "clicks": 1, "views": 4}, {"clicks": 10, "views": 40}, {}),
+    }
+    merge_snapshots(snapshots)
+    assert counters_module.counters == {"total": 8, "clicks": 4, "views": 4}
+    assert counters_module.stream_bytes == {"clicks": 40, "views": 40}
+
+
+def test_stopped_workers_flush_and_report_final_counters(tmp_path):
+    config = {
+        "emitters": 200,
+        "emitter_mode": "batch",
+        "emitter_batch_size": 50,
+        "regions": REGIONS,
+        "streams": {
+            "video_logs": {"weight": 0.5, "interval_sec": 0.1},
+            "user_interactions": {"weight": 0.5, "interval_sec": 0.1},
+        },
+        # Nothing flushes on its own, so every event is written at shutdown.
+        "flush_batch_size": 10**9,
+        "flush_interval_sec": 3600,
+        "time_jitter_sec": 0,
+        "sinks": {
+            "file": {"type": "file", "file": {"output_dir": str(tmp_path / "out")}}
+        },
+    }
+    pool = UserPool.generate(200, REGIONS, np.random.default_rng(2))
+    # Forked workers inherit the parent's counters; start them from zero.
+    counters_module.counters.clear()
+    processes, stats_queue = start_workers(pool, config, 2, report_interval=0.1)
+    time.sleep(1.5)
+    stop_workers(processes, stats_queue, timeout=10)
+
+    assert all(process.exitcode == 0 for process in processes)
+    written = sum(
+        len(path.read_text().splitlines())
+        for path in (tmp_path / "out").glob("*.jsonl")
+    )
+    # Only the shutdown flush writes, so both prove the workers ran cleanup.
+    assert written > 0
+    assert counters_module.counters["total"] == written